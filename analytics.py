@@ -0,0 +1,203 @@
+SCORE_BUCKET_WIDTH = 10
+SCORE_BUCKETS = 10
+
+# Clamp eligibility scores (0-100, occasionally slightly outside) into a bucket
+SCORE_BUCKET_SQL = "MIN(MAX(CAST({score} / {width} AS INTEGER), 0), {last})"
+
+ANALYTICS_SCHEMA = ["""
+CREATE TABLE IF NOT EXISTS analytics_daily_applications (
+    job_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (job_id, day)
+) WITHOUT ROWID;
+""", """
+CREATE TABLE IF NOT EXISTS analytics_application_status (
+    job_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (job_id, status)
+) WITHOUT ROWID;
+""", """
+CREATE TABLE IF NOT EXISTS analytics_interview_status (
+    job_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (job_id, status)
+) WITHOUT ROWID;
+""", """
+CREATE TABLE IF NOT EXISTS analytics_score_histogram (
+    job_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    PRIMARY KEY (job_id, bucket)
+) WITHOUT ROWID;
+""", "CREATE INDEX IF NOT EXISTS idx_analytics_daily_day ON analytics_daily_applications (day)"]
+
+
+def rollup_statements(table, keys, row, delta, extra=None):
+    """Upsert ``delta`` into the rollup row of ``table`` keyed by ``keys`` from ``row`` (NEW or OLD)."""
+    extra = extra or {}
+    columns = list(keys) + ["count"] + list(extra)
+    values = [expression.format(row=row) for expression in keys.values()] + [str(delta)] + [
+        expression.format(row=row) for expression in extra.values()
+    ]
+    updates = ", ".join(["count = count + excluded.count"] + [f"{name} = {name} + excluded.{name}" for name in extra])
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(values)}) "
+        f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {updates};"
+    )
+
+
+def rollup_triggers(source, table, keys, columns, extra_in=None, extra_out=None, when="1"):
+    """Triggers that keep ``table`` in step with inserts, deletes and key updates on ``source``."""
+    add = rollup_statements(table, keys, "NEW", 1, extra_in)
+    remove = rollup_statements(table, keys, "OLD", -1, extra_out)
+    new_when, old_when = when.format(row="NEW"), when.format(row="OLD")
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_{source}_insert AFTER INSERT ON {source} "
+        f"WHEN {new_when} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_{source}_delete AFTER DELETE ON {source} "
+        f"WHEN {old_when} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_{source}_update_old AFTER UPDATE OF {', '.join(columns)} ON {source} "
+        f"WHEN {old_when} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_{source}_update_new AFTER UPDATE OF {', '.join(columns)} ON {source} "
+        f"WHEN {new_when} BEGIN {add} END"
+    ]
+
+
+def score_bucket(row):
+    return SCORE_BUCKET_SQL.format(score=f"{row}.eligibility_score", width=SCORE_BUCKET_WIDTH, last=SCORE_BUCKETS - 1)
+
+
+ANALYTICS_TRIGGERS = (
+    rollup_triggers(
+        "applications", "analytics_daily_applications",
+        {"job_id": "{row}.job_id", "day": "COALESCE({row}.application_date, '')"},
+        ["job_id", "application_date"]
+    )
+    + rollup_triggers(
+        "applications", "analytics_application_status",
+        {"job_id": "{row}.job_id", "status": "COALESCE({row}.status, 'Pending')"},
+        ["job_id", "status"]
+    )
+    + rollup_triggers(
+        "interviews", "analytics_interview_status",
+        {"job_id": "{row}.job_id", "status": "{row}.status"},
+        ["job_id", "status"]
+    )
+    + rollup_triggers(
+        "scores", "analytics_score_histogram",
+        {"job_id": "{row}.job_id", "bucket": score_bucket("{row}")},
+        ["job_id", "eligibility_score"],
+        extra_in={"score_sum": "NEW.eligibility_score"},
+        extra_out={"score_sum": "-OLD.eligibility_score"},
+        when="{row}.eligibility_score IS NOT NULL"
+    )
+)
+
+ROLLUP_TABLES = ["analytics_daily_applications", "analytics_application_status",
+                 "analytics_interview_status", "analytics_score_histogram"]
+
+
+def init_analytics(cursor):
+    """Create the rollup tables and their triggers, rebuilding the rollups on first use."""
+    for statement in ANALYTICS_SCHEMA + ANALYTICS_TRIGGERS:
+        cursor.execute(statement)
+    if not any(cursor.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() for table in ROLLUP_TABLES):
+        rebuild_analytics(cursor)
+
+
+def rebuild_analytics(cursor):
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute("""
+        INSERT INTO analytics_daily_applications (job_id, day, count)
+        SELECT job_id, COALESCE(application_date, ''), COUNT(*) FROM applications GROUP BY 1, 2
+    """)
+    cursor.execute("""
+        INSERT INTO analytics_application_status (job_id, status, count)
+        SELECT job_id, COALESCE(status, 'Pending'), COUNT(*) FROM applications GROUP BY 1, 2
+    """)
+    cursor.execute("""
+        INSERT INTO analytics_interview_status (job_id, status, count)
+        SELECT job_id, status, COUNT(*) FROM interviews GROUP BY 1, 2
+    """)
+    cursor.execute(f"""
+        INSERT INTO analytics_score_histogram (job_id, bucket, count, score_sum)
+        SELECT job_id, {score_bucket("scores")}, COUNT(*), SUM(eligibility_score)
+        FROM scores WHERE eligibility_score IS NOT NULL GROUP BY 1, 2
+    """)
+
+
+def job_filter(job_id):
+    return ("WHERE job_id = ?", [job_id]) if job_id is not None else ("", [])
+
+
+def daily_applications(cursor, job_id=None, start=None, end=None):
+    conditions, params = ["count > 0"], []
+    if job_id is not None:
+        conditions.append("job_id = ?")
+        params.append(job_id)
+    if start:
+        conditions.append("day >= ?")
+        params.append(start)
+    if end:
+        conditions.append("day <= ?")
+        params.append(end)
+    cursor.execute(f"""
+        SELECT day, SUM(count) AS count FROM analytics_daily_applications
+        WHERE {' AND '.join(conditions)}
+        GROUP BY day ORDER BY day
+    """, params)
+    return [{"date": row[0], "count": row[1]} for row in cursor.fetchall()]
+
+
+def applications_by_job(cursor, limit=None):
+    cursor.execute("""
+        SELECT s.job_id, j.job_title, j.company, SUM(s.count) AS applications
+        FROM analytics_application_status s
+        LEFT JOIN jobs j ON j.job_id = s.job_id
+        GROUP BY s.job_id
+        HAVING applications > 0
+        ORDER BY applications DESC, s.job_id
+        LIMIT ?
+    """, (limit if limit else -1,))
+    return [dict(zip(("job_id", "job_title", "company", "applications"), row)) for row in cursor.fetchall()]
+
+
+def status_funnel(cursor, job_id=None):
+    where, params = job_filter(job_id)
+    funnel = {}
+    for name, table in (("applications", "analytics_application_status"), ("interviews", "analytics_interview_status")):
+        cursor.execute(f"SELECT status, SUM(count) FROM {table} {where} GROUP BY status HAVING SUM(count) > 0", params)
+        counts = dict(cursor.fetchall())
+        funnel[name] = {"total": sum(counts.values()), "by_status": counts}
+    return funnel
+
+
+def score_histogram(cursor, job_id=None):
+    """Eligibility score buckets for one job, or across all jobs when ``job_id`` is None."""
+    where, params = job_filter(job_id)
+    cursor.execute(f"""
+        SELECT bucket, SUM(count), SUM(score_sum) FROM analytics_score_histogram {where}
+        GROUP BY bucket
+    """, params)
+    counts = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    buckets = []
+    for bucket in range(SCORE_BUCKETS):
+        count, _ = counts.get(bucket, (0, 0.0))
+        buckets.append({
+            "min": bucket * SCORE_BUCKET_WIDTH,
+            "max": (bucket + 1) * SCORE_BUCKET_WIDTH,
+            "count": count
+        })
+    total = sum(count for count, _ in counts.values())
+    score_sum = sum(value for _, value in counts.values())
+    return {
+        "job_id": job_id,
+        "total": total,
+        "mean": round(score_sum / total, 2) if total else None,
+        "buckets": buckets
+    }
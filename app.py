@@ -1,15 +1,48 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+import click
+from collections import defaultdict
+import heapq
 import os
+import threading
+import time
 import sqlite3
 import json
 import fitz  
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 from langchain_groq import ChatGroq
 from langchain.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
+from embedding_service import EmbeddingBatcher
+from embedding_backends import EMBEDDING_BACKENDS, load_embedding_model, benchmark_encode, compare_rankings
+from embedding_versions import (
+    EmbeddingReindexer, init_embedding_versions, get_version, building_version,
+    request_version, version_id, version_progress
+)
+from skill_index import init_skill_stats, index_skills, get_skills, filter_by_skills, overlap_scores, skill_filter_sql
+from reranker import CrossEncoderReranker, content_version
+from skill_explain import SkillExplainer
+from resume_preprocess import prepare_resume_text, estimate_tokens
+from job_parsing import JOB_FEATURE_FIELDS, strip_json_fence, format_job_batch, pack_job_batches, parse_job_batch
+from llm_client import ResilientLLM, CircuitBreaker, DeferredLLMWork, LLMUnavailableError
+from job_import import JobFeedImport, init_imports, import_status
+from response_cache import ResponseCache, init_cache_versions, bump_cache_version
+from facets import init_facets, add_job_to_facets, remove_job_from_facets, rebuild_facets, facet_counts, filtered_facet_counts
+from email_outbox import init_outbox, enqueue_email, outbox_stats, SMTPPool, OutboxSender
+from vector_store import VectorStore, VECTOR_DTYPES, recall_at_k
+from batch_matching import run_shards, sample_score_rate
+from interview_calendar import init_interview_calendar, interview_bounds, overlap_clause, overlap_params, begin_booking, find_conflicts
+from analytics import init_analytics, rebuild_analytics, daily_applications, applications_by_job, status_funnel, score_histogram
+from score_ranks import init_score_ranks, rebuild_score_ranks, many_job_ranks
+from ndjson_export import ndjson_lines, gzip_stream
+from snapshot import write_snapshot, read_manifest, check_compatible, install_vectors, load_scores, store_row_count
+from job_lifecycle import (
+    JOB_STATUSES, EXPIRED_JOBS_SQL, active_job_condition, unarchived_inactive_condition, init_job_lifecycle,
+    jobs_to_archive, archive_job, unarchive_job
+)
 
 app = Flask(__name__)
 CORS(app)
@@ -19,6 +52,39 @@ load_dotenv(".env.local")
 DB_PATH = "job_matching.db"
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'csv'}
+EMBEDDING_MODEL_NAME = os.environ.get("EMBEDDING_MODEL_NAME", 'all-MiniLM-L6-v2')
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", 32))
+EMBEDDING_BATCH_WAIT_MS = float(os.environ.get("EMBEDDING_BATCH_WAIT_MS", 5))
+EMBEDDING_AUTO_REINDEX = os.environ.get("EMBEDDING_AUTO_REINDEX", "true").lower() == "true"
+INIT_DB_ON_IMPORT = os.environ.get("INIT_DB_ON_IMPORT", "true").lower() == "true"
+EMBEDDING_REINDEX_BATCH_SIZE = int(os.environ.get("EMBEDDING_REINDEX_BATCH_SIZE", 64))
+EMBEDDING_REINDEX_PAUSE_SECONDS = float(os.environ.get("EMBEDDING_REINDEX_PAUSE_SECONDS", 0.5))
+EMBEDDING_VERSION_CHECK_SECONDS = float(os.environ.get("EMBEDDING_VERSION_CHECK_SECONDS", 10))
+VECTOR_STORE_DIR = os.environ.get("VECTOR_STORE_DIR", "vectors")
+VECTOR_STORE_DTYPE = os.environ.get("VECTOR_STORE_DTYPE", "float16")
+SNAPSHOT_WARM_START_DIR = os.environ.get("SNAPSHOT_WARM_START_DIR")
+SKILL_PREFILTER_MIN_OVERLAP = int(os.environ.get("SKILL_PREFILTER_MIN_OVERLAP", 0))
+RERANK_MODEL = os.environ.get("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_TOP_N = int(os.environ.get("RERANK_TOP_N", 50))
+RERANK_BUDGET_MS = float(os.environ.get("RERANK_BUDGET_MS", 300))
+SKILL_MATCH_THRESHOLD = float(os.environ.get("SKILL_MATCH_THRESHOLD", 0.65))
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", 2))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 20))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", 30))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+LLM_HEDGE = os.environ.get("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_MIN_DELAY = float(os.environ.get("LLM_HEDGE_MIN_DELAY", 1.0))
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", 30))
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL")
+RESUME_TOKEN_BUDGET = int(os.environ.get("RESUME_TOKEN_BUDGET", 3000))
+JOB_BATCH_TOKEN_BUDGET = int(os.environ.get("JOB_BATCH_TOKEN_BUDGET", 4000))
+JOB_BATCH_MAX_ITEMS = int(os.environ.get("JOB_BATCH_MAX_ITEMS", 8))
+SCORE_RETENTION_TOP_K = int(os.environ.get("SCORE_RETENTION_TOP_K", 0))
+JOB_IMPORT_CHUNK_SIZE = int(os.environ.get("JOB_IMPORT_CHUNK_SIZE", 500))
+JOB_ARCHIVE_CHECK_SECONDS = float(os.environ.get("JOB_ARCHIVE_CHECK_SECONDS", 300))
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY not found in environment variables.")
@@ -26,9 +92,44 @@ if not GROQ_API_KEY:
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+email_settings = {
+    'smtp_server': os.environ.get("SMTP_HOST", ""),
+    'smtp_port': int(os.environ.get("SMTP_PORT", 587)),
+    'sender_email': os.environ.get("EMAIL_FROM") or os.environ.get("SMTP_USER", ""),
+    'sender_password': os.environ.get("SMTP_PASSWORD", ""),
+    'smtp_user': os.environ.get("SMTP_USER", ""),
+    'starttls': os.environ.get("SMTP_STARTTLS", "true").lower() != "false"
+}
+
+
+llm = ChatGroq(api_key=GROQ_API_KEY, model="qwen-2.5-32b", base_url=GROQ_BASE_URL, timeout=LLM_TIMEOUT_SECONDS, max_retries=0)
+llm_client = ResilientLLM(
+    llm,
+    timeout=LLM_TIMEOUT_SECONDS,
+    max_retries=LLM_MAX_RETRIES,
+    hedge=LLM_HEDGE,
+    min_hedge_delay=LLM_HEDGE_MIN_DELAY,
+    breaker=CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+)
+deferred_llm_work = DeferredLLMWork(DB_PATH, llm_client.breaker)
+
+# (candidate field, job field, weight, score column) used by eligibility scoring
+MATCH_FIELDS = [
+    ("skills", "required_skills", 0.4, "skill_score"),
+    ("qualifications", "qualifications", 0.2, "education_score"),
+    ("projects", "job_title", 0.2, "project_relevance_score"),
+    ("experience", "experience", 0.1, "experience_score")
+]
+CANDIDATE_VECTOR_FIELDS = [candidate_field for candidate_field, _, _, _ in MATCH_FIELDS]
+JOB_VECTOR_FIELDS = [job_field for _, job_field, _, _ in MATCH_FIELDS]
 
-llm = ChatGroq(api_key=GROQ_API_KEY, model="qwen-2.5-32b")
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+reranker = CrossEncoderReranker(RERANK_MODEL, budget_ms=RERANK_BUDGET_MS)
+skill_explainer = SkillExplainer()
+
+
+def add_column_if_missing(cursor, table, column, definition):
+    if column not in [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
 
 
 def init_db():
@@ -118,11 +219,86 @@ def init_db():
     );
     """)
 
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS candidate_skills (
+        skill TEXT NOT NULL,
+        candidate_id INTEGER NOT NULL,
+        PRIMARY KEY (skill, candidate_id)
+    ) WITHOUT ROWID;
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills (candidate_id)")
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS job_skills (
+        skill TEXT NOT NULL,
+        job_id INTEGER NOT NULL,
+        PRIMARY KEY (skill, job_id)
+    ) WITHOUT ROWID;
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_skills_job ON job_skills (job_id)")
+    init_skill_stats(cursor)
+
+    init_outbox(cursor)
+    deferred_llm_work.init(cursor)
+    init_imports(cursor)
+    init_cache_versions(cursor)
+    init_facets(cursor)
+    if not cursor.execute("SELECT 1 FROM job_facets LIMIT 1").fetchone():
+        rebuild_facets(cursor)
+
+    # Scores record the embedding version that produced them; vectors created
+    # before versioning stay in the root of the vector store
+    init_embedding_versions(cursor)
+    add_column_if_missing(cursor, "scores", "model_version", "TEXT")
+    if not cursor.execute("SELECT 1 FROM embedding_versions WHERE status = 'active'").fetchone():
+        request_version(cursor, EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, VECTOR_STORE_DIR, status='active')
+    cursor.execute(
+        "UPDATE scores SET model_version = (SELECT version FROM embedding_versions WHERE status = 'active') "
+        "WHERE model_version IS NULL"
+    )
+
+    # Lets `flask rematch --since` find rows created or changed after a point in time
+    add_column_if_missing(cursor, "candidates", "updated_at", "TEXT")
+    add_column_if_missing(cursor, "jobs", "updated_at", "TEXT")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_updated ON candidates (updated_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at)")
+
+    # Job lifecycle: closed and expired jobs are archived out of scores, skills, facets and vectors
+    add_column_if_missing(cursor, "jobs", "status", "TEXT NOT NULL DEFAULT 'open'")
+    add_column_if_missing(cursor, "jobs", "expires_at", "TEXT")
+    add_column_if_missing(cursor, "jobs", "closed_at", "TEXT")
+    add_column_if_missing(cursor, "jobs", "archived_at", "TEXT")
+    init_job_lifecycle(cursor)
+
+    # Normalized interview intervals for calendar range queries and overlap checks
+    add_column_if_missing(cursor, "interviews", "starts_at", "TEXT")
+    add_column_if_missing(cursor, "interviews", "ends_at", "TEXT")
+    init_interview_calendar(cursor)
+
+    # Dashboard rollups, kept current by triggers on applications, interviews and scores
+    init_analytics(cursor)
+
+    # Per-job score buckets behind applicant rank and percentile lookups
+    init_score_ranks(cursor)
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_scores_candidate ON scores (candidate_id, eligibility_score DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_scores_job ON scores (job_id, eligibility_score DESC)")
+
     conn.commit()
     conn.close()
 
 
-init_db()
+# Multi-worker servers set INIT_DB_ON_IMPORT=false and run `flask init-db` once
+# before starting, so workers don't race through the migrations and rebuilds
+if INIT_DB_ON_IMPORT:
+    init_db()
+
+smtp_pool = SMTPPool(lambda: email_settings, size=SMTP_POOL_SIZE)
+outbox_sender = OutboxSender(
+    DB_PATH, smtp_pool, lambda: email_settings,
+    batch_size=EMAIL_OUTBOX_BATCH_SIZE,
+    max_attempts=EMAIL_OUTBOX_MAX_ATTEMPTS
+)
 
 
 def allowed_file(filename):
@@ -133,6 +309,78 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row  
     return conn
 
+response_cache = ResponseCache(get_db_connection)
+
+embedding_lock = threading.Lock()
+embedding_version = None
+embedding_version_checked = 0.0
+embedding_reindexer = None
+
+def load_embedding_version(version):
+    model = load_embedding_model(version["backend"], version["model_name"])
+    store = VectorStore(version["store_dir"], model.get_sentence_embedding_dimension(), VECTOR_STORE_DTYPE)
+    conn = get_db_connection()
+    conn.execute("UPDATE embedding_versions SET dim = ? WHERE version = ?", (store.dim, version["version"]))
+    conn.commit()
+    conn.close()
+    return model, store
+
+def use_embedding_version(version, loaded=None):
+    """Serve query embeddings and stored vectors from the given embedding version."""
+    global embedding_model, vector_store, embedding_version
+    with embedding_lock:
+        if version["version"] == embedding_version:
+            return
+        model, store = loaded or load_embedding_version(version)
+        embedding_model, vector_store, embedding_version = model, store, version["version"]
+    print(f"Serving embedding version {version['version']}")
+
+def sync_embedding_version(force=False):
+    """Follow a switch-over committed by another process, checking at most every few seconds."""
+    global embedding_version_checked
+    if not force and time.monotonic() - embedding_version_checked < EMBEDDING_VERSION_CHECK_SECONDS:
+        return
+    embedding_version_checked = time.monotonic()
+    conn = get_db_connection()
+    active = get_version(conn.cursor())
+    conn.close()
+    if active and active["version"] != embedding_version:
+        use_embedding_version(active)
+
+def import_snapshot(snapshot_dir, vectors=True, scores=True, only_if_empty=False):
+    """Install a snapshot's vectors and scores for the active embedding version.
+
+    With ``only_if_empty`` each part is skipped when the instance already has
+    vectors or scores, so a warm-start directory can stay configured.
+    """
+    manifest = read_manifest(snapshot_dir)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    active = get_version(cursor)
+    check_compatible(manifest, active, VECTOR_STORE_DTYPE)
+    result = {"matrices": 0, "scores": 0}
+    if vectors and not (only_if_empty and store_row_count(active["store_dir"])):
+        result["matrices"] = install_vectors(snapshot_dir, active["store_dir"])
+    if scores and manifest["scores"] is not None and not (only_if_empty and cursor.execute("SELECT 1 FROM scores LIMIT 1").fetchone()):
+        result["scores"] = load_scores(cursor, snapshot_dir, active["version"])
+        bump_cache_version(cursor, "scores")
+        conn.commit()
+    conn.close()
+    return result
+
+if SNAPSHOT_WARM_START_DIR:
+    try:
+        print(f"Warm start from {SNAPSHOT_WARM_START_DIR}: {import_snapshot(SNAPSHOT_WARM_START_DIR, only_if_empty=True)}")
+    except (OSError, ValueError) as e:
+        print(f"Skipping warm start snapshot: {e}")
+
+sync_embedding_version(force=True)
+embedding_service = EmbeddingBatcher(
+    lambda texts: embedding_model.encode(texts),
+    max_batch_size=EMBEDDING_BATCH_SIZE,
+    max_wait_ms=EMBEDDING_BATCH_WAIT_MS
+)
+
 
 resume_prompt_template = PromptTemplate(
     input_variables=["resume_text"],
@@ -166,15 +414,29 @@ Only return the JSON — no explanation.
 """
 )
 
-def extract_resume_text(pdf_path):
+def extract_resume_pages(pdf_path):
     doc = fitz.open(pdf_path)
-    return "\n".join([page.get_text() for page in doc])
+    return [page.get_text() for page in doc]
+
+def extract_resume_text(pdf_path):
+    return "\n".join(extract_resume_pages(pdf_path))
+
+def prepare_resume_for_llm(pdf_path):
+    """Extract resume text and trim page furniture and low-value sections to the token budget."""
+    resume_text, report = prepare_resume_text(extract_resume_pages(pdf_path), RESUME_TOKEN_BUDGET)
+    print(f"Resume tokens: {report['tokens_before']} -> {report['tokens_after']} (dropped: {', '.join(report['dropped_sections']) or 'none'})")
+    return resume_text, report
+
+def resume_messages(resume_text):
+    return [HumanMessage(content=resume_prompt_template.format(resume_text=resume_text))]
 
 def parse_resume_with_llm(resume_text):
-    prompt = resume_prompt_template.format(resume_text=resume_text)
-    messages = [HumanMessage(content=prompt)]
-    response = llm.invoke(messages)
+    return parse_resume_response(llm_client.invoke(resume_messages(resume_text)))
+
+async def parse_resume_with_llm_async(resume_text):
+    return parse_resume_response(await llm_client.ainvoke(resume_messages(resume_text)))
 
+def parse_resume_response(response):
     try:
         json_str = response.content.strip()
         if json_str.startswith("```json") and json_str.endswith("```"):
@@ -185,13 +447,32 @@ def parse_resume_with_llm(resume_text):
         return {}
 
 
-def insert_job_into_db(data):
-    conn = get_db_connection()
+def feature_text(data, name):
+    """A parsed job field as text; missing values, None and NaN become "None"."""
+    value = data.get(name)
+    if value is None or (isinstance(value, float) and value != value):
+        return "None"
+    return str(value)
+
+def job_vector_row(job_id, data):
+    return {
+        "job_id": job_id,
+        "job_title": feature_text(data, "Job Title"),
+        "required_skills": feature_text(data, "Required Skills"),
+        "experience": feature_text(data, "Experience"),
+        "qualifications": feature_text(data, "Qualifications")
+    }
+
+def insert_job_into_db(data, conn=None):
+    """Insert a parsed job; with ``conn`` the caller commits and indexes the job's vectors."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
     cursor = conn.cursor()
 
     query = """
-    INSERT INTO jobs (job_title, company, location, required_skills, experience, qualifications, responsibilities, benefits, other_details)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    INSERT INTO jobs (job_title, company, location, required_skills, experience, qualifications, responsibilities, benefits, other_details, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
     """
     values = (
         data.get("Job Title", "None"),
@@ -207,8 +488,13 @@ def insert_job_into_db(data):
 
     cursor.execute(query, values)
     job_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    skills = index_skills(cursor, "job", job_id, values[3])
+    add_job_to_facets(cursor, values[1], values[2], skills)
+    bump_cache_version(cursor, "jobs")
+    if own_conn:
+        conn.commit()
+        conn.close()
+        index_vectors("job", JOB_VECTOR_FIELDS, [job_vector_row(job_id, data)], "job_id")
     
     return job_id
 
@@ -238,29 +524,68 @@ Only return the JSON — no explanation.
 """
 )
 
+job_batch_prompt_template = PromptTemplate(
+    input_variables=["jobs_text"],
+    template="""
+You are an expert job description parser. Each job description below is introduced by a line "### Row <row_id>".
+Extract structured information from every job description separately.
+
+{jobs_text}
+
+Return a JSON array with exactly one object per job description, in this format:
+[
+    {{
+        "row_id": <row_id>,
+        "Job Title": "",
+        "Company": "",
+        "Location": "",
+        "Required Skills": "",
+        "Experience": "",
+        "Qualifications": "",
+        "Responsibilities": "",
+        "Benefits": "",
+        "Other Details": ""
+    }}
+]
+All the fields except row_id should be comma seperated strings.
+Ensure all values are extracted if available, else return the string "Not mentioned".
+Only return the JSON array — no explanation.
+"""
+)
+job_batch_overhead = estimate_tokens(job_batch_prompt_template.format(jobs_text=""))
+
+def extract_job_features_batch(rows):
+    """Parse several job descriptions with one LLM call.
+
+    ``rows`` is a list of (row_id, job_text). Items the batched response is
+    missing or got malformed are re-parsed individually; returns
+    ``{row_id: features}``.
+    """
+    if len(rows) == 1:
+        return {rows[0][0]: extract_job_features(rows[0][1])}
+
+    prompt = job_batch_prompt_template.format(jobs_text=format_job_batch(rows))
+    results = parse_job_batch(llm_client.invoke([HumanMessage(content=prompt)]).content, rows)
+    for row_id, job_text in rows:
+        if row_id not in results:
+            results[row_id] = extract_job_features(job_text)
+    return results
+
+def job_messages(job_text):
+    return [HumanMessage(content=job_prompt_template.format(job_text=job_text))]
+
 def extract_job_features(job_text):
-    prompt = job_prompt_template.format(job_text=job_text)
-    messages = [HumanMessage(content=prompt)]
-    response = llm.invoke(messages)
-    
+    return parse_job_response(llm_client.invoke(job_messages(job_text)))
+
+async def extract_job_features_async(job_text):
+    return parse_job_response(await llm_client.ainvoke(job_messages(job_text)))
+
+def parse_job_response(response):
     try:
-        json_str = response.content.strip()
-        if json_str.startswith("```json") and json_str.endswith("```"):
-            json_str = json_str[len("```json"):].rstrip("```").strip()
-        return json.loads(json_str)
+        return json.loads(strip_json_fence(response.content))
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON response: {e}")
-        return {
-            "Job Title": "",
-            "Company": "",
-            "Location": "",
-            "Required Skills": "",
-            "Experience": "",
-            "Qualifications": "",
-            "Responsibilities": "",
-            "Benefits": "",
-            "Other Details": ""
-        }
+        return {field: "" for field in JOB_FEATURE_FIELDS}
 
 def insert_candidate_into_db(data):
     """Insert or update parsed resume data into SQLite database."""
@@ -278,7 +603,8 @@ def insert_candidate_into_db(data):
         # Update existing record
         query = """
         UPDATE candidates
-        SET name = ?, phone = ?, linkedin = ?, skills = ?, qualifications = ?, projects = ?, experience = ?
+        SET name = ?, phone = ?, linkedin = ?, skills = ?, qualifications = ?, projects = ?, experience = ?,
+            updated_at = datetime('now')
         WHERE email = ?
         """
         values = (
@@ -297,8 +623,8 @@ def insert_candidate_into_db(data):
     else:
         # Insert new record
         query = """
-        INSERT INTO candidates (name, email, phone, linkedin, skills, qualifications, projects, experience)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO candidates (name, email, phone, linkedin, skills, qualifications, projects, experience, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
         """
         values = (
             data.get("Name", "None"),
@@ -312,27 +638,39 @@ def insert_candidate_into_db(data):
         )
         cursor.execute(query, values)
         candidate_id = cursor.lastrowid
-    
+
+    index_skills(cursor, "candidate", candidate_id, data.get("Required Skills", "None"))
+    bump_cache_version(cursor, "candidates")
     conn.commit()
     conn.close()
+
+    index_vectors("candidate", CANDIDATE_VECTOR_FIELDS, [{
+        "candidate_id": candidate_id,
+        "skills": data.get("Required Skills", "None"),
+        "qualifications": data.get("Qualifications", "None"),
+        "projects": data.get("Projects", "None"),
+        "experience": data.get("Experience", "None")
+    }], "candidate_id")
     
     return candidate_id
 
 
 def get_embedding(text):
-    return embedding_model.encode(text if text else "", convert_to_tensor=True)
+    return embedding_service.encode(text if text else "")
 
-def compute_similarity(text1, text2):
-    emb1 = get_embedding(text1)
-    emb2 = get_embedding(text2)
+def get_embeddings(texts):
+    return embedding_service.encode_many([text if text else "" for text in texts])
+
+def compute_similarity(text1, text2, embed=None):
+    emb1, emb2 = (embed or get_embeddings)([text1, text2])
     
     return float(util.cos_sim(emb1, emb2)) * 100
 
-def calculate_eligibility(candidate, job):
-    skill_score = compute_similarity(candidate["skills"], job["required_skills"])
-    education_score = compute_similarity(candidate["qualifications"], job["qualifications"])
-    project_score = compute_similarity(candidate["projects"], job["job_title"])  
-    experience_score = compute_similarity(candidate["experience"], job["experience"])
+def calculate_eligibility(candidate, job, embed=None):
+    skill_score = compute_similarity(candidate["skills"], job["required_skills"], embed)
+    education_score = compute_similarity(candidate["qualifications"], job["qualifications"], embed)
+    project_score = compute_similarity(candidate["projects"], job["job_title"], embed)
+    experience_score = compute_similarity(candidate["experience"], job["experience"], embed)
 
     eligibility_score = (
         0.4 * skill_score +
@@ -342,7 +680,154 @@ def calculate_eligibility(candidate, job):
     )
     return skill_score, education_score, project_score, experience_score, eligibility_score
 
+def index_vectors(kind, fields, rows, id_key, store=None, encode=None, cursor=None):
+    """Embed the given fields of each row in one batch and store them in the vector store.
+
+    Without ``store`` and ``encode`` the active embedding version is used.
+    Callers inside a write transaction pass its ``cursor`` so the staging
+    cleanup joins that transaction instead of waiting on its lock.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    if store is None:
+        sync_embedding_version()
+    texts = [row[field] or "" for row in rows for field in fields]
+    embeddings = np.asarray((encode or get_embeddings)(texts)).reshape(len(rows), len(fields), -1)
+    row_ids = [row[id_key] for row in rows]
+    for i, field in enumerate(fields):
+        (store or vector_store).matrix(kind, field).upsert(row_ids, embeddings[:, i])
+    if store is None:
+        invalidate_building_vectors(kind, fields, row_ids, cursor)
+
+def invalidate_building_vectors(kind, fields, ids, cursor=None):
+    """Drop re-indexed rows from a version being built so its catch-up pass re-encodes them."""
+    conn = None if cursor else get_db_connection()
+    cursor = cursor or conn.cursor()
+    # The staging delete takes the write lock before the building version is read, so
+    # the switch-over can't commit between that read and dropping the vectors below
+    cursor.executemany(f"DELETE FROM scores_staging WHERE {kind}_id = ?", [(i,) for i in ids])
+    building = building_version(cursor)
+    if building and building["dim"] and building["version"] != embedding_version:
+        store = VectorStore(building["store_dir"], building["dim"], VECTOR_STORE_DTYPE)
+        for field in fields:
+            store.matrix(kind, field).delete(ids)
+    if conn:
+        conn.commit()
+        conn.close()
+
+def missing_vector_ids(kind, fields, ids, store=None):
+    if store is None:
+        sync_embedding_version()
+    matrices = [(store or vector_store).matrix(kind, field) for field in fields]
+    for matrix in matrices:
+        matrix.refresh()
+    return {i for i in ids if any(i not in matrix for matrix in matrices)}
+
+def get_candidate_vectors(candidate_id, candidate, cursor=None):
+    if missing_vector_ids("candidate", CANDIDATE_VECTOR_FIELDS, [candidate_id]):
+        index_vectors("candidate", CANDIDATE_VECTOR_FIELDS, [dict(candidate, candidate_id=candidate_id)], "candidate_id", cursor=cursor)
+    return {field: vector_store.matrix("candidate", field).get(candidate_id) for field in CANDIDATE_VECTOR_FIELDS}
+
+def score_jobs(candidate_vectors, job_ids, store=None):
+    """Vectorized eligibility scores of one candidate against many jobs."""
+    columns = {}
+    eligibility = np.zeros(len(job_ids), dtype=np.float64)
+    for candidate_field, job_field, weight, column in MATCH_FIELDS:
+        _, similarity = (store or vector_store).matrix("job", job_field).cosine(candidate_vectors[candidate_field], vector_ids=job_ids)
+        columns[column] = similarity.astype(np.float64) * 100
+        eligibility += weight * columns[column]
+    columns["eligibility_score"] = eligibility
+    return columns
+
+SCORE_INSERT_QUERY = """
+    INSERT INTO scores (
+        candidate_id, job_id,
+        skill_score, education_score,
+        project_relevance_score, experience_score,
+        eligibility_score, model_version
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def score_rows(candidate_id, job_ids, scores, indices):
+    return [
+        (
+            candidate_id, job_ids[i],
+            float(scores["skill_score"][i]), float(scores["education_score"][i]),
+            float(scores["project_relevance_score"][i]), float(scores["experience_score"][i]),
+            float(scores["eligibility_score"][i])
+        )
+        for i in indices
+    ]
+
+def retained_indices(cursor, candidate_id, job_ids, scores):
+    """Indices of the scores to persist: all of them, or the top K plus jobs applied to.
+
+    Jobs without a stored vector score nan and are never persisted.
+    """
+    eligibility = scores["eligibility_score"]
+    scored = np.nonzero(np.isfinite(eligibility))[0].tolist()
+    if SCORE_RETENTION_TOP_K <= 0:
+        return scored
+    cursor.execute("SELECT job_id FROM applications WHERE candidate_id = ?", (candidate_id,))
+    applied = {row["job_id"] for row in cursor.fetchall()}
+    top = heapq.nlargest(SCORE_RETENTION_TOP_K, scored, key=eligibility.__getitem__)
+    return sorted(set(top) | {i for i in scored if job_ids[i] in applied})
+
+def retain_application_score(cursor, candidate_id, job_id):
+    """Make sure an applied-to job has a score row when score retention is bounded.
+
+    Runs inside the caller's write transaction; everything goes through that connection.
+    """
+    if SCORE_RETENTION_TOP_K <= 0:
+        return
+    # Some callers use plain tuple cursors
+    cursor = cursor.connection.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute("SELECT 1 FROM scores WHERE candidate_id = ? AND job_id = ?", (candidate_id, job_id))
+    if cursor.fetchone():
+        return
+
+    cursor.execute("SELECT * FROM candidates WHERE candidate_id = ?", (candidate_id,))
+    candidate = cursor.fetchone()
+    cursor.execute("SELECT job_id, job_title, required_skills, experience, qualifications FROM jobs WHERE job_id = ? AND archived_at IS NULL", (job_id,))
+    job = cursor.fetchone()
+    if not candidate or not job:
+        return
+
+    # The caller's write transaction is open: reuse its cursor for the staging cleanup
+    if missing_vector_ids("job", JOB_VECTOR_FIELDS, [job_id]):
+        index_vectors("job", JOB_VECTOR_FIELDS, [dict(job)], "job_id", cursor=cursor)
+    candidate_data = {field: candidate[field] or "" for field in CANDIDATE_VECTOR_FIELDS}
+    scores = score_jobs(get_candidate_vectors(candidate_id, candidate_data, cursor), [job_id])
+    if not np.isfinite(scores["eligibility_score"][0]):
+        return
+    cursor.executemany(SCORE_INSERT_QUERY, [row + (embedding_version,) for row in score_rows(candidate_id, [job_id], scores, [0])])
+    bump_cache_version(cursor, "scores")
+
+def archive_inactive_jobs(force=False):
+    """Archive closed and expired jobs, checking at most every JOB_ARCHIVE_CHECK_SECONDS."""
+    global job_archive_checked
+    if not force and time.monotonic() - job_archive_checked < JOB_ARCHIVE_CHECK_SECONDS:
+        return []
+    job_archive_checked = time.monotonic()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    job_ids = jobs_to_archive(cursor)
+    for job_id in job_ids:
+        archive_job(cursor, job_id)
+    if job_ids:
+        bump_cache_version(cursor, "jobs", "scores")
+    conn.commit()
+    conn.close()
+    for field in JOB_VECTOR_FIELDS:
+        vector_store.matrix("job", field).delete(job_ids)
+    return job_ids
+
+job_archive_checked = 0.0
+
 def process_candidate_job_matching(candidate_id):
+    archive_inactive_jobs()
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -362,49 +847,279 @@ def process_candidate_job_matching(candidate_id):
     }
 
     
-    cursor.execute("SELECT * FROM jobs")
-    jobs = cursor.fetchall()
+    job_query = f"SELECT job_id, job_title, required_skills, experience, qualifications FROM jobs WHERE {active_job_condition()}"
+    if SKILL_PREFILTER_MIN_OVERLAP > 0:
+        # Only score jobs sharing enough normalized skills with the candidate
+        overlapping = list(overlap_scores(cursor, "job", get_skills(cursor, "candidate", candidate_id), SKILL_PREFILTER_MIN_OVERLAP))
+        jobs = []
+        for start in range(0, len(overlapping), 500):
+            chunk = overlapping[start:start + 500]
+            cursor.execute(f"{job_query} AND job_id IN ({', '.join('?' * len(chunk))})", chunk)
+            jobs.extend(dict(row) for row in cursor.fetchall())
+    else:
+        cursor.execute(job_query)
+        jobs = [dict(row) for row in cursor.fetchall()]
+    job_ids = [job["job_id"] for job in jobs]
+
+    missing = missing_vector_ids("job", JOB_VECTOR_FIELDS, job_ids)
+    index_vectors("job", JOB_VECTOR_FIELDS, [job for job in jobs if job["job_id"] in missing], "job_id")
+
+    scores = score_jobs(get_candidate_vectors(candidate_id, candidate), job_ids)
+
+    keep = retained_indices(cursor, candidate_id, job_ids, scores)
 
     
     cursor.execute("DELETE FROM scores WHERE candidate_id = ?", (candidate_id,))
+    cursor.executemany(SCORE_INSERT_QUERY, [row + (embedding_version,) for row in score_rows(candidate_id, job_ids, scores, keep)])
+    bump_cache_version(cursor, "scores")
+
     conn.commit()
+    conn.close()
+    return True, "Job matching processed successfully"
 
-    
-    for job in jobs:
-        job_id = job["job_id"]
-        job_data = {
-            "job_title": job["job_title"] or "",
-            "required_skills": job["required_skills"] or "",
-            "experience": job["experience"] or "",
-            "qualifications": job["qualifications"] or ""
-        }
 
-        skill_score, education_score, project_score, experience_score, eligibility_score = calculate_eligibility(candidate, job_data)
-        
-        
-        cursor.execute("""
-            INSERT INTO scores (
-                candidate_id, job_id,
-                skill_score, education_score,
-                project_relevance_score, experience_score,
-                eligibility_score
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            candidate_id, job_id,
-            skill_score, education_score,
-            project_score, experience_score,
-            eligibility_score
-        ))
+def parse_job_rows(rows):
+    features = {}
+    for batch in pack_job_batches(rows, JOB_BATCH_TOKEN_BUDGET, JOB_BATCH_MAX_ITEMS, job_batch_overhead):
+        features.update(extract_job_features_batch(batch))
+    return features
 
+def new_job_import(file_path, processed_jobs=None):
+    """Chunked importer for a job CSV that indexes each committed chunk's vectors."""
+    def on_chunk_committed(inserted):
+        try:
+            index_vectors("job", JOB_VECTOR_FIELDS, [job_vector_row(job_id, features) for job_id, features in inserted], "job_id")
+        except Exception as e:
+            # The chunk is already committed; matching and rematch embed jobs that have no vectors
+            print(f"Indexing vectors for {len(inserted)} imported jobs failed, leaving them to be embedded on demand: {e}")
+        if processed_jobs is not None:
+            processed_jobs.extend({"job_id": job_id, "job_title": features["Job Title"]} for job_id, features in inserted)
+
+    return JobFeedImport(
+        DB_PATH, file_path, parse_job_rows,
+        lambda conn, features: insert_job_into_db(features, conn),
+        on_chunk_committed,
+        chunk_size=JOB_IMPORT_CHUNK_SIZE
+    )
+
+def run_job_import(job_import, deferred=False):
+    """Run an import to completion, deferring it while the LLM is unavailable.
+
+    A replay from the deferred queue (``deferred``) re-raises instead, so the
+    queue retries the same item rather than enqueueing another one.
+    """
+    try:
+        status = job_import.run()
+    except LLMUnavailableError:
+        if deferred:
+            raise
+        deferred_llm_work.enqueue("job_import", {"file_path": job_import.file_path})
+        return job_import.status()
+    rematch_all_candidates()
+    return status
+
+def rematch_all_candidates():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT candidate_id FROM candidates")
+    candidates = [row['candidate_id'] for row in cursor.fetchall()]
+    conn.close()
+
+    for candidate_id in candidates:
+        process_candidate_job_matching(candidate_id)
+
+def process_deferred_resume(payload):
+    parsed_data = parse_resume_with_llm(prepare_resume_for_llm(payload["file_path"])[0])
+    if not parsed_data:
+        raise ValueError("Failed to parse resume")
+    process_candidate_job_matching(insert_candidate_into_db(parsed_data))
+
+def process_deferred_job(payload):
+    job_features = extract_job_features(payload["job_description"])
+    job_features["Job Title"] = payload["job_title"]
+    insert_job_into_db(job_features)
+    rematch_all_candidates()
+
+deferred_llm_work.register("resume", process_deferred_resume)
+deferred_llm_work.register("job_description", process_deferred_job)
+deferred_llm_work.register("job_import", lambda payload: run_job_import(new_job_import(payload["file_path"]), deferred=True))
+
+def start_embedding_reindex(model_name, backend, background=True):
+    """Build the embedding version of a model while the active one keeps serving.
+
+    Returns the version id; the switch-over happens once every job and
+    candidate has been re-encoded and rescored.
+    """
+    global embedding_reindexer
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    version = request_version(cursor, model_name, backend, os.path.join(VECTOR_STORE_DIR, version_id(model_name, backend)))
     conn.commit()
+    row = get_version(cursor, version)
     conn.close()
-    return True, "Job matching processed successfully"
+    if row["status"] != 'building' or (embedding_reindexer and embedding_reindexer.version == version and embedding_reindexer.running):
+        return version
+
+    model, store = load_embedding_version(row)
+    fields = {"candidate": CANDIDATE_VECTOR_FIELDS, "job": JOB_VECTOR_FIELDS}
+
+    def encode_rows(kind, rows):
+        index_vectors(kind, fields[kind], rows, f"{kind}_id", store=store, encode=lambda texts: model.encode(texts, batch_size=EMBEDDING_BATCH_SIZE))
+
+    def stage_scores(cursor, candidate, job_ids):
+        candidate_id = candidate["candidate_id"]
+        if job_ids is None:
+            cursor.execute("SELECT job_id FROM jobs WHERE archived_at IS NULL")
+            job_ids = [r["job_id"] for r in cursor.fetchall()]
+        # Jobs added after the job phase are encoded and staged by the catch-up pass
+        missing = missing_vector_ids("job", JOB_VECTOR_FIELDS, job_ids, store)
+        job_ids = [job_id for job_id in job_ids if job_id not in missing]
+        if not job_ids:
+            return []
+        if missing_vector_ids("candidate", CANDIDATE_VECTOR_FIELDS, [candidate_id], store):
+            encode_rows("candidate", [candidate])
+        vectors = {field: store.matrix("candidate", field).get(candidate_id) for field in CANDIDATE_VECTOR_FIELDS}
+        scores = score_jobs(vectors, job_ids, store)
+        return score_rows(candidate_id, job_ids, scores, retained_indices(cursor, candidate_id, job_ids, scores))
+
+    embedding_reindexer = EmbeddingReindexer(
+        DB_PATH, version, encode_rows,
+        missing_ids=lambda kind, ids: missing_vector_ids(kind, fields[kind], ids, store),
+        stage_scores=stage_scores,
+        on_activated=lambda active: use_embedding_version(active, (model, store)),
+        batch_size=EMBEDDING_REINDEX_BATCH_SIZE,
+        pause_seconds=EMBEDDING_REINDEX_PAUSE_SECONDS
+    )
+    if background:
+        embedding_reindexer.start()
+    else:
+        embedding_reindexer.run()
+    return version
+
+def resume_embedding_reindex():
+    conn = get_db_connection()
+    building = building_version(conn.cursor())
+    conn.close()
+    if building:
+        start_embedding_reindex(building["model_name"], building["backend"])
+    elif EMBEDDING_AUTO_REINDEX and version_id(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND) != embedding_version:
+        print(f"Embedding model changed to {EMBEDDING_MODEL_NAME}; re-indexing in the background")
+        start_embedding_reindex(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND)
+
+background_workers_lock = threading.Lock()
+background_workers_started = False
 
+def start_background_workers():
+    """Start the outbox sender, deferred LLM work, any pending re-index and the
+    rerank model load, once per serving process.
+
+    Only the server entry points call this, so CLI commands that import the
+    app never start worker threads of their own.
+    """
+    global background_workers_started
+    with background_workers_lock:
+        if background_workers_started:
+            return
+        background_workers_started = True
+    outbox_sender.start()
+    deferred_llm_work.start()
+    resume_embedding_reindex()
+    reranker.preload()
+
+@app.before_request
+def ensure_background_workers():
+    if not background_workers_started:
+        start_background_workers()
+
+def candidate_rerank_text(candidate):
+    return f"Skills: {candidate['skills']}. Experience: {candidate['experience']}. Projects: {candidate['projects']}. Qualifications: {candidate['qualifications']}"
+
+def job_rerank_text(job):
+    return f"{job['job_title']}. Required skills: {job['required_skills']}. Qualifications: {job['qualifications']}. Experience: {job['experience']}"
+
+def rerank_matches(matches, candidate_for, job_for):
+    """Reorder stage-one matches by cross-encoder score.
+
+    Returns ``(matches, reranked)``; when the latency budget runs out the
+    stage-one order is kept and ``reranked`` is False.
+    """
+    pairs = []
+    for match in matches:
+        candidate = candidate_for(match)
+        job = job_for(match)
+        pairs.append((
+            content_version(*(candidate[f] for f in CANDIDATE_VECTOR_FIELDS)),
+            content_version(*(job[f] for f in JOB_VECTOR_FIELDS)),
+            candidate_rerank_text(candidate),
+            job_rerank_text(job)
+        ))
+
+    scores = reranker.rerank(pairs)
+    if scores is None:
+        return matches, False
+
+    for match, score in zip(matches, scores):
+        match["rerank_score"] = score
+    return sorted(matches, key=lambda m: m["rerank_score"], reverse=True), True
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "ok", "message": "API is running"})
 
+@app.route('/api/metrics/outbox', methods=['GET'])
+def outbox_metrics():
+    """Get email outbox message counts by status"""
+    conn = get_db_connection()
+    stats = outbox_stats(conn.cursor())
+    conn.close()
+    return jsonify(stats)
+
+@app.route('/api/metrics/llm', methods=['GET'])
+def llm_metrics():
+    """Get LLM timeout, retry, hedge and circuit breaker metrics"""
+    conn = get_db_connection()
+    deferred = deferred_llm_work.stats(conn.cursor())
+    conn.close()
+    return jsonify({**llm_client.stats(), "deferred_work": deferred})
+
+@app.route('/api/admin/embeddings', methods=['GET'])
+def embedding_versions_status():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT version FROM embedding_versions ORDER BY started_at DESC")
+    versions = [version_progress(cursor, row["version"]) for row in cursor.fetchall()]
+    cursor.execute("SELECT model_version, COUNT(*) AS count FROM scores GROUP BY model_version")
+    scores_by_version = {row["model_version"]: row["count"] for row in cursor.fetchall()}
+    conn.close()
+    return jsonify({
+        "serving": embedding_version,
+        "versions": versions,
+        "scores_by_version": scores_by_version
+    })
+
+@app.route('/api/admin/embeddings/reindex', methods=['POST'])
+def reindex_embeddings():
+    data = request.json or {}
+    model_name = data.get("model_name") or EMBEDDING_MODEL_NAME
+    backend = data.get("backend") or EMBEDDING_BACKEND
+    if backend not in EMBEDDING_BACKENDS:
+        return jsonify({"error": f"backend must be one of {', '.join(EMBEDDING_BACKENDS)}"}), 400
+
+    try:
+        version = start_embedding_reindex(model_name, backend)
+    except Exception as e:
+        return jsonify({"error": f"Could not start re-index: {str(e)}"}), 400
+
+    conn = get_db_connection()
+    progress = version_progress(conn.cursor(), version)
+    conn.close()
+    return jsonify(progress), 202
+
+@app.route('/api/metrics/embedding', methods=['GET'])
+def embedding_metrics():
+    """Get achieved embedding batch sizes"""
+    return jsonify({**embedding_service.stats(), "skill_explainer": skill_explainer.stats()})
+
 @app.route('/api/candidates', methods=['GET'])
 def get_candidates():
     conn = get_db_connection()
@@ -428,11 +1143,19 @@ def get_candidate(candidate_id):
     else:
         return jsonify({"error": "Candidate not found"}), 404
 
+def job_status_condition(status):
+    """SQL condition for ``?status=active|closed|all`` (default active), or None if unknown."""
+    return {"active": active_job_condition(), "closed": f"NOT ({active_job_condition()})", "all": "1=1"}.get(status)
+
 @app.route('/api/jobs', methods=['GET'])
+@response_cache.cached("jobs", validators=[EXPIRED_JOBS_SQL])
 def get_jobs():
+    condition = job_status_condition(request.args.get('status', 'active'))
+    if condition is None:
+        return jsonify({"error": "status must be active, closed or all"}), 400
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM jobs")
+    cursor.execute(f"SELECT * FROM jobs WHERE {condition}")
     jobs = [dict(row) for row in cursor.fetchall()]
     conn.close()
     return jsonify({"jobs": jobs})
@@ -451,6 +1174,185 @@ def get_job(job_id):
     else:
         return jsonify({"error": "Job not found"}), 404
 
+@app.route('/api/jobs/<int:job_id>/candidates', methods=['GET'])
+def rank_job_candidates(job_id):
+    """Rank candidates for a job, optionally narrowed by must-have skills and skill overlap"""
+    limit = request.args.get('limit', default=20, type=int)
+    min_overlap = request.args.get('min_overlap', default=0, type=int)
+    must_have = request.args.get('must_have', '')
+    rerank = request.args.get('rerank', default=0, type=int)
+    stage_one_limit = max(limit, request.args.get('rerank_n', default=RERANK_TOP_N, type=int)) if rerank else limit
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+    job = cursor.fetchone()
+    if not job:
+        conn.close()
+        return jsonify({"error": "Job not found"}), 404
+
+    job_skills = get_skills(cursor, "job", job_id)
+    allowed = filter_by_skills(cursor, "candidate", must_have) if must_have else None
+    overlap = None
+    if min_overlap > 0:
+        # Filtering needs the overlap of every candidate; otherwise only the returned ones are scored below
+        overlap = overlap_scores(cursor, "candidate", job_skills, min_overlap)
+        allowed = set(overlap) if allowed is None else allowed & set(overlap)
+
+    # Archived jobs keep their last scores in scores_archive
+    query = f"""
+        SELECT s.*, c.name, c.email, c.skills, c.qualifications, c.projects, c.experience
+        FROM {'scores_archive' if job['archived_at'] else 'scores'} s
+        JOIN candidates c ON s.candidate_id = c.candidate_id
+        WHERE s.job_id = ?
+    """
+    if allowed is not None:
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS skill_filter (candidate_id INTEGER PRIMARY KEY)")
+        cursor.executemany("INSERT OR IGNORE INTO skill_filter (candidate_id) VALUES (?)", [(i,) for i in allowed])
+        query += " AND s.candidate_id IN (SELECT candidate_id FROM skill_filter)"
+    query += " ORDER BY s.eligibility_score DESC LIMIT ?"
+
+    cursor.execute(query, (job_id, stage_one_limit))
+    rows = cursor.fetchall()
+    if overlap is None:
+        overlap = overlap_scores(cursor, "candidate", job_skills, ids=[row["candidate_id"] for row in rows])
+    candidates = []
+    for row in rows:
+        candidate = dict(row)
+        skill_overlap = overlap.get(candidate["candidate_id"], {})
+        candidate["matched_skills"] = skill_overlap.get("matched_skills", [])
+        candidate["skill_jaccard"] = skill_overlap.get("jaccard", 0.0)
+        candidate["skill_bm25"] = skill_overlap.get("bm25", 0.0)
+        candidates.append(candidate)
+    ranks = [None] * len(candidates) if job["archived_at"] else many_job_ranks(cursor, [(job_id, c["eligibility_score"]) for c in candidates])
+    for candidate, rank in zip(candidates, ranks):
+        candidate["rank"] = rank
+    conn.close()
+
+    reranked = False
+    if rerank:
+        job_data = {f: job[f] or "" for f in JOB_VECTOR_FIELDS}
+        candidates, reranked = rerank_matches(candidates, lambda c: {f: c[f] or "" for f in CANDIDATE_VECTOR_FIELDS}, lambda c: job_data)
+
+    return jsonify({
+        "job_id": job_id,
+        "job_title": job["job_title"],
+        "required_skills": job_skills,
+        "candidates": candidates[:limit],
+        "reranked": reranked
+    })
+
+@app.route('/api/jobs/<int:job_id>/status', methods=['PUT'])
+def update_job_status(job_id):
+    """Open or close a job and/or set its expiry; closed and expired jobs are archived at once."""
+    data = request.get_json() or {}
+    status = data.get('status')
+    if status is not None and status not in JOB_STATUSES:
+        return jsonify({"error": f"status must be one of {', '.join(JOB_STATUSES)}"}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+    job = cursor.fetchone()
+    if not job:
+        conn.close()
+        return jsonify({"error": "Job not found"}), 404
+
+    expires_at = job['expires_at']
+    if 'expires_at' in data:
+        expires_at = data['expires_at'] and cursor.execute("SELECT datetime(?)", (data['expires_at'],)).fetchone()[0]
+        if data['expires_at'] and expires_at is None:
+            conn.close()
+            return jsonify({"error": "expires_at must be a date or datetime"}), 400
+    cursor.execute(
+        "UPDATE jobs SET status = ?, expires_at = ?, closed_at = CASE WHEN ? = 'closed' THEN COALESCE(closed_at, datetime('now')) END, "
+        "updated_at = datetime('now') WHERE job_id = ?",
+        (status or job['status'], expires_at, status or job['status'], job_id)
+    )
+    cursor.execute(f"SELECT 1 FROM jobs WHERE job_id = ? AND {active_job_condition()}", (job_id,))
+    active = cursor.fetchone() is not None
+    restored = active and job['archived_at'] is not None
+    if restored:
+        unarchive_job(cursor, job_id)
+        skills = index_skills(cursor, "job", job_id, job['required_skills'])
+        add_job_to_facets(cursor, job['company'], job['location'], skills)
+    bump_cache_version(cursor, "jobs")
+    conn.commit()
+    conn.close()
+
+    archived = [] if active else archive_inactive_jobs(force=True)
+    if restored:
+        index_vectors("job", JOB_VECTOR_FIELDS, [job_vector_row(job_id, {
+            "Job Title": job['job_title'],
+            "Required Skills": job['required_skills'],
+            "Experience": job['experience'],
+            "Qualifications": job['qualifications']
+        })], "job_id")
+        rematch_all_candidates()
+
+    return jsonify({
+        "job_id": job_id,
+        "status": status or job['status'],
+        "expires_at": expires_at,
+        "active": active,
+        "archived": job_id in archived or (not active and job['archived_at'] is not None),
+        "rescored": restored
+    })
+
+@app.route('/api/jobs/<int:job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT job_id FROM jobs WHERE job_id = ?", (job_id,))
+    if not cursor.fetchone():
+        conn.close()
+        return jsonify({"error": "Job not found"}), 404
+
+    cursor.execute("SELECT COUNT(*) FROM applications WHERE job_id = ?", (job_id,))
+    if cursor.fetchone()[0]:
+        conn.close()
+        return jsonify({"error": "Job has applications and cannot be deleted"}), 409
+
+    remove_job_from_facets(cursor, job_id)
+    cursor.execute("DELETE FROM scores WHERE job_id = ?", (job_id,))
+    cursor.execute("DELETE FROM scores_archive WHERE job_id = ?", (job_id,))
+    cursor.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+    cursor.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+    bump_cache_version(cursor, "jobs", "scores")
+    conn.commit()
+    conn.close()
+
+    for field in JOB_VECTOR_FIELDS:
+        vector_store.matrix("job", field).delete([job_id])
+
+    return jsonify({"message": "Job deleted successfully", "job_id": job_id})
+
+def resume_upload_result(candidate_id, parsed_data, trim_report, matching):
+    success, message = matching
+    if success:
+        return {
+            "message": "Resume uploaded and processed successfully",
+            "candidate_id": candidate_id,
+            "parsed_data": parsed_data,
+            "resume_tokens": {"before": trim_report["tokens_before"], "after": trim_report["tokens_after"]}
+        }, 200
+    return {
+        "message": "Resume uploaded but matching failed",
+        "candidate_id": candidate_id,
+        "parsed_data": parsed_data,
+        "error": message
+    }, 500
+
+def queued_llm_work(kind, payload, label):
+    work_id = deferred_llm_work.enqueue(kind, payload)
+    return {
+        "message": f"{label} queued until the parsing service recovers",
+        "queued": True,
+        "work_id": work_id
+    }, 202
+
 @app.route('/api/upload/resume', methods=['POST'])
 def upload_resume():
     if 'file' not in request.files:
@@ -467,7 +1369,7 @@ def upload_resume():
         
         
         try:
-            resume_text = extract_resume_text(file_path)
+            resume_text, trim_report = prepare_resume_for_llm(file_path)
             parsed_data = parse_resume_with_llm(resume_text)
             
             if parsed_data:
@@ -475,23 +1377,13 @@ def upload_resume():
                 candidate_id = insert_candidate_into_db(parsed_data)
                 
                 
-                success, message = process_candidate_job_matching(candidate_id)
-                
-                if success:
-                    return jsonify({
-                        "message": "Resume uploaded and processed successfully",
-                        "candidate_id": candidate_id,
-                        "parsed_data": parsed_data
-                    })
-                else:
-                    return jsonify({
-                        "message": "Resume uploaded but matching failed",
-                        "candidate_id": candidate_id,
-                        "parsed_data": parsed_data,
-                        "error": message
-                    }), 500
+                body, status = resume_upload_result(candidate_id, parsed_data, trim_report, process_candidate_job_matching(candidate_id))
+                return jsonify(body), status
             else:
                 return jsonify({"error": "Failed to parse resume"}), 500
+        except LLMUnavailableError:
+            body, status = queued_llm_work("resume", {"file_path": file_path}, "Resume")
+            return jsonify(body), status
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
@@ -549,20 +1441,16 @@ def upload_job_description():
             job_id = insert_job_into_db(job_features)
             
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT candidate_id FROM candidates")
-            candidates = [row['candidate_id'] for row in cursor.fetchall()]
-            conn.close()
-            
-            for candidate_id in candidates:
-                process_candidate_job_matching(candidate_id)
+            rematch_all_candidates()
             
             return jsonify({
                 "message": "Job description processed successfully",
                 "job_id": job_id,
                 "parsed_data": job_features
             })
+        except LLMUnavailableError:
+            body, status = queued_llm_work("job_description", {"job_title": job_title, "job_description": job_description}, "Job description")
+            return jsonify(body), status
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
@@ -576,44 +1464,61 @@ def upload_job_description():
         file_path = os.path.join(UPLOAD_FOLDER, file.filename)
         file.save(file_path)
         
+        processed_jobs = []
+        job_import = new_job_import(file_path, processed_jobs)
         try:
-            df = pd.read_csv(file_path, encoding='ISO-8859-1')
-            
-            if 'Job Title' not in df.columns or 'Job Description' not in df.columns:
-                return jsonify({"error": "CSV must contain 'Job Title' and 'Job Description' columns"}), 400
-            
-            processed_jobs = []
-            for _, row in df.iterrows():
-                job_title = row['Job Title']
-                job_description = row['Job Description']
-                
-                
-                job_features = extract_job_features(job_description)
-                job_features["Job Title"] = job_title
-                
-                
-                job_id = insert_job_into_db(job_features)
-                processed_jobs.append({"job_id": job_id, "job_title": job_title})
-            
-            
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT candidate_id FROM candidates")
-            candidates = [row['candidate_id'] for row in cursor.fetchall()]
-            conn.close()
-            
-            for candidate_id in candidates:
-                process_candidate_job_matching(candidate_id)
-            
+            import_id = job_import.start()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        if request.args.get('async', default=0, type=int):
+            threading.Thread(target=run_job_import, args=(job_import,), daemon=True).start()
             return jsonify({
-                "message": f"Processed {len(processed_jobs)} jobs from CSV",
-                "processed_jobs": processed_jobs
-            })
+                "message": "CSV import started",
+                "import_id": import_id,
+                "progress_url": f"/api/imports/{import_id}"
+            }), 202
+        
+        try:
+            status = run_job_import(job_import)
         except Exception as e:
-            return jsonify({"error": str(e)}), 500
+            return jsonify({"error": str(e), "import_id": import_id}), 500
+        
+        if status["status"] != "completed":
+            return jsonify({
+                "message": f"Processed {len(processed_jobs)} jobs from CSV; the rest is queued until the parsing service recovers",
+                "import_id": import_id,
+                "processed_jobs": processed_jobs,
+                "import": status
+            }), 202
+        
+        return jsonify({
+            "message": f"Processed {len(processed_jobs)} jobs from CSV",
+            "import_id": import_id,
+            "processed_jobs": processed_jobs
+        })
     
     return jsonify({"error": "Invalid request format"}), 400
 
+@app.route('/api/imports', methods=['GET'])
+def list_imports():
+    conn = get_db_connection()
+    imports = import_status(conn.cursor())
+    conn.close()
+    return jsonify({"imports": imports})
+
+@app.route('/api/imports/<int:import_id>', methods=['GET'])
+def get_import(import_id):
+    conn = get_db_connection()
+    status = import_status(conn.cursor(), import_id)
+    conn.close()
+    
+    if not status:
+        return jsonify({"error": "Import not found"}), 404
+    if status["rows_total"]:
+        status["percent_done"] = round(100.0 * status["rows_done"] / status["rows_total"], 1)
+    return jsonify({"import": status})
+
 @app.route('/api/match/<int:candidate_id>', methods=['GET'])
 def get_candidate_matches(candidate_id):
     conn = get_db_connection()
@@ -637,6 +1542,8 @@ def get_candidate_matches(candidate_id):
     """, (candidate_id,))
     
     matches = [dict(row) for row in cursor.fetchall()]
+    for match, rank in zip(matches, many_job_ranks(cursor, [(m["job_id"], m["eligibility_score"]) for m in matches])):
+        match["rank"] = rank
     conn.close()
     
     return jsonify({
@@ -648,6 +1555,8 @@ def get_candidate_matches(candidate_id):
 @app.route('/api/match/top/<int:candidate_id>', methods=['GET'])
 def get_top_matches(candidate_id):
     limit = request.args.get('limit', default=5, type=int)
+    rerank = request.args.get('rerank', default=0, type=int)
+    stage_one_limit = max(limit, request.args.get('rerank_n', default=RERANK_TOP_N, type=int)) if rerank else limit
     
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -662,21 +1571,62 @@ def get_top_matches(candidate_id):
     
     
     cursor.execute("""
-        SELECT s.*, j.job_title, j.company, j.location, j.required_skills, j.qualifications 
+        SELECT s.*, j.job_title, j.company, j.location, j.required_skills, j.qualifications, j.experience
         FROM scores s
         JOIN jobs j ON s.job_id = j.job_id
         WHERE s.candidate_id = ?
         ORDER BY s.eligibility_score DESC
         LIMIT ?
-    """, (candidate_id, limit))
+    """, (candidate_id, stage_one_limit))
     
     matches = [dict(row) for row in cursor.fetchall()]
+    for match, rank in zip(matches, many_job_ranks(cursor, [(m["job_id"], m["eligibility_score"]) for m in matches])):
+        match["rank"] = rank
     conn.close()
+
+    reranked = False
+    if rerank:
+        candidate_data = {f: candidate[f] or "" for f in CANDIDATE_VECTOR_FIELDS}
+        matches, reranked = rerank_matches(matches, lambda m: candidate_data, lambda m: {f: m[f] or "" for f in JOB_VECTOR_FIELDS})
     
     return jsonify({
         "candidate_id": candidate_id,
         "candidate_name": dict(candidate)["name"],
-        "top_matches": matches
+        "top_matches": matches[:limit],
+        "reranked": reranked
+    })
+
+@app.route('/api/match/<int:candidate_id>/explain/<int:job_id>', methods=['GET'])
+def explain_match(candidate_id, job_id):
+    """Which of a job's required skills the candidate covers, with the best-matching candidate skill for each"""
+    threshold = request.args.get('threshold', default=SKILL_MATCH_THRESHOLD, type=float)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT skills FROM candidates WHERE candidate_id = ?", (candidate_id,))
+    candidate = cursor.fetchone()
+    cursor.execute("SELECT job_title, required_skills FROM jobs WHERE job_id = ?", (job_id,))
+    job = cursor.fetchone()
+    if not candidate or not job:
+        conn.close()
+        return jsonify({"error": "Candidate or Job not found"}), 404
+    cursor.execute("SELECT skill_score, eligibility_score FROM scores WHERE candidate_id = ? AND job_id = ?", (candidate_id, job_id))
+    score = cursor.fetchone()
+    conn.close()
+
+    sync_embedding_version()
+    explanation = skill_explainer.explain(
+        candidate["skills"], job["required_skills"], get_embeddings, embedding_version,
+        (content_version(candidate["skills"]), content_version(job["required_skills"])), threshold
+    )
+    return jsonify({
+        "candidate_id": candidate_id,
+        "job_id": job_id,
+        "job_title": job["job_title"],
+        "embedding_version": embedding_version,
+        "skill_score": score["skill_score"] if score else None,
+        "eligibility_score": score["eligibility_score"] if score else None,
+        **explanation
     })
 
 @app.route('/api/applications', methods=['POST'])
@@ -702,6 +1652,11 @@ def create_application():
         if not candidate or not job:
             conn.close()
             return jsonify({"error": "Candidate or Job not found"}), 404
+
+        cursor.execute(f"SELECT 1 FROM jobs WHERE job_id = ? AND {active_job_condition()}", (job_id,))
+        if not cursor.fetchone():
+            conn.close()
+            return jsonify({"error": "Job is no longer accepting applications"}), 409
         
         
         cursor.execute("""
@@ -724,6 +1679,7 @@ def create_application():
         """, (candidate_id, job_id, current_date, "Pending"))
         
         application_id = cursor.lastrowid
+        retain_application_score(cursor, candidate_id, job_id)
         conn.commit()
         conn.close()
         
@@ -741,19 +1697,23 @@ def get_candidate_applications(candidate_id):
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT a.*, j.job_title, j.company, j.location
+        SELECT a.*, j.job_title, j.company, j.location, s.eligibility_score
         FROM applications a
         JOIN jobs j ON a.job_id = j.job_id
+        LEFT JOIN scores s ON s.candidate_id = a.candidate_id AND s.job_id = a.job_id
         WHERE a.candidate_id = ?
         ORDER BY a.application_date DESC
     """, (candidate_id,))
     
     applications = [dict(row) for row in cursor.fetchall()]
+    for application, rank in zip(applications, many_job_ranks(cursor, [(a["job_id"], a["eligibility_score"]) for a in applications])):
+        application["rank"] = rank
     conn.close()
     
     return jsonify({"applications": applications})
 
 @app.route('/api/job_details/<int:job_id>', methods=['GET'])
+@response_cache.cached("jobs")
 def job_details(job_id):
     """Get detailed information about a job"""
     try:
@@ -773,32 +1733,41 @@ def job_details(job_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_job_filter(search_term='', company='All', location='All', status='active'):
+    """WHERE clause and params shared by job search and conditioned facet counts."""
+    where = job_status_condition(status) or active_job_condition()
+    params = []
+    
+    if search_term:
+        where += " AND (job_title LIKE ? OR company LIKE ? OR required_skills LIKE ?)"
+        search_param = f"%{search_term}%"
+        params.extend([search_param, search_param, search_param])
+    
+    if company != 'All':
+        where += " AND company = ?"
+        params.append(company)
+    
+    if location != 'All':
+        where += " AND location = ?"
+        params.append(location)
+    
+    return where, params
+
 @app.route('/api/all_jobs', methods=['GET'])
+@response_cache.cached("jobs", validators=[EXPIRED_JOBS_SQL])
 def all_jobs():
     """Get all available jobs with optional filtering"""
     try:
         search_term = request.args.get('search', '')
         company = request.args.get('company', 'All')
         location = request.args.get('location', 'All')
-        
+        status = request.args.get('status', 'active')
+
         conn = sqlite3.connect("job_matching.db")
-        
+
         # Build query with filters
-        query = "SELECT * FROM jobs WHERE 1=1"
-        params = []
-        
-        if search_term:
-            query += " AND (job_title LIKE ? OR company LIKE ? OR required_skills LIKE ?)"
-            search_param = f"%{search_term}%"
-            params.extend([search_param, search_param, search_param])
-        
-        if company != 'All':
-            query += " AND company = ?"
-            params.append(company)
-        
-        if location != 'All':
-            query += " AND location = ?"
-            params.append(location)
+        where, params = build_job_filter(search_term, company, location, status)
+        query = f"SELECT * FROM jobs WHERE {where}"
         
         df = pd.read_sql_query(query, conn, params=params)
         conn.close()
@@ -811,19 +1780,42 @@ def all_jobs():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/job_filters', methods=['GET'])
+@response_cache.cached("jobs", validators=[EXPIRED_JOBS_SQL])
 def job_filters():
-    """Get unique companies and locations for filters"""
+    """Get companies, locations and skills with job counts for filters"""
     try:
+        search_term = request.args.get('search', '')
+        company = request.args.get('company', 'All')
+        location = request.args.get('location', 'All')
+        skill_limit = request.args.get('skill_limit', default=50, type=int)
+        status = request.args.get('status', 'active')
+
         conn = sqlite3.connect("job_matching.db")
-        
-        companies = pd.read_sql_query("SELECT DISTINCT company FROM jobs", conn)['company'].tolist()
-        locations = pd.read_sql_query("SELECT DISTINCT location FROM jobs", conn)['location'].tolist()
+        cursor = conn.cursor()
+
+        # The maintained facet counts cover unarchived jobs; jobs that expired
+        # since the last archive pass are subtracted
+        if search_term or company != 'All' or location != 'All' or status != 'active':
+            # Each facet is conditioned on the search and the other facets' selections
+            facets = {
+                'company': filtered_facet_counts(cursor, 'company', *build_job_filter(search_term, 'All', location, status)),
+                'location': filtered_facet_counts(cursor, 'location', *build_job_filter(search_term, company, 'All', status)),
+                'skill': filtered_facet_counts(cursor, 'skill', *build_job_filter(search_term, company, location, status), limit=skill_limit)
+            }
+        else:
+            unlisted = unarchived_inactive_condition()
+            facets = {
+                'company': facet_counts(cursor, 'company', exclude=unlisted),
+                'location': facet_counts(cursor, 'location', exclude=unlisted),
+                'skill': facet_counts(cursor, 'skill', limit=skill_limit, exclude=unlisted)
+            }
         
         conn.close()
         
         return jsonify({
-            'companies': ['All'] + companies,
-            'locations': ['All'] + locations
+            'companies': ['All'] + [f['value'] for f in facets['company']],
+            'locations': ['All'] + [f['value'] for f in facets['location']],
+            'facets': facets
         })
     
     except Exception as e:
@@ -880,55 +1872,43 @@ def send_interview_request():
         - Details: {data['interview_details']}
         """
         
-        # Send email
-        if not email_settings['sender_email'] or not email_settings['sender_password']:
+        if not email_settings['smtp_server'] or not email_settings['sender_email']:
             return jsonify({'error': 'Email settings not configured'}), 400
         
-        try:
-            # Create email message
-            msg = MIMEMultipart()
-            msg['From'] = email_settings['sender_email']
-            msg['To'] = candidate_email
-            msg['Subject'] = f"Interview Request: {job_title} at {company}"
-            
-            # Create email body
-            body = f"""
-            <html>
-            <body>
-                <h2>Interview Request for {job_title}</h2>
-                <p>Dear Candidate,</p>
-                <p>We've reviewed your resume and would like to invite you for an interview for the <b>{job_title}</b> position at <b>{company}</b>.</p>
-                <p><b>Interview Details:</b><br>
-                {formatted_details}</p>
-                <p>Please confirm your availability for this interview. If the proposed time doesn't work for you, please suggest alternative times.</p>
-                <p>Thank you for your interest in our company.</p>
-                <p>Best regards,<br>
-                Recruitment Team<br>
-                {company}</p>
-            </body>
-            </html>
-            """
-            
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Connect to SMTP server and send email
-            server = smtplib.SMTP(email_settings['smtp_server'], email_settings['smtp_port'])
-            server.starttls()
-            server.login(email_settings['sender_email'], email_settings['sender_password'])
-            server.send_message(msg)
-            server.quit()
-            
-            # Add application with interview status
-            cursor.execute(
-                "INSERT INTO applications (candidate_id, job_id, application_date, status) VALUES (?, ?, date('now'), 'Interview Requested')",
-                (data['candidate_id'], data['job_id'])
-            )
-            conn.commit()
-            
-            return jsonify({'success': True, 'message': f"Interview request sent to {candidate_email}"})
-            
-        except Exception as e:
-            return jsonify({'error': f'Failed to send email: {str(e)}'}), 500
+        # Create email body
+        body = f"""
+        <html>
+        <body>
+            <h2>Interview Request for {job_title}</h2>
+            <p>Dear Candidate,</p>
+            <p>We've reviewed your resume and would like to invite you for an interview for the <b>{job_title}</b> position at <b>{company}</b>.</p>
+            <p><b>Interview Details:</b><br>
+            {formatted_details}</p>
+            <p>Please confirm your availability for this interview. If the proposed time doesn't work for you, please suggest alternative times.</p>
+            <p>Thank you for your interest in our company.</p>
+            <p>Best regards,<br>
+            Recruitment Team<br>
+            {company}</p>
+        </body>
+        </html>
+        """
+        
+        # Queue the email with the application; the outbox sender delivers it
+        message_id = enqueue_email(cursor, candidate_email, f"Interview Request: {job_title} at {company}", body)
+        cursor.execute(
+            "INSERT INTO applications (candidate_id, job_id, application_date, status) VALUES (?, ?, date('now'), 'Interview Requested')",
+            (data['candidate_id'], data['job_id'])
+        )
+        retain_application_score(cursor, data['candidate_id'], data['job_id'])
+        conn.commit()
+        outbox_sender.notify()
+        
+        return jsonify({
+            'success': True,
+            'queued': True,
+            'message_id': message_id,
+            'message': f"Interview request queued for {candidate_email}"
+        }), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -956,12 +1936,17 @@ def apply_job():
         
         if application:
             return jsonify({'status': 'already_applied', 'current_status': application[0]}), 200
-        
+
+        cursor.execute(f"SELECT 1 FROM jobs WHERE job_id = ? AND {active_job_condition()}", (data['job_id'],))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Job is no longer accepting applications'}), 409
+
         # Add application
         cursor.execute(
             "INSERT INTO applications (candidate_id, job_id, application_date, status) VALUES (?, ?, date('now'), 'Applied')",
             (data['candidate_id'], data['job_id'])
         )
+        retain_application_score(cursor, data['candidate_id'], data['job_id'])
         conn.commit()
         conn.close()
         
@@ -985,15 +1970,17 @@ def update_email_settings():
         'smtp_server': data['smtp_server'],
         'smtp_port': data['smtp_port'],
         'sender_email': data['sender_email'],
-        'sender_password': data['sender_password']
+        'sender_password': data['sender_password'],
+        'smtp_user': data.get('smtp_user', ''),
+        'starttls': data.get('starttls', True)
     }
+    smtp_pool.reset()
     
     # Test the connection
     try:
-        server = smtplib.SMTP(data['smtp_server'], int(data['smtp_port']))
-        server.starttls()
-        server.login(data['sender_email'], data['sender_password'])
-        server.quit()
+        with smtp_pool.connection():
+            pass
+        outbox_sender.notify()
         return jsonify({'success': True, 'message': 'Connection test successful'})
     except Exception as e:
         return jsonify({'error': f'Connection test failed: {str(e)}'}), 400
@@ -1014,20 +2001,51 @@ def get_candidate_by_email(email):
 
 # Interview API routes
 
+def interview_range_filter(cursor):
+    """SQL and parameters for the ``?from=&to=`` window, or None if a bound is not a date.
+
+    An interview matches if it overlaps ``[from, to)``; a bare date means midnight.
+    """
+    bounds = []
+    for name, default in (("from", "0001-01-01 00:00:00"), ("to", "9999-12-31 23:59:59")):
+        value = request.args.get(name)
+        if value is None:
+            bounds.append(default)
+            continue
+        value = cursor.execute("SELECT datetime(?)", (value,)).fetchone()[0]
+        if value is None:
+            return None
+        bounds.append(value)
+    if "from" not in request.args and "to" not in request.args:
+        return "", []
+    return f"AND {overlap_clause('i.')}", overlap_params(*bounds)
+
+def scheduling_conflict_response(conflicts):
+    return jsonify({
+        "error": "Interview overlaps another scheduled interview",
+        "conflicts": conflicts
+    }), 409
+
 @app.route('/api/interviews', methods=['GET'])
 def get_interviews():
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    query = """
+
+    range_filter = interview_range_filter(cursor)
+    if range_filter is None:
+        conn.close()
+        return jsonify({"error": "from and to must be dates or datetimes"}), 400
+
+    query = f"""
     SELECT i.*, c.name as candidate_name, j.job_title, j.company
     FROM interviews i
     JOIN candidates c ON i.candidate_id = c.candidate_id
     JOIN jobs j ON i.job_id = j.job_id
-    ORDER BY i.date, i.time
+    WHERE 1 = 1 {range_filter[0]}
+    ORDER BY i.starts_at, i.date, i.time
     """
-    
-    cursor.execute(query)
+
+    cursor.execute(query, range_filter[1])
     interviews = [dict(row) for row in cursor.fetchall()]
     conn.close()
     
@@ -1077,7 +2095,20 @@ def create_interview():
     if not candidate or not job:
         conn.close()
         return jsonify({"error": "Candidate or job not found"}), 404
-    
+
+    try:
+        starts_at, ends_at = interview_bounds(data['date'], data['time'], data['duration'])
+    except ValueError as e:
+        conn.close()
+        return jsonify({"error": str(e)}), 400
+
+    begin_booking(cursor)
+    if data['status'] == 'scheduled':
+        conflicts = find_conflicts(cursor, starts_at, ends_at, data.get('recruiter_id'), data['candidate_id'])
+        if conflicts:
+            conn.close()
+            return scheduling_conflict_response(conflicts)
+
     # Check if application exists
     application_id = None
     cursor.execute(
@@ -1094,6 +2125,7 @@ def create_interview():
             "INSERT INTO applications (candidate_id, job_id, application_date, status) VALUES (?, ?, date('now'), 'Interview Scheduled')",
             (data['candidate_id'], data['job_id'])
         )
+        retain_application_score(cursor, data['candidate_id'], data['job_id'])
         application_id = cursor.lastrowid
     
     # Insert interview
@@ -1101,9 +2133,9 @@ def create_interview():
     INSERT INTO interviews (
         application_id, candidate_id, job_id, recruiter_id,
         date, time, duration, type, status,
-        location, meeting_url, notes,
+        location, meeting_url, notes, starts_at, ends_at,
         created_at, updated_at
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
     """
     
     cursor.execute(query, (
@@ -1118,9 +2150,11 @@ def create_interview():
         data['status'],
         data.get('location'),
         data.get('meeting_url'),
-        data.get('notes')
+        data.get('notes'),
+        starts_at,
+        ends_at
     ))
-    
+
     interview_id = cursor.lastrowid
     conn.commit()
     conn.close()
@@ -1136,6 +2170,8 @@ def update_interview(interview_id):
     
     conn = get_db_connection()
     cursor = conn.cursor()
+    # Read the interview under the write lock its conflict check needs
+    begin_booking(cursor)
     
     # Check if interview exists
     cursor.execute("SELECT * FROM interviews WHERE interview_id = ?", (interview_id,))
@@ -1158,7 +2194,24 @@ def update_interview(interview_id):
         if field in data:
             update_fields.append(f"{field} = ?")
             params.append(data[field])
-    
+
+    updated = {**dict(interview), **{field: data[field] for field in updateable_fields if field in data}}
+    starts_at, ends_at = interview['starts_at'], interview['ends_at']
+    if any(field in data for field in ('date', 'time', 'duration')):
+        try:
+            starts_at, ends_at = interview_bounds(updated['date'], updated['time'], updated['duration'])
+        except ValueError as e:
+            conn.close()
+            return jsonify({"error": str(e)}), 400
+        update_fields += ["starts_at = ?", "ends_at = ?"]
+        params += [starts_at, ends_at]
+
+    if updated['status'] == 'scheduled' and starts_at is not None:
+        conflicts = find_conflicts(cursor, starts_at, ends_at, updated['recruiter_id'], updated['candidate_id'], exclude_id=interview_id)
+        if conflicts:
+            conn.close()
+            return scheduling_conflict_response(conflicts)
+
     # Always add updated_at
     update_fields.append("updated_at = datetime('now')")
     
@@ -1188,15 +2241,20 @@ def get_candidate_interviews(candidate_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    query = """
+    range_filter = interview_range_filter(cursor)
+    if range_filter is None:
+        conn.close()
+        return jsonify({"error": "from and to must be dates or datetimes"}), 400
+
+    query = f"""
     SELECT i.*, j.job_title, j.company
     FROM interviews i
     JOIN jobs j ON i.job_id = j.job_id
-    WHERE i.candidate_id = ?
-    ORDER BY i.date, i.time
+    WHERE i.candidate_id = ? {range_filter[0]}
+    ORDER BY i.starts_at, i.date, i.time
     """
-    
-    cursor.execute(query, (candidate_id,))
+
+    cursor.execute(query, [candidate_id] + range_filter[1])
     interviews = [dict(row) for row in cursor.fetchall()]
     conn.close()
     
@@ -1207,21 +2265,559 @@ def get_recruiter_interviews(recruiter_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    query = """
+    range_filter = interview_range_filter(cursor)
+    if range_filter is None:
+        conn.close()
+        return jsonify({"error": "from and to must be dates or datetimes"}), 400
+
+    query = f"""
     SELECT i.*, c.name as candidate_name, j.job_title, j.company
     FROM interviews i
     JOIN candidates c ON i.candidate_id = c.candidate_id
     JOIN jobs j ON i.job_id = j.job_id
-    WHERE i.recruiter_id = ?
-    ORDER BY i.date, i.time
+    WHERE i.recruiter_id = ? {range_filter[0]}
+    ORDER BY i.starts_at, i.date, i.time
     """
-    
-    cursor.execute(query, (recruiter_id,))
+
+    cursor.execute(query, [recruiter_id] + range_filter[1])
     interviews = [dict(row) for row in cursor.fetchall()]
     conn.close()
     
     return jsonify({"interviews": interviews})
 
+@app.route('/api/analytics/applications/daily', methods=['GET'])
+def get_daily_applications():
+    job_id = request.args.get('job_id', type=int)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    start, end = (request.args.get(name) for name in ('from', 'to'))
+    if any(value and cursor.execute("SELECT date(?)", (value,)).fetchone()[0] is None for value in (start, end)):
+        conn.close()
+        return jsonify({"error": "from and to must be dates"}), 400
+    days = daily_applications(cursor, job_id, start, end)
+    conn.close()
+    return jsonify({"job_id": job_id, "days": days})
+
+@app.route('/api/analytics/applications/by-job', methods=['GET'])
+def get_applications_by_job():
+    limit = request.args.get('limit', default=20, type=int)
+    conn = get_db_connection()
+    jobs = applications_by_job(conn.cursor(), limit)
+    conn.close()
+    return jsonify({"jobs": jobs})
+
+@app.route('/api/analytics/funnel', methods=['GET'])
+def get_status_funnel():
+    job_id = request.args.get('job_id', type=int)
+    conn = get_db_connection()
+    funnel = status_funnel(conn.cursor(), job_id)
+    conn.close()
+    return jsonify({"job_id": job_id, **funnel})
+
+@app.route('/api/analytics/scores/histogram', methods=['GET'])
+@app.route('/api/analytics/scores/histogram/<int:job_id>', methods=['GET'])
+def get_score_histogram(job_id=None):
+    conn = get_db_connection()
+    histogram = score_histogram(conn.cursor(), job_id)
+    conn.close()
+    return jsonify(histogram)
+
+def export_conditions(kind, id_column, since_columns):
+    """WHERE conditions shared by the export endpoints, or None if ``since`` is not a date."""
+    conditions, params = [], []
+    after_id = request.args.get('after_id', type=int)
+    if after_id is not None:
+        conditions.append(f"{id_column} > ?")
+        params.append(after_id)
+    since = request.args.get('since')
+    if since:
+        conn = get_db_connection()
+        since = conn.execute("SELECT datetime(?)", (since,)).fetchone()[0]
+        conn.close()
+        if since is None:
+            return None
+        conditions.append("(" + " OR ".join(f"{column} >= ?" for column in since_columns) + ")")
+        params += [since] * len(since_columns)
+    if kind and request.args.get('skills'):
+        condition, skill_params = skill_filter_sql(kind, request.args['skills'])
+        if condition:
+            conditions.append(condition)
+            params += skill_params
+    return conditions, params
+
+def export_response(query, conditions, params, order_by, filename):
+    """Stream ``query`` as NDJSON, gzip-compressed when the client accepts it (``?gzip=0`` opts out)."""
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order_by}"
+    body = ndjson_lines(get_db_connection, query, params)
+    headers = {"Content-Disposition": f"attachment; filename={filename}.ndjson"}
+    if request.args.get('gzip', default=int("gzip" in request.headers.get("Accept-Encoding", "")), type=int):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(body), mimetype="application/x-ndjson", headers=headers)
+
+@app.route('/api/export/candidates', methods=['GET'])
+def export_candidates():
+    filters = export_conditions("candidate", "candidate_id", ["updated_at"])
+    if filters is None:
+        return jsonify({"error": "since must be a date or datetime"}), 400
+    return export_response("SELECT * FROM candidates", *filters, "candidate_id", "candidates")
+
+@app.route('/api/export/jobs', methods=['GET'])
+def export_jobs():
+    filters = export_conditions("job", "job_id", ["updated_at"])
+    if filters is None:
+        return jsonify({"error": "since must be a date or datetime"}), 400
+    conditions, params = filters
+    for field in ('company', 'location'):
+        if request.args.get(field):
+            conditions.append(f"{field} = ?")
+            params.append(request.args[field])
+    return export_response("SELECT * FROM jobs", conditions, params, "job_id", "jobs")
+
+@app.route('/api/export/matches', methods=['GET'])
+def export_matches():
+    """Score rows with job titles; ``since`` selects rows whose candidate or job changed since then."""
+    filters = export_conditions(None, "s.score_id", ["c.updated_at", "j.updated_at"])
+    if filters is None:
+        return jsonify({"error": "since must be a date or datetime"}), 400
+    conditions, params = filters
+    for field in ('candidate_id', 'job_id'):
+        value = request.args.get(field, type=int)
+        if value is not None:
+            conditions.append(f"s.{field} = ?")
+            params.append(value)
+    min_score = request.args.get('min_score', type=float)
+    if min_score is not None:
+        conditions.append("s.eligibility_score >= ?")
+        params.append(min_score)
+    query = """
+    SELECT s.*, c.name AS candidate_name, c.email AS candidate_email, j.job_title, j.company
+    FROM scores s
+    JOIN candidates c ON c.candidate_id = s.candidate_id
+    JOIN jobs j ON j.job_id = s.job_id
+    """
+    return export_response(query, conditions, params, "s.score_id", "matches")
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create or migrate the schema and fill empty rollups; run once before starting several workers."""
+    init_db()
+    click.echo(f"Initialized {DB_PATH}")
+
+@app.cli.command("import-jobs")
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--chunk-size", default=JOB_IMPORT_CHUNK_SIZE)
+@click.option("--restart", is_flag=True, help="Start over instead of resuming an unfinished import of this file.")
+@click.option("--no-rematch", is_flag=True, help="Skip rescoring candidates after the import.")
+def import_jobs(csv_path, chunk_size, restart, no_rematch):
+    """Stream a job CSV feed into the database in checkpointed chunks."""
+    job_import = new_job_import(csv_path)
+    job_import.chunk_size = chunk_size
+    import_id = job_import.start(resume=not restart)
+    status = job_import.status()
+    click.echo(f"Import {import_id}: {status['rows_done']}/{status['rows_total']} rows already done")
+
+    def progress(status, seconds):
+        click.echo(f"Import {import_id}: {status['rows_done']}/{status['rows_total']} rows, {status['jobs_inserted']} jobs ({seconds:.1f}s for last chunk)")
+
+    status = job_import.run(progress)
+    if not no_rematch:
+        click.echo("Rescoring candidates...")
+        rematch_all_candidates()
+    click.echo(f"Import {import_id} {status['status']}")
+
+@app.cli.command("eval-resume-trim")
+@click.argument("resume_dir", default=UPLOAD_FOLDER)
+@click.option("--limit", default=20)
+def eval_resume_trim(resume_dir, limit):
+    """Parse sample resumes with raw and trimmed text and compare the extracted fields."""
+    def field_tokens(value):
+        return {t.strip().lower() for t in str(value).split(",") if t.strip()}
+
+    paths = sorted(os.path.join(resume_dir, f) for f in os.listdir(resume_dir) if f.lower().endswith(".pdf"))[:limit]
+    results = []
+    for path in paths:
+        raw_text = extract_resume_text(path)
+        trimmed_text, report = prepare_resume_text(extract_resume_pages(path), RESUME_TOKEN_BUDGET)
+        raw_fields = parse_resume_with_llm(raw_text)
+        trimmed_fields = parse_resume_with_llm(trimmed_text)
+
+        agreement = {}
+        for field in sorted(set(raw_fields) | set(trimmed_fields)):
+            a, b = field_tokens(raw_fields.get(field, "")), field_tokens(trimmed_fields.get(field, ""))
+            agreement[field] = round(len(a & b) / len(a | b), 3) if a | b else 1.0
+
+        results.append({
+            "file": os.path.basename(path),
+            "tokens_before": report["tokens_before"],
+            "tokens_after": report["tokens_after"],
+            "dropped_sections": report["dropped_sections"],
+            "field_agreement": agreement,
+            "identical_fields": sum(1 for v in agreement.values() if v == 1.0),
+            "fields": len(agreement)
+        })
+
+    before = sum(r["tokens_before"] for r in results)
+    after = sum(r["tokens_after"] for r in results)
+    click.echo(json.dumps({
+        "resumes": len(results),
+        "tokens_before": before,
+        "tokens_after": after,
+        "token_reduction": round(1 - after / before, 3) if before else 0.0,
+        "results": results
+    }, indent=2))
+
+@app.cli.command("rebuild-skill-index")
+def rebuild_skill_index():
+    """Re-tokenize every candidate's and job's skills into the inverted index."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    candidates = cursor.execute("SELECT candidate_id, skills FROM candidates").fetchall()
+    for row in candidates:
+        index_skills(cursor, "candidate", row["candidate_id"], row["skills"])
+    # Archived jobs stay out of the skill index
+    jobs = cursor.execute("SELECT job_id, required_skills FROM jobs WHERE archived_at IS NULL").fetchall()
+    for row in jobs:
+        index_skills(cursor, "job", row["job_id"], row["required_skills"])
+    rebuild_facets(cursor)
+    bump_cache_version(cursor, "jobs")
+    conn.commit()
+    conn.close()
+    click.echo(f"Indexed skills for {len(candidates)} candidates and {len(jobs)} jobs")
+
+@app.cli.command("compact-scores")
+@click.option("--top-k", default=SCORE_RETENTION_TOP_K or 20, help="Score rows to keep per candidate.")
+@click.option("--vacuum", is_flag=True, help="VACUUM the database afterwards to return the space.")
+def compact_scores(top_k, vacuum):
+    """Delete score rows outside each candidate's top K, keeping jobs they applied to."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    deleted = trim_scores(cursor, top_k)
+    bump_cache_version(cursor, "scores")
+    conn.commit()
+    if vacuum:
+        conn.execute("VACUUM")
+    conn.close()
+    click.echo(f"Deleted {deleted} score rows outside the top {top_k} per candidate")
+
+def trim_scores(cursor, top_k):
+    cursor.execute("""
+        DELETE FROM scores WHERE score_id IN (
+            SELECT ranked.score_id FROM (
+                SELECT score_id, candidate_id, job_id,
+                       ROW_NUMBER() OVER (PARTITION BY candidate_id ORDER BY eligibility_score DESC) AS position
+                FROM scores
+            ) AS ranked
+            WHERE ranked.position > ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM applications a
+                  WHERE a.candidate_id = ranked.candidate_id AND a.job_id = ranked.job_id
+              )
+        )
+    """, (top_k,))
+    return cursor.rowcount
+
+@app.cli.command("rematch")
+@click.option("--workers", default=os.cpu_count() or 1, help="Scoring processes.")
+@click.option("--shard-size", default=500, help="Candidates per process-pool task.")
+@click.option("--batch-size", default=256, help="Texts embedded per model call.")
+@click.option("--since", default=None, help="Only redo candidates and jobs created or changed since this UTC time (YYYY-MM-DD[ HH:MM:SS]).")
+@click.option("--skip-embeddings", is_flag=True, help="Reuse stored vectors and only embed rows that have none.")
+@click.option("--dry-run", is_flag=True, help="Report the planned work and an estimated duration without writing.")
+def rematch_command(workers, shard_size, batch_size, since, skip_embeddings, dry_run):
+    """Rebuild embeddings and scores for the whole database on a process pool."""
+    sync_embedding_version(force=True)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    if since and cursor.execute("SELECT datetime(?)", (since,)).fetchone()[0] is None:
+        conn.close()
+        raise click.BadParameter(f"cannot parse {since!r} as a date", param_hint="--since")
+
+    if not dry_run:
+        archive_inactive_jobs(force=True)
+    sources = {
+        "candidate": ("SELECT candidate_id, skills, qualifications, projects, experience FROM candidates WHERE 1=1", CANDIDATE_VECTOR_FIELDS),
+        "job": (f"SELECT job_id, job_title, required_skills, experience, qualifications FROM jobs WHERE {active_job_condition()}", JOB_VECTOR_FIELDS)
+    }
+    all_ids, changed, to_embed = {}, {}, {}
+    for kind, (query, fields) in sources.items():
+        rows = [dict(row) for row in cursor.execute(query).fetchall()]
+        all_ids[kind] = [row[f"{kind}_id"] for row in rows]
+        if since:
+            changed[kind] = {row[0] for row in cursor.execute(f"{query} AND updated_at >= datetime(?)", (since,)).fetchall()}
+        else:
+            changed[kind] = set(all_ids[kind])
+        embed_ids = missing_vector_ids(kind, fields, all_ids[kind]) | (set() if skip_embeddings else changed[kind])
+        to_embed[kind] = [row for row in rows if row[f"{kind}_id"] in embed_ids]
+
+    applied = defaultdict(set)
+    for row in cursor.execute("SELECT candidate_id, job_id FROM applications").fetchall():
+        applied[row["candidate_id"]].add(row["job_id"])
+
+    # Changed candidates are scored against every job; everyone else only against changed jobs
+    full = [c for c in all_ids["candidate"] if c in changed["candidate"]]
+    partial = [c for c in all_ids["candidate"] if c not in changed["candidate"]] if since else []
+    changed_jobs = [j for j in all_ids["job"] if j in changed["job"]]
+    if not changed_jobs:
+        partial = []
+    pairs = len(full) * len(all_ids["job"]) + len(partial) * len(changed_jobs)
+    texts = sum(len(rows) * len(sources[kind][1]) for kind, rows in to_embed.items())
+
+    if dry_run:
+        encode_rate = score_rate = None
+        sample = [row[field] or "" for kind, rows in to_embed.items() for row in rows[:16] for field in sources[kind][1]]
+        if sample:
+            started = time.perf_counter()
+            embedding_model.encode(sample, batch_size=batch_size)
+            encode_rate = len(sample) / max(time.perf_counter() - started, 1e-6)
+        missing_candidates = missing_vector_ids("candidate", CANDIDATE_VECTOR_FIELDS, all_ids["candidate"][:64])
+        scorable = [c for c in all_ids["candidate"][:64] if c not in missing_candidates]
+        missing_jobs = missing_vector_ids("job", JOB_VECTOR_FIELDS, all_ids["job"])
+        job_sample = [j for j in all_ids["job"] if j not in missing_jobs][:2000]
+        if scorable and job_sample:
+            score_rate = sample_score_rate(vector_store, scorable, job_sample, MATCH_FIELDS)
+        conn.close()
+        click.echo(json.dumps({
+            "embedding_version": embedding_version,
+            "candidates_to_embed": len(to_embed["candidate"]),
+            "jobs_to_embed": len(to_embed["job"]),
+            "candidates_to_score": len(full) + len(partial),
+            "pairs_to_score": pairs,
+            "workers": workers,
+            "estimated_embedding_seconds": round(texts / encode_rate, 1) if encode_rate else None,
+            "estimated_scoring_seconds": round(pairs / (score_rate * workers), 1) if score_rate else None
+        }, indent=2))
+        return
+
+    started = time.perf_counter()
+    encode = lambda batch: embedding_model.encode(batch, batch_size=batch_size)
+    for kind, rows in to_embed.items():
+        for start in range(0, len(rows), batch_size):
+            index_vectors(kind, sources[kind][1], rows[start:start + batch_size], f"{kind}_id", encode=encode)
+            click.echo(f"Embedded {min(start + batch_size, len(rows))}/{len(rows)} {kind}s")
+
+    total = len(full) + len(partial)
+    scored = written = 0
+    passes = [(full, all_ids["job"], None), (partial, changed_jobs, changed_jobs)]
+    for candidate_ids, job_ids, replaced_jobs in passes:
+        if not candidate_ids or not job_ids:
+            continue
+        shards = [candidate_ids[i:i + shard_size] for i in range(0, len(candidate_ids), shard_size)]
+        for shard, (shard_candidates, shard_jobs, scores) in run_shards(
+                vector_store, shards, job_ids, MATCH_FIELDS, workers,
+                top_k=SCORE_RETENTION_TOP_K if replaced_jobs is None else 0, applied=applied):
+            if replaced_jobs is None:
+                cursor.executemany("DELETE FROM scores WHERE candidate_id = ?", [(c,) for c in shard])
+            else:
+                cursor.executemany(
+                    "DELETE FROM scores WHERE candidate_id = ? AND job_id = ?",
+                    [(c, j) for c in shard for j in replaced_jobs]
+                )
+            cursor.executemany(SCORE_INSERT_QUERY, (
+                (c, j, *values, embedding_version)
+                for c, j, values in zip(shard_candidates.tolist(), shard_jobs.tolist(), scores.tolist())
+            ))
+            bump_cache_version(cursor, "scores")
+            conn.commit()
+
+            scored += len(shard)
+            written += len(shard_candidates)
+            elapsed = time.perf_counter() - started
+            click.echo(f"Scored {scored}/{total} candidates, {written} rows ({elapsed:.0f}s elapsed, ETA {elapsed / scored * (total - scored):.0f}s)")
+
+    if partial and SCORE_RETENTION_TOP_K > 0:
+        trim_scores(cursor, SCORE_RETENTION_TOP_K)
+        conn.commit()
+    conn.close()
+    click.echo(f"Rematched {total} candidates in {time.perf_counter() - started:.1f}s")
+
+@app.cli.command("reindex-embeddings")
+@click.option("--model", "model_name", default=EMBEDDING_MODEL_NAME, help="Sentence-transformers model to re-index with.")
+@click.option("--backend", default=EMBEDDING_BACKEND, type=click.Choice(EMBEDDING_BACKENDS))
+def reindex_embeddings_command(model_name, backend):
+    """Build an embedding version in the foreground and switch to it when complete."""
+    version = start_embedding_reindex(model_name, backend, background=False)
+    if embedding_reindexer and embedding_reindexer.version == version:
+        embedding_reindexer.join()
+    conn = get_db_connection()
+    click.echo(json.dumps(version_progress(conn.cursor(), version), indent=2))
+    conn.close()
+
+@app.cli.command("snapshot-export")
+@click.argument("out_dir", type=click.Path(file_okay=False))
+@click.option("--no-scores", is_flag=True, help="Only write the embedding matrices.")
+def snapshot_export_command(out_dir, no_scores):
+    """Write the active embedding vectors and the scores table as a columnar .npy snapshot."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    manifest = write_snapshot(cursor, vector_store, get_version(cursor), out_dir, include_scores=not no_scores)
+    conn.close()
+    click.echo(json.dumps(manifest, indent=2))
+
+@app.cli.command("snapshot-import")
+@click.argument("snapshot_dir", type=click.Path(exists=True, file_okay=False))
+@click.option("--no-scores", is_flag=True, help="Only install the embedding matrices.")
+@click.option("--link", is_flag=True, help="Memory-map the snapshot vectors in place instead of copying them.")
+def snapshot_import_command(snapshot_dir, no_scores, link):
+    """Warm-start this instance from a snapshot written by snapshot-export."""
+    try:
+        if link:
+            conn = get_db_connection()
+            check_compatible(read_manifest(snapshot_dir), get_version(conn.cursor()), VECTOR_STORE_DTYPE)
+            conn.execute(
+                "UPDATE embedding_versions SET store_dir = ? WHERE status = 'active'",
+                (os.path.abspath(os.path.join(snapshot_dir, "vectors")),)
+            )
+            conn.commit()
+            conn.close()
+            click.echo("Linked the snapshot vectors; restart running app processes to pick them up")
+        result = import_snapshot(snapshot_dir, vectors=not link, scores=not no_scores)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Installed {result['matrices']} vector matrices and {result['scores']} score rows")
+
+@app.cli.command("archive-jobs")
+def archive_jobs_command():
+    """Archive closed and expired jobs out of scores, skills, facets and the vector store."""
+    archived = archive_inactive_jobs(force=True)
+    click.echo(f"Archived {len(archived)} jobs")
+
+@app.cli.command("rebuild-facets")
+def rebuild_facets_command():
+    """Recompute job facet counts from the jobs and job_skills tables."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    rebuild_facets(cursor)
+    bump_cache_version(cursor, "jobs")
+    conn.commit()
+    conn.close()
+    click.echo("Rebuilt job facets")
+
+@app.cli.command("rebuild-analytics")
+def rebuild_analytics_command():
+    """Recompute the analytics and score rank rollups from the applications, interviews and scores tables."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    rebuild_analytics(cursor)
+    rebuild_score_ranks(cursor)
+    conn.commit()
+    conn.close()
+    click.echo("Rebuilt analytics rollups")
+
+@app.cli.command("bench-embeddings")
+@click.option("--backends", default="torch,onnx,int8", help="Comma separated backends; the first is the accuracy reference.")
+@click.option("--limit", default=50, help="Maximum candidates and jobs to sample from the database.")
+@click.option("--top-k", default=5)
+def bench_embeddings(backends, limit, top_k):
+    """Benchmark embedding backends and compare their match rankings."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM candidates LIMIT ?", (limit,))
+    candidates = [dict(row) for row in cursor.fetchall()]
+    cursor.execute("SELECT * FROM jobs LIMIT ?", (limit,))
+    jobs = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+
+    candidate_fields = ["skills", "qualifications", "projects", "experience"]
+    job_fields = ["job_title", "required_skills", "qualifications", "experience"]
+    texts = [c[f] or "" for c in candidates for f in candidate_fields] + [j[f] or "" for j in jobs for f in job_fields]
+    if not texts:
+        click.echo("No candidates or jobs to benchmark against.")
+        return
+
+    results = {}
+    reference = None
+    for backend in [b.strip() for b in backends.split(",") if b.strip()]:
+        try:
+            model = load_embedding_model(backend, EMBEDDING_MODEL_NAME)
+        except Exception as e:
+            results[backend] = {"error": str(e)}
+            continue
+
+        cache = {}
+        def embed(batch, model=model, cache=cache):
+            missing = [t for t in dict.fromkeys(batch) if t not in cache]
+            if missing:
+                cache.update(zip(missing, model.encode(missing, convert_to_tensor=True)))
+            return [cache[t] for t in batch]
+
+        rankings = {}
+        for candidate in candidates:
+            candidate_data = {f: candidate[f] or "" for f in candidate_fields}
+            scored = []
+            for job in jobs:
+                job_data = {f: job[f] or "" for f in job_fields}
+                scored.append((calculate_eligibility(candidate_data, job_data, embed)[4], job["job_id"]))
+            rankings[candidate["candidate_id"]] = [job_id for _, job_id in sorted(scored, reverse=True)]
+
+        results[backend] = {"texts_per_sec": round(benchmark_encode(model, texts), 1)}
+        if reference is None:
+            reference = rankings
+        else:
+            results[backend].update(compare_rankings(reference, rankings, k=top_k))
+
+    click.echo(json.dumps(results, indent=2))
+
+@app.cli.command("vector-store-report")
+@click.option("--top-k", default=10)
+@click.option("--limit", default=200, help="Maximum candidates to sample from the database.")
+def vector_store_report(top_k, limit):
+    """Report per-candidate vector memory and top-K recall for each storage dtype."""
+    import tempfile
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM candidates LIMIT ?", (limit,))
+    candidates = [dict(row) for row in cursor.fetchall()]
+    cursor.execute("SELECT job_id, job_title, required_skills, experience, qualifications FROM jobs")
+    jobs = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    if not candidates or not jobs:
+        click.echo("Need at least one candidate and one job.")
+        return
+
+    def embed_rows(rows, fields):
+        texts = [row[field] or "" for row in rows for field in fields]
+        return np.asarray(get_embeddings(texts), dtype=np.float32).reshape(len(rows), len(fields), -1)
+
+    candidate_vectors = embed_rows(candidates, CANDIDATE_VECTOR_FIELDS)
+    job_vectors = embed_rows(jobs, JOB_VECTOR_FIELDS)
+    candidate_ids = [c["candidate_id"] for c in candidates]
+    job_ids = [j["job_id"] for j in jobs]
+    dim = job_vectors.shape[2]
+
+    report = {"candidates": len(candidates), "jobs": len(jobs), "dim": dim, "dtypes": {}}
+    reference = None
+    for dtype in VECTOR_DTYPES:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = VectorStore(tmp, dim, dtype)
+            for i, field in enumerate(CANDIDATE_VECTOR_FIELDS):
+                store.matrix("candidate", field).upsert(candidate_ids, candidate_vectors[:, i])
+            for i, field in enumerate(JOB_VECTOR_FIELDS):
+                store.matrix("job", field).upsert(job_ids, job_vectors[:, i])
+
+            eligibility = np.zeros((len(job_ids), len(candidate_ids)))
+            for candidate_field, job_field, weight, _ in MATCH_FIELDS:
+                _, queries = store.matrix("candidate", candidate_field).vectors()
+                _, similarity = store.matrix("job", job_field).cosine(queries)
+                eligibility += weight * similarity
+
+            bytes_per_candidate = sum(store.matrix("candidate", f).bytes_per_row() for f in CANDIDATE_VECTOR_FIELDS)
+
+        if reference is None:
+            reference = eligibility
+        recall = np.mean([recall_at_k(reference[:, c], eligibility[:, c], top_k) for c in range(len(candidate_ids))])
+        report["dtypes"][dtype] = {
+            "bytes_per_candidate": bytes_per_candidate,
+            f"recall_at_{top_k}": round(float(recall), 4)
+        }
+
+    report["fp32_blob_bytes_per_candidate"] = len(CANDIDATE_VECTOR_FIELDS) * dim * 4
+    click.echo(json.dumps(report, indent=2))
+
 if __name__ == '__main__':
+    start_background_workers()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
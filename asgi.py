@@ -0,0 +1,128 @@
+"""ASGI serving mode: ``uvicorn asgi:application`` (or gunicorn with ``-k uvicorn.workers.UvicornWorker``).
+
+The LLM-bound upload endpoints run as coroutines: the Groq call is awaited
+through ``ResilientLLM.ainvoke``, SQLite and file I/O go through a bounded
+I/O thread pool and PDF extraction, embedding and scoring through a bounded
+CPU pool. An upload waiting on the LLM holds no thread, so one process can
+keep hundreds in flight. Every other route is served unchanged by the Flask
+app through a WSGI adapter.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from starlette.responses import JSONResponse
+
+from app import (
+    app as flask_app,
+    UPLOAD_FOLDER,
+    allowed_file,
+    extract_job_features_async,
+    insert_candidate_into_db,
+    insert_job_into_db,
+    parse_resume_with_llm_async,
+    prepare_resume_for_llm,
+    process_candidate_job_matching,
+    queued_llm_work,
+    rematch_all_candidates,
+    resume_upload_result,
+    start_background_workers
+)
+from async_routes import async_application
+from llm_client import LLMUnavailableError
+
+ASYNC_CPU_WORKERS = int(os.environ.get("ASYNC_CPU_WORKERS", os.cpu_count() or 4))
+ASYNC_IO_WORKERS = int(os.environ.get("ASYNC_IO_WORKERS", 8))
+WSGI_WORKERS = int(os.environ.get("WSGI_WORKERS", 16))
+
+cpu_executor = ThreadPoolExecutor(max_workers=ASYNC_CPU_WORKERS, thread_name_prefix="cpu")
+io_executor = ThreadPoolExecutor(max_workers=ASYNC_IO_WORKERS, thread_name_prefix="sqlite")
+
+
+async def run_cpu(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor, partial(fn, *args))
+
+
+async def run_io(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(io_executor, partial(fn, *args))
+
+
+def save_upload(path, contents):
+    with open(path, "wb") as f:
+        f.write(contents)
+
+
+async def upload_resume(request):
+    form = await request.form()
+    file = form.get("file")
+    if file is None or isinstance(file, str):
+        return JSONResponse({"error": "No file part"}, 400)
+    if file.filename == '':
+        return JSONResponse({"error": "No selected file"}, 400)
+    if not allowed_file(file.filename):
+        return JSONResponse({"error": "File type not allowed"}, 400)
+
+    file_path = os.path.join(UPLOAD_FOLDER, file.filename)
+    await run_io(save_upload, file_path, await file.read())
+
+    try:
+        resume_text, trim_report = await run_cpu(prepare_resume_for_llm, file_path)
+        parsed_data = await parse_resume_with_llm_async(resume_text)
+        if not parsed_data:
+            return JSONResponse({"error": "Failed to parse resume"}, 500)
+
+        candidate_id = await run_cpu(insert_candidate_into_db, parsed_data)
+        matching = await run_cpu(process_candidate_job_matching, candidate_id)
+        return JSONResponse(*resume_upload_result(candidate_id, parsed_data, trim_report, matching))
+    except LLMUnavailableError:
+        return JSONResponse(*await run_io(queued_llm_work, "resume", {"file_path": file_path}, "Resume"))
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+async def upload_job_description(request):
+    if request.headers.get("content-type") != "application/json":
+        # CSV feeds keep using the chunked importer behind the Flask view
+        return None
+
+    data = await request.json()
+    job_title = data.get('jobTitle')
+    job_description = data.get('jobDescription')
+    if not job_title or not job_description:
+        return JSONResponse({"error": "Job title and description are required"}, 400)
+
+    try:
+        job_features = await extract_job_features_async(job_description)
+        job_features["Job Title"] = job_title
+        job_id = await run_cpu(insert_job_into_db, job_features)
+        await run_cpu(rematch_all_candidates)
+        return JSONResponse({
+            "message": "Job description processed successfully",
+            "job_id": job_id,
+            "parsed_data": job_features
+        })
+    except LLMUnavailableError:
+        payload = {"job_title": job_title, "job_description": job_description}
+        return JSONResponse(*await run_io(queued_llm_work, "job_description", payload, "Job description"))
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+ASYNC_ROUTES = {
+    ("POST", "/api/upload/resume"): upload_resume,
+    ("POST", "/api/upload/job-description"): upload_job_description
+}
+
+
+def shutdown_executors():
+    cpu_executor.shutdown(wait=False)
+    io_executor.shutdown(wait=False)
+
+
+application = async_application(
+    flask_app, ASYNC_ROUTES,
+    on_startup=start_background_workers,
+    on_shutdown=shutdown_executors,
+    wsgi_workers=WSGI_WORKERS
+)
@@ -0,0 +1,58 @@
+from a2wsgi import WSGIMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+
+
+class AsyncRoutes:
+    """Serve ``routes`` as coroutines and hand everything else to the WSGI app.
+
+    A route handler may return None before reading the body to fall back to
+    the WSGI view for that request. ``on_startup`` and ``on_shutdown`` run on
+    the server's lifespan events.
+    """
+
+    def __init__(self, wsgi_app, routes, on_startup=None, on_shutdown=None, wsgi_workers=16):
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=wsgi_workers)
+        self.routes = routes
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+
+        handler = self.routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if handler:
+            response = await handler(Request(scope, receive))
+            if response is not None:
+                await response(scope, receive, send)
+                return
+        await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self.on_startup:
+                    self.on_startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.on_shutdown:
+                    self.on_shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def async_application(wsgi_app, routes, **kwargs):
+    """``AsyncRoutes`` behind the CORS policy ``CORS(app)`` gives the Flask app.
+
+    CORS(app) only wraps the Flask app, so the native routes need the same
+    policy (any origin, method and header, no credentials) in front of them.
+    """
+    return CORSMiddleware(
+        AsyncRoutes(wsgi_app, routes, **kwargs),
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"]
+    )
@@ -0,0 +1,99 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from vector_store import VectorStore
+
+_store = None
+
+# Working memory of one scoring block in a worker; the block shrinks as the job count grows
+SCORE_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def init_worker(root, dim, dtype):
+    """Process-pool initializer: open the memory-mapped vector store once per worker."""
+    global _store
+    _store = VectorStore(root, dim, dtype)
+
+
+def score_shard(candidate_ids, job_ids, match_fields, top_k=0, applied=None, block_size=256):
+    """Score a shard of candidates against ``job_ids`` block by block.
+
+    Each block is one matrix product per match field, at most ``block_size``
+    candidates and fewer when the float64 scores of all jobs would not fit
+    in ``SCORE_BLOCK_BYTES``. ``top_k`` keeps each candidate's best jobs plus
+    those in ``applied[candidate_id]``. Returns
+    ``(candidate_ids, job_ids, scores)`` arrays of the rows to write, with
+    ``scores`` holding one column per match field followed by eligibility.
+    """
+    job_ids = np.asarray(job_ids, dtype=np.int64)
+    applied = applied or {}
+    kept_candidates, kept_jobs, kept_scores = [], [], []
+    if not len(job_ids):
+        return np.zeros(0, np.int64), job_ids, np.zeros((0, len(match_fields) + 1))
+
+    # Scores for every field plus eligibility, and the cosine/float64 temporaries of one field
+    row_bytes = len(job_ids) * np.dtype(np.float64).itemsize * (len(match_fields) + 3)
+    block_size = max(1, min(block_size, SCORE_BLOCK_BYTES // row_bytes))
+    for start in range(0, len(candidate_ids), block_size):
+        block = list(candidate_ids[start:start + block_size])
+        scores = np.zeros((len(job_ids), len(block), len(match_fields) + 1))
+        eligibility = scores[:, :, -1]
+        present = np.ones(len(block), dtype=bool)
+        for f, (candidate_field, job_field, weight, _) in enumerate(match_fields):
+            matrix = _store.matrix("candidate", candidate_field)
+            vectors = [matrix.get(candidate_id) for candidate_id in block]
+            present &= np.array([vector is not None for vector in vectors])
+            queries = np.stack([np.zeros(matrix.dim, np.float32) if v is None else v for v in vectors])
+            _, similarity = _store.matrix("job", job_field).cosine(queries, vector_ids=job_ids)
+            scores[:, :, f] = similarity
+            scores[:, :, f] *= 100
+            eligibility += weight * scores[:, :, f]
+
+        for b, candidate_id in enumerate(block):
+            if not present[b]:
+                continue
+            # Jobs without a stored vector score nan and are left unscored
+            keep = np.nonzero(np.isfinite(eligibility[:, b]))[0]
+            if top_k and len(keep) > top_k:
+                top = keep[np.argpartition(-eligibility[keep, b], top_k - 1)[:top_k]]
+                keep = np.union1d(top, keep[np.isin(job_ids[keep], list(applied.get(candidate_id, ())))])
+            kept_candidates.append(np.full(len(keep), candidate_id, dtype=np.int64))
+            kept_jobs.append(job_ids[keep])
+            kept_scores.append(scores[keep, b])
+
+    if not kept_candidates:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros((0, len(match_fields) + 1))
+    return np.concatenate(kept_candidates), np.concatenate(kept_jobs), np.concatenate(kept_scores)
+
+
+def run_shards(store, shards, job_ids, match_fields, workers, top_k=0, applied=None):
+    """Score candidate shards on a process pool, yielding ``(shard, result)`` as they finish.
+
+    Workers only read the memory-mapped vectors, so they are started with
+    ``spawn`` and never load the embedding model.
+    """
+    applied = applied or {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                             initargs=(store.root, store.dim, store.dtype)) as pool:
+        futures = {
+            pool.submit(score_shard, shard, job_ids, match_fields, top_k,
+                        {c: applied[c] for c in shard if c in applied}): shard
+            for shard in shards
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def sample_score_rate(store, candidate_ids, job_ids, match_fields, sample_size=64):
+    """Candidate-job pairs scored per second by one worker, measured on a sample."""
+    init_worker(store.root, store.dim, store.dtype)
+    sample = list(candidate_ids[:sample_size])
+    if not sample or not len(job_ids):
+        return None
+    started = time.perf_counter()
+    score_shard(sample, job_ids, match_fields)
+    return len(sample) * len(job_ids) / max(time.perf_counter() - started, 1e-6)
@@ -0,0 +1,282 @@
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_outbox (
+    message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'sending', 'sent', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    last_error TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    sent_at TEXT
+);
+"""
+
+
+def init_outbox(cursor):
+    cursor.execute(OUTBOX_SCHEMA)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at)")
+
+
+def enqueue_email(cursor, recipient, subject, html_body):
+    """Queue an HTML email in the caller's transaction and return its message id."""
+    cursor.execute(
+        "INSERT INTO email_outbox (recipient, subject, body, next_attempt_at) VALUES (?, ?, ?, ?)",
+        (recipient, subject, html_body, time.time())
+    )
+    return cursor.lastrowid
+
+
+class SMTPPool:
+    """Small pool of authenticated SMTP connections reused across sends.
+
+    ``get_settings`` is called whenever a new connection is opened so updated
+    settings take effect after ``reset``.
+    """
+
+    def __init__(self, get_settings, size=2, idle_check_seconds=30, timeout=30):
+        self.get_settings = get_settings
+        self.size = size
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def _connect(self):
+        settings = self.get_settings()
+        server = smtplib.SMTP(settings['smtp_server'], int(settings['smtp_port']), timeout=self.timeout)
+        if settings.get('starttls', True):
+            server.starttls()
+        if settings.get('sender_password'):
+            server.login(settings.get('smtp_user') or settings['sender_email'], settings['sender_password'])
+        return server
+
+    @contextmanager
+    def connection(self):
+        server = None
+        with self._lock:
+            generation = self._generation
+            while self._idle and server is None:
+                candidate, last_used = self._idle.pop()
+                if time.monotonic() - last_used < self.idle_check_seconds or self._is_alive(candidate):
+                    server = candidate
+                else:
+                    self._close(candidate)
+        if server is None:
+            server = self._connect()
+
+        try:
+            yield server
+        except smtplib.SMTPServerDisconnected:
+            self._close(server)
+            raise
+        except Exception:
+            # Recipient/message errors leave the session usable; anything else may not
+            if not self._is_alive(server):
+                self._close(server)
+                raise
+            self._release(server, generation)
+            raise
+        else:
+            self._release(server, generation)
+
+    def _release(self, server, generation):
+        with self._lock:
+            if generation == self._generation and len(self._idle) < self.size:
+                self._idle.append((server, time.monotonic()))
+                return
+        self._close(server)
+
+    def reset(self):
+        """Drop idle connections, e.g. after the SMTP settings changed."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+        for server, _ in idle:
+            self._close(server)
+
+    @staticmethod
+    def _is_alive(server):
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+class OutboxSender:
+    """Background thread that delivers queued outbox emails.
+
+    Due messages are claimed in batches, sent over one pooled connection, and
+    retried with jittered exponential backoff until ``max_attempts``. A claim
+    older than ``claim_timeout`` was left by a sender that died mid-batch; it
+    counts as a failed attempt and the message is queued again.
+    """
+
+    def __init__(self, db_path, pool, get_settings, batch_size=20, poll_interval=5.0,
+                 max_attempts=5, base_backoff=10.0, max_backoff=3600.0, claim_timeout=300.0):
+        self.db_path = db_path
+        self.pool = pool
+        self.get_settings = get_settings
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.claim_timeout = claim_timeout
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def notify(self):
+        self._wake.set()
+
+    def _connect_db(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def claim_batch(self, conn):
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A claim that outlived claim_timeout belongs to a dead sender; count it as an attempt
+            conn.execute("""
+                UPDATE email_outbox
+                SET status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'queued' END,
+                    attempts = attempts + 1, next_attempt_at = ?, last_error = 'send claim expired'
+                WHERE status = 'sending' AND claimed_at < ?
+            """, (self.max_attempts, now, now - self.claim_timeout))
+            rows = conn.execute("""
+                SELECT * FROM email_outbox
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+            """, (now, self.batch_size)).fetchall()
+            conn.executemany(
+                "UPDATE email_outbox SET status = 'sending', claimed_at = ? WHERE message_id = ?",
+                [(now, row["message_id"]) for row in rows]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _backoff(self, attempts):
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.5)
+
+    def _build_message(self, row):
+        msg = MIMEMultipart()
+        msg['From'] = self.get_settings()['sender_email']
+        msg['To'] = row["recipient"]
+        msg['Subject'] = row["subject"]
+        msg.attach(MIMEText(row["body"], 'html'))
+        return msg
+
+    def _record(self, conn, row, error, pending):
+        """Store one message's outcome and renew the claim on the messages still to send."""
+        conn.execute("BEGIN IMMEDIATE")
+        if error is None:
+            conn.execute(
+                "UPDATE email_outbox SET status = 'sent', attempts = attempts + 1, sent_at = datetime('now'), last_error = NULL WHERE message_id = ?",
+                (row["message_id"],)
+            )
+        else:
+            attempts = row["attempts"] + 1
+            status = 'failed' if attempts >= self.max_attempts else 'queued'
+            conn.execute(
+                "UPDATE email_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE message_id = ?",
+                (status, attempts, time.time() + self._backoff(attempts), error, row["message_id"])
+            )
+        conn.executemany(
+            "UPDATE email_outbox SET claimed_at = ? WHERE message_id = ? AND status = 'sending'",
+            [(time.time(), r["message_id"]) for r in pending]
+        )
+        conn.execute("COMMIT")
+
+    def send_batch(self, conn, rows):
+        """Send a claimed batch, recording each outcome as soon as it is known.
+
+        The rest of the batch is re-claimed after every message, so a slow
+        batch is never taken over by another sender while it is still
+        delivering; ``claim_timeout`` only has to cover a single send.
+        """
+        results = []
+        try:
+            with self.pool.connection() as server:
+                for i, row in enumerate(rows):
+                    try:
+                        server.send_message(self._build_message(row))
+                        error = None
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except Exception as e:
+                        error = str(e)
+                    self._record(conn, row, error, rows[i + 1:])
+                    results.append((row, error))
+        except Exception as e:
+            for row in rows[len(results):]:
+                self._record(conn, row, str(e), [])
+                results.append((row, str(e)))
+        return results
+
+    def process_once(self):
+        """Claim and send one batch; returns the number of messages attempted."""
+        conn = self._connect_db()
+        try:
+            rows = self.claim_batch(conn)
+            if rows:
+                self.send_batch(conn, rows)
+            return len(rows)
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                settings = self.get_settings()
+                if settings.get('smtp_server') and settings.get('sender_email'):
+                    if self.process_once() == self.batch_size:
+                        continue
+            except Exception as e:
+                print(f"Email outbox error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+
+def outbox_stats(cursor):
+    cursor.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")
+    return {status: count for status, count in cursor.fetchall()}
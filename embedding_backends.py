@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "int8")
+
+
+def load_embedding_model(backend, model_name):
+    """Load a SentenceTransformer for the given CPU backend.
+
+    ``torch`` is plain fp32 PyTorch, ``onnx`` runs through ONNX Runtime and
+    ``int8`` applies dynamic int8 quantization to the model's Linear layers.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device="cpu")
+
+    if backend == "onnx":
+        try:
+            return SentenceTransformer(model_name, device="cpu", backend="onnx")
+        except ImportError as e:
+            raise ValueError(f"ONNX backend requires optimum[onnxruntime]: {e}")
+
+    if backend == "int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(EMBEDDING_BACKENDS)})")
+
+
+def benchmark_encode(model, texts, batch_size=32, repeats=3):
+    """Return the best observed encode throughput in texts/sec."""
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.encode(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            best = max(best, len(texts) / elapsed)
+    return best
+
+
+def compare_rankings(reference, candidate, k=5):
+    """Compare two {key: [ids ranked best first]} maps.
+
+    Returns the mean top-k overlap and mean Spearman correlation of the
+    candidate rankings against the reference.
+    """
+    overlaps = []
+    correlations = []
+    for key, ref_ids in reference.items():
+        other_ids = candidate.get(key, [])
+        if not ref_ids:
+            continue
+
+        top = min(k, len(ref_ids))
+        overlaps.append(len(set(ref_ids[:top]) & set(other_ids[:top])) / top)
+
+        if len(ref_ids) > 1 and sorted(ref_ids) == sorted(other_ids):
+            position = {item: i for i, item in enumerate(other_ids)}
+            ref_rank = np.arange(len(ref_ids), dtype=np.float64)
+            other_rank = np.array([position[item] for item in ref_ids], dtype=np.float64)
+            correlations.append(float(np.corrcoef(ref_rank, other_rank)[0, 1]))
+
+    return {
+        f"top_{k}_overlap": float(np.mean(overlaps)) if overlaps else None,
+        "spearman": float(np.mean(correlations)) if correlations else None,
+        "rankings_compared": len(overlaps)
+    }
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from queue import Queue, Empty
+
+
+class EmbeddingBatcher:
+    """Coalesce encode requests from concurrent callers into batched forward passes.
+
+    Callers block on ``encode``/``encode_many`` while a single worker thread drains
+    the queue, waiting at most ``max_wait_ms`` for a batch of up to
+    ``max_batch_size`` texts before running one ``encode_fn`` call.
+    """
+
+    def __init__(self, encode_fn, max_batch_size=32, max_wait_ms=5):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._texts_encoded = 0
+        self._batches_run = 0
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def encode(self, text):
+        return self.encode_many([text])[0]
+
+    def encode_many(self, texts):
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put((text if text else "", future))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def stats(self):
+        with self._lock:
+            batches = self._batches_run
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": batches,
+                "texts": self._texts_encoded,
+                "mean_batch_size": (self._texts_encoded / batches) if batches else 0.0,
+                "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                "queue_depth": self._queue.qsize()
+            }
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.encode_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._texts_encoded += len(batch)
+                self._batches_run += 1
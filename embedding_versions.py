@@ -0,0 +1,319 @@
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+from response_cache import bump_cache_version
+
+VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_versions (
+    version TEXT PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    store_dir TEXT NOT NULL,
+    dim INTEGER,
+    status TEXT NOT NULL CHECK (status IN ('building', 'active', 'retired')),
+    phase TEXT,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    snapshot_job_id INTEGER,
+    jobs_total INTEGER NOT NULL DEFAULT 0,
+    jobs_done INTEGER NOT NULL DEFAULT 0,
+    candidates_total INTEGER NOT NULL DEFAULT 0,
+    candidates_done INTEGER NOT NULL DEFAULT 0,
+    candidates_scored INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    last_error TEXT,
+    started_at TEXT,
+    heartbeat_at TEXT,
+    activated_at TEXT
+);
+"""
+
+STAGING_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores_staging (
+    candidate_id INTEGER NOT NULL,
+    job_id INTEGER NOT NULL,
+    skill_score REAL,
+    education_score REAL,
+    project_relevance_score REAL,
+    experience_score REAL,
+    eligibility_score REAL,
+    PRIMARY KEY (candidate_id, job_id)
+) WITHOUT ROWID;
+"""
+
+# Archived jobs have no vectors or scores, so a rebuild skips them
+REINDEX_SOURCES = {"job": ("jobs", "job_id", "archived_at IS NULL"), "candidate": ("candidates", "candidate_id", "1=1")}
+REINDEX_PHASES = ["job", "candidate", "scores", "catchup"]
+SCORE_COLUMNS = "skill_score, education_score, project_relevance_score, experience_score, eligibility_score"
+
+
+def version_id(model_name, backend):
+    return f"{re.sub(r'[^a-z0-9]+', '-', model_name.lower()).strip('-')}-{backend}"
+
+
+def init_embedding_versions(cursor):
+    cursor.execute(VERSIONS_SCHEMA)
+    cursor.execute(STAGING_SCHEMA)
+
+
+def get_version(cursor, version=None):
+    """The given embedding version, or the active one when ``version`` is None."""
+    if version is None:
+        cursor.execute("SELECT * FROM embedding_versions WHERE status = 'active'")
+    else:
+        cursor.execute("SELECT * FROM embedding_versions WHERE version = ?", (version,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def building_version(cursor):
+    cursor.execute("SELECT * FROM embedding_versions WHERE status = 'building' ORDER BY started_at DESC LIMIT 1")
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def request_version(cursor, model_name, backend, store_dir, status='building'):
+    """Register a model version to build; a retired version is rebuilt from scratch."""
+    version = version_id(model_name, backend)
+    existing = get_version(cursor, version)
+    if existing and existing["status"] != 'retired':
+        return version
+    cursor.execute("DELETE FROM embedding_versions WHERE version = ?", (version,))
+    cursor.execute("""
+        INSERT INTO embedding_versions (version, model_name, backend, store_dir, status, phase, started_at, activated_at)
+        VALUES (?, ?, ?, ?, ?, ?, datetime('now'), CASE WHEN ? = 'active' THEN datetime('now') END)
+    """, (version, model_name, backend, store_dir, status, REINDEX_PHASES[0] if status == 'building' else 'done', status))
+    return version
+
+
+def version_progress(cursor, version):
+    """Progress of a re-index with a rough ETA from the average rate since it started."""
+    cursor.execute("""
+        SELECT *, (julianday('now') - julianday(started_at)) * 86400 AS elapsed_seconds
+        FROM embedding_versions WHERE version = ?
+    """, (version,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    progress = dict(row)
+    total = row["jobs_total"] + 2 * row["candidates_total"]
+    done = min(total, row["jobs_done"] + row["candidates_done"] + row["candidates_scored"])
+    rate = done / row["elapsed_seconds"] if row["elapsed_seconds"] else 0
+    progress["percent"] = round(100.0 * done / total, 1) if total else (100.0 if row["status"] == 'active' else 0.0)
+    progress["eta_seconds"] = round((total - done) / rate, 1) if rate and row["status"] == 'building' else None
+    return progress
+
+
+class EmbeddingReindexer:
+    """Re-encodes every job and candidate with a new embedding model in the background.
+
+    The new vectors go to the version's own store while the active version
+    keeps serving. Work runs in throttled batches and is checkpointed in
+    ``embedding_versions``, so a restarted process resumes where the last one
+    stopped. Rescored matches collect in ``scores_staging`` and replace the
+    live scores in the same transaction that makes the version active.
+
+    ``encode_rows(kind, rows)`` stores vectors for the given rows,
+    ``missing_ids(kind, ids)`` returns the ids without vectors in the new store,
+    ``stage_scores(cursor, candidate, job_ids)`` returns ``[(candidate_id, job_id,
+    skill, education, project, experience, eligibility)]`` against ``job_ids``
+    (all jobs when None) and ``on_activated(version)`` runs once the
+    switch-over has committed.
+    """
+
+    def __init__(self, db_path, version, encode_rows, missing_ids, stage_scores, on_activated=None,
+                 batch_size=64, pause_seconds=0.5, stale_seconds=120):
+        self.db_path = db_path
+        self.version = version
+        self.encode_rows = encode_rows
+        self.missing_ids = missing_ids
+        self.stage_scores = stage_scores
+        self.on_activated = on_activated
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.stale_seconds = stale_seconds
+        self.worker = uuid.uuid4().hex
+        self._thread = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def claim(self, cursor):
+        """Take ownership of the build unless a live worker in another process holds it."""
+        cursor.execute("""
+            UPDATE embedding_versions
+            SET worker = ?, heartbeat_at = datetime('now'),
+                jobs_total = (SELECT COUNT(*) FROM jobs WHERE archived_at IS NULL),
+                candidates_total = (SELECT COUNT(*) FROM candidates)
+            WHERE version = ? AND status = 'building'
+              AND (worker IS NULL OR worker = ? OR heartbeat_at < datetime('now', ?))
+        """, (self.worker, self.version, self.worker, f"-{int(self.stale_seconds)} seconds"))
+        return cursor.rowcount == 1
+
+    def _checkpoint(self, conn, **fields):
+        assignments = [
+            f"{name} = {name} + ?" if name.endswith(("_done", "_scored")) else f"{name} = ?" for name in fields
+        ]
+        assignments.append("heartbeat_at = datetime('now')")
+        conn.execute(
+            f"UPDATE embedding_versions SET {', '.join(assignments)} WHERE version = ?",
+            (*fields.values(), self.version)
+        )
+        conn.commit()
+        time.sleep(self.pause_seconds)
+
+    def _pages(self, conn, kind, after_id):
+        table, id_column, condition = REINDEX_SOURCES[kind]
+        while True:
+            rows = [dict(row) for row in conn.execute(
+                f"SELECT * FROM {table} WHERE {condition} AND {id_column} > ? ORDER BY {id_column} LIMIT ?",
+                (after_id, self.batch_size)
+            ).fetchall()]
+            if not rows:
+                return
+            after_id = rows[-1][id_column]
+            yield rows, after_id
+
+    def _stage(self, conn, candidate, job_ids=None):
+        if job_ids is None:
+            conn.execute("DELETE FROM scores_staging WHERE candidate_id = ?", (candidate["candidate_id"],))
+        conn.executemany(
+            f"INSERT OR REPLACE INTO scores_staging (candidate_id, job_id, {SCORE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self.stage_scores(conn.cursor(), candidate, job_ids)
+        )
+
+    def _encode_phase(self, conn, kind, after_id):
+        for rows, after_id in self._pages(conn, kind, after_id):
+            self.encode_rows(kind, rows)
+            self._checkpoint(conn, last_id=after_id, **{f"{kind}s_done": len(rows)})
+
+    def _score_phase(self, conn, after_id):
+        if get_version(conn.cursor(), self.version)["snapshot_job_id"] is None:
+            snapshot = conn.execute("SELECT COALESCE(MAX(job_id), 0) FROM jobs").fetchone()[0]
+            self._checkpoint(conn, snapshot_job_id=snapshot)
+        for rows, after_id in self._pages(conn, "candidate", after_id):
+            for candidate in rows:
+                self._stage(conn, candidate)
+            self._checkpoint(conn, last_id=after_id, candidates_scored=len(rows))
+
+    def _catch_up(self, conn, final=False):
+        """Pick up rows added or re-indexed by the live version while the build ran.
+
+        The ``final`` pass runs inside the switch-over transaction, where live
+        writes are blocked, and only redoes the rows whose new vectors are missing.
+        """
+        changed = {}
+        for kind in ("job", "candidate"):
+            table, id_column, condition = REINDEX_SOURCES[kind]
+            ids = [row[0] for row in conn.execute(f"SELECT {id_column} FROM {table} WHERE {condition}").fetchall()]
+            changed[kind] = self.missing_ids(kind, ids)
+            for start in range(0, len(ids), self.batch_size):
+                chunk = [i for i in ids[start:start + self.batch_size] if i in changed[kind]]
+                if chunk:
+                    rows = conn.execute(
+                        f"SELECT * FROM {table} WHERE {id_column} IN ({', '.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    self.encode_rows(kind, [dict(row) for row in rows])
+                    if not final:
+                        self._checkpoint(conn)
+
+        if final:
+            staged, changed_jobs = None, changed["job"]
+            if not changed_jobs and not changed["candidate"]:
+                return
+        else:
+            snapshot = get_version(conn.cursor(), self.version)["snapshot_job_id"]
+            staged = {row[0] for row in conn.execute("SELECT DISTINCT candidate_id FROM scores_staging").fetchall()}
+            changed_jobs = changed["job"] | {
+                row[0] for row in conn.execute("SELECT job_id FROM jobs WHERE archived_at IS NULL AND job_id > ?", (snapshot or 0,)).fetchall()
+            }
+        for rows, _ in self._pages(conn, "candidate", 0):
+            for candidate in rows:
+                if candidate["candidate_id"] in changed["candidate"] or (staged is not None and candidate["candidate_id"] not in staged):
+                    self._stage(conn, candidate)
+                elif changed_jobs:
+                    self._stage(conn, candidate, sorted(changed_jobs))
+            if not final:
+                self._checkpoint(conn)
+
+    def switch(self, conn):
+        """Atomically replace live scores with the staged ones and activate the version."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Rows written after the last catch-up pass would otherwise switch over without new vectors
+            self._catch_up(conn, final=True)
+            conn.execute("DELETE FROM scores WHERE candidate_id IN (SELECT DISTINCT candidate_id FROM scores_staging)")
+            conn.execute(f"""
+                INSERT INTO scores (candidate_id, job_id, {SCORE_COLUMNS}, model_version)
+                SELECT candidate_id, job_id, {SCORE_COLUMNS}, ? FROM scores_staging
+                WHERE job_id IN (SELECT job_id FROM jobs WHERE archived_at IS NULL)
+            """, (self.version,))
+            conn.execute("DELETE FROM scores_staging")
+            conn.execute("UPDATE embedding_versions SET status = 'retired', worker = NULL WHERE status = 'active'")
+            conn.execute("""
+                UPDATE embedding_versions
+                SET status = 'active', phase = 'done', worker = NULL, last_error = NULL, activated_at = datetime('now')
+                WHERE version = ?
+            """, (self.version,))
+            bump_cache_version(conn, "scores")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if self.on_activated:
+            self.on_activated(get_version(conn.cursor(), self.version))
+
+    def run(self):
+        """Build the version to completion; returns True once it is active."""
+        conn = self._connect()
+        try:
+            if not self.claim(conn.cursor()):
+                conn.commit()
+                return False
+            conn.commit()
+
+            row = get_version(conn.cursor(), self.version)
+            for phase in REINDEX_PHASES[REINDEX_PHASES.index(row["phase"]):]:
+                after_id = row["last_id"] if phase == row["phase"] else 0
+                if phase != row["phase"]:
+                    self._checkpoint(conn, phase=phase, last_id=0)
+                if phase in REINDEX_SOURCES:
+                    self._encode_phase(conn, phase, after_id)
+                elif phase == "scores":
+                    self._score_phase(conn, after_id)
+                else:
+                    self._catch_up(conn)
+                row = get_version(conn.cursor(), self.version)
+
+            self.switch(conn)
+            print(f"Embedding version {self.version} is now active")
+            return True
+        except Exception as e:
+            conn.rollback()
+            conn.execute(
+                "UPDATE embedding_versions SET worker = NULL, last_error = ? WHERE version = ?",
+                (str(e), self.version)
+            )
+            conn.commit()
+            print(f"Embedding re-index of {self.version} failed: {e}")
+            return False
+        finally:
+            conn.close()
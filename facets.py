@@ -0,0 +1,113 @@
+FACETS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_facets (
+    facet TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (facet, value)
+) WITHOUT ROWID;
+"""
+
+
+def init_facets(cursor):
+    cursor.execute(FACETS_SCHEMA)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_facets_count ON job_facets (facet, count DESC)")
+
+
+def job_facet_values(company, location, skills):
+    return [("company", company), ("location", location)] + [("skill", skill) for skill in skills]
+
+
+def update_facets(cursor, values, delta):
+    """Add ``delta`` to each (facet, value) count, dropping values that reach zero."""
+    values = [(facet, value) for facet, value in values if value is not None]
+    cursor.executemany(
+        "INSERT INTO job_facets (facet, value, count) VALUES (?, ?, ?) "
+        "ON CONFLICT(facet, value) DO UPDATE SET count = count + excluded.count",
+        [(facet, value, delta) for facet, value in values]
+    )
+    if delta < 0:
+        cursor.executemany(
+            "DELETE FROM job_facets WHERE facet = ? AND value = ? AND count <= 0",
+            values
+        )
+
+
+def add_job_to_facets(cursor, company, location, skills):
+    update_facets(cursor, job_facet_values(company, location, skills), 1)
+
+
+def remove_job_from_facets(cursor, job_id):
+    """Decrement the facets of a job; call before deleting its row and skill tokens.
+
+    Archived jobs were already taken out of the counts when they were archived.
+    """
+    cursor.execute("SELECT company, location FROM jobs WHERE job_id = ? AND archived_at IS NULL", (job_id,))
+    row = cursor.fetchone()
+    if not row:
+        return
+    cursor.execute("SELECT skill FROM job_skills WHERE job_id = ?", (job_id,))
+    skills = [r[0] for r in cursor.fetchall()]
+    update_facets(cursor, job_facet_values(row[0], row[1], skills), -1)
+
+
+def rebuild_facets(cursor):
+    """Recount the facets of every unarchived job."""
+    cursor.execute("DELETE FROM job_facets")
+    cursor.execute("""
+        INSERT INTO job_facets (facet, value, count)
+        SELECT 'company', company, COUNT(*) FROM jobs WHERE archived_at IS NULL AND company IS NOT NULL GROUP BY company
+        UNION ALL
+        SELECT 'location', location, COUNT(*) FROM jobs WHERE archived_at IS NULL AND location IS NOT NULL GROUP BY location
+        UNION ALL
+        SELECT 'skill', skill, COUNT(*) FROM job_skills
+        WHERE job_id IN (SELECT job_id FROM jobs WHERE archived_at IS NULL) GROUP BY skill
+    """)
+
+
+def facet_query(facet, where):
+    """``SELECT value, count`` of one facet over the jobs matching ``where``."""
+    if facet == "skill":
+        return f"""
+            SELECT skill, COUNT(*) FROM job_skills
+            WHERE job_id IN (SELECT job_id FROM jobs WHERE {where})
+            GROUP BY skill
+        """
+    return f"""
+        SELECT {facet}, COUNT(*) FROM jobs
+        WHERE {where} AND {facet} IS NOT NULL
+        GROUP BY {facet}
+    """
+
+
+def facet_counts(cursor, facet, limit=None, exclude=None):
+    """Maintained counts of one facet.
+
+    ``exclude`` is a condition over jobs that are still counted but should no
+    longer be listed (expired or closed, not archived yet); their facet values
+    are subtracted on the fly.
+    """
+    if exclude:
+        query = f"""
+            WITH excluded(value, count) AS ({facet_query(facet, exclude)})
+            SELECT f.value, f.count - COALESCE(e.count, 0) AS remaining
+            FROM job_facets f LEFT JOIN excluded e ON e.value = f.value
+            WHERE f.facet = ? AND remaining > 0
+            ORDER BY remaining DESC, f.value
+        """
+    else:
+        query = "SELECT value, count FROM job_facets WHERE facet = ? ORDER BY count DESC, value"
+    params = [facet]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    cursor.execute(query, params)
+    return [{"value": value, "count": count} for value, count in cursor.fetchall()]
+
+
+def filtered_facet_counts(cursor, facet, where, params, limit=None):
+    """Facet counts over the jobs matching ``where`` (a clause over the jobs table)."""
+    query = f"{facet_query(facet, where)} ORDER BY COUNT(*) DESC, {facet}"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    cursor.execute(query, params)
+    return [{"value": value, "count": count} for value, count in cursor.fetchall()]
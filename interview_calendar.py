@@ -0,0 +1,110 @@
+import re
+from datetime import datetime, timedelta
+
+# Interval queries only scan starts_at within this window before the range
+# end, so longer interviews are rejected rather than silently missed.
+MAX_DURATION_MINUTES = 8 * 60
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%B %d, %Y", "%b %d, %Y"]
+TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p"]
+DURATION_UNITS = {"h": 60, "hr": 60, "hrs": 60, "hour": 60, "hours": 60,
+                  "m": 1, "min": 1, "mins": 1, "minute": 1, "minutes": 1}
+
+
+def init_interview_calendar(cursor):
+    """Index and backfill the ``starts_at``/``ends_at`` columns of ``interviews``."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_interviews_starts ON interviews (starts_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_interviews_recruiter_starts ON interviews (recruiter_id, starts_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_interviews_candidate_starts ON interviews (candidate_id, starts_at)")
+
+    rows = cursor.execute("SELECT interview_id, date, time, duration FROM interviews WHERE starts_at IS NULL").fetchall()
+    updates = []
+    for interview_id, date, time, duration in rows:
+        try:
+            updates.append(interview_bounds(date, time, duration) + (interview_id,))
+        except ValueError:
+            pass
+    cursor.executemany("UPDATE interviews SET starts_at = ?, ends_at = ? WHERE interview_id = ?", updates)
+    if len(updates) < len(rows):
+        print(f"Could not normalize {len(rows) - len(updates)} interview date/time values; they are left out of range queries")
+
+
+def parse_duration_minutes(duration):
+    """Minutes in "45 minutes", "1 hour", "1h 30m" or a bare number of minutes."""
+    text = str(duration).strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", text):
+        return int(float(text))
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*([a-z]+)", text)
+    if not parts or any(unit not in DURATION_UNITS for _, unit in parts):
+        raise ValueError(f"cannot parse duration {duration!r}")
+    return int(sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts))
+
+
+def parse_with(value, formats, label):
+    text = " ".join(str(value).split())
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"cannot parse {label} {value!r}") from None
+
+
+def interview_bounds(date, time, duration):
+    """Return ``(starts_at, ends_at)`` as sortable ``YYYY-MM-DD HH:MM:SS`` strings."""
+    day = parse_with(date, DATE_FORMATS, "date").date()
+    clock = parse_with(time.upper() if isinstance(time, str) else time, TIME_FORMATS, "time").time()
+    minutes = parse_duration_minutes(duration)
+    if not 0 < minutes <= MAX_DURATION_MINUTES:
+        raise ValueError(f"duration must be between 1 and {MAX_DURATION_MINUTES} minutes")
+    starts = datetime.combine(day, clock)
+    ends = starts + timedelta(minutes=minutes)
+    return starts.strftime(TIMESTAMP_FORMAT), ends.strftime(TIMESTAMP_FORMAT)
+
+
+def overlap_clause(column_prefix=""):
+    """SQL for "overlaps [range_start, range_end)"; bind it with ``overlap_params``.
+
+    The lower bound on starts_at keeps the condition a range scan on the
+    starts_at indexes instead of a test of every earlier interview.
+    """
+    return (f"{column_prefix}starts_at >= datetime(?, '-{MAX_DURATION_MINUTES} minutes') "
+            f"AND {column_prefix}starts_at < ? AND {column_prefix}ends_at > ?")
+
+
+def overlap_params(range_start, range_end):
+    return [range_start, range_end, range_start]
+
+
+def begin_booking(cursor):
+    """Take the database write lock before a conflict check.
+
+    Under a deferred transaction two concurrent bookings could both pass
+    ``find_conflicts`` and then both write; ``BEGIN IMMEDIATE`` makes the
+    second wait until the first commits and then see its interview.
+    """
+    if not cursor.connection.in_transaction:
+        cursor.execute("BEGIN IMMEDIATE")
+
+
+def find_conflicts(cursor, starts_at, ends_at, recruiter_id=None, candidate_id=None, exclude_id=None):
+    """Scheduled interviews of the recruiter or candidate that overlap ``[starts_at, ends_at)``."""
+    conflicts = []
+    for column, value in (("recruiter_id", recruiter_id), ("candidate_id", candidate_id)):
+        if value is None:
+            continue
+        cursor.execute(f"""
+            SELECT interview_id, candidate_id, recruiter_id, job_id, starts_at, ends_at
+            FROM interviews
+            WHERE {column} = ? AND {overlap_clause()}
+              AND status = 'scheduled' AND interview_id != ?
+        """, [value] + overlap_params(starts_at, ends_at) + [exclude_id or -1])
+        conflicts.extend(
+            dict(zip(("interview_id", "candidate_id", "recruiter_id", "job_id", "starts_at", "ends_at"), row), conflict_on=column)
+            for row in cursor.fetchall()
+        )
+    return conflicts
@@ -0,0 +1,189 @@
+import csv
+import hashlib
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from llm_client import LLMUnavailableError
+
+IMPORT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_imports (
+    import_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'paused', 'completed', 'failed')),
+    rows_total INTEGER,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    jobs_inserted INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+REQUIRED_COLUMNS = ['Job Title', 'Job Description']
+
+
+def init_imports(cursor):
+    cursor.execute(IMPORT_SCHEMA)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_imports_fingerprint ON job_imports (fingerprint, status)")
+
+
+def file_fingerprint(path, sample_bytes=65536):
+    """Identify a feed file by its size and leading bytes, independent of its mtime."""
+    digest = hashlib.sha1()
+    digest.update(str(os.path.getsize(path)).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(sample_bytes))
+    return digest.hexdigest()
+
+
+def count_csv_rows(path, encoding):
+    with open(path, newline="", encoding=encoding) as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+
+def import_status(cursor, import_id=None):
+    if import_id is None:
+        cursor.execute("SELECT * FROM job_imports ORDER BY import_id DESC LIMIT 50")
+        return [dict(row) for row in cursor.fetchall()]
+    cursor.execute("SELECT * FROM job_imports WHERE import_id = ?", (import_id,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+class JobFeedImport:
+    """Chunked, resumable import of a job CSV feed.
+
+    The file is read ``chunk_size`` rows at a time. Each chunk's jobs are
+    inserted and the checkpoint advanced in one transaction, so an interrupted
+    import resumes after the last committed chunk. ``parse_rows`` maps
+    ``[(row_id, description)]`` to ``{row_id: features}``, ``insert_job``
+    inserts one job on the given connection without committing and
+    ``on_chunk_committed`` receives ``[(job_id, features)]`` after each commit.
+    """
+
+    def __init__(self, db_path, file_path, parse_rows, insert_job, on_chunk_committed=None,
+                 chunk_size=500, encoding='ISO-8859-1'):
+        self.db_path = db_path
+        self.file_path = file_path
+        self.parse_rows = parse_rows
+        self.insert_job = insert_job
+        self.on_chunk_committed = on_chunk_committed
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.import_id = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def validate(self):
+        columns = pd.read_csv(self.file_path, encoding=self.encoding, nrows=0).columns
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError("CSV must contain 'Job Title' and 'Job Description' columns")
+
+    def start(self, resume=True):
+        """Create an import run, or pick up an unfinished one for the same file."""
+        self.validate()
+        fingerprint = file_fingerprint(self.file_path)
+        conn = self._connect()
+        cursor = conn.cursor()
+        row = None
+        if resume:
+            cursor.execute("""
+                SELECT import_id FROM job_imports
+                WHERE fingerprint = ? AND status IN ('running', 'paused', 'failed')
+                ORDER BY import_id DESC LIMIT 1
+            """, (fingerprint,))
+            row = cursor.fetchone()
+
+        if row:
+            self.import_id = row["import_id"]
+            cursor.execute(
+                "UPDATE job_imports SET status = 'running', file_path = ?, updated_at = datetime('now') WHERE import_id = ?",
+                (self.file_path, self.import_id)
+            )
+        else:
+            cursor.execute(
+                "INSERT INTO job_imports (file_path, fingerprint, rows_total) VALUES (?, ?, ?)",
+                (self.file_path, fingerprint, count_csv_rows(self.file_path, self.encoding))
+            )
+            self.import_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return self.import_id
+
+    def status(self):
+        conn = self._connect()
+        status = import_status(conn.cursor(), self.import_id)
+        conn.close()
+        return status
+
+    def run(self, progress=None):
+        """Import the remaining rows; returns the final import status."""
+        if self.import_id is None:
+            self.start()
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        rows_done = import_status(cursor, self.import_id)["rows_done"]
+        reader = pd.read_csv(self.file_path, encoding=self.encoding, usecols=REQUIRED_COLUMNS, chunksize=self.chunk_size)
+
+        try:
+            rows_read = 0
+            for chunk in reader:
+                # Skip records committed by an earlier run (quoted fields may span lines)
+                chunk_start, rows_read = rows_read, rows_read + len(chunk)
+                if rows_read <= rows_done:
+                    continue
+                chunk = chunk.iloc[rows_done - chunk_start:] if rows_done > chunk_start else chunk
+
+                started = time.monotonic()
+                # Empty CSV cells come back as NaN, which is truthy and not a string
+                titles = chunk['Job Title'].fillna("").astype(str).str.strip().tolist()
+                descriptions = chunk['Job Description'].fillna("").astype(str).tolist()
+                rows = [(rows_done + i, description) for i, description in enumerate(descriptions)]
+                features = self.parse_rows(rows)
+
+                inserted = []
+                for i, (row_id, _) in enumerate(rows):
+                    job_features = dict(features[row_id])
+                    job_features["Job Title"] = titles[i]
+                    inserted.append((self.insert_job(conn, job_features), job_features))
+
+                rows_done += len(rows)
+                cursor.execute("""
+                    UPDATE job_imports
+                    SET rows_done = ?, jobs_inserted = jobs_inserted + ?, updated_at = datetime('now')
+                    WHERE import_id = ?
+                """, (rows_done, len(inserted), self.import_id))
+                conn.commit()
+
+                if self.on_chunk_committed:
+                    self.on_chunk_committed(inserted)
+                if progress:
+                    progress(import_status(cursor, self.import_id), time.monotonic() - started)
+
+            cursor.execute(
+                "UPDATE job_imports SET status = 'completed', last_error = NULL, updated_at = datetime('now') WHERE import_id = ?",
+                (self.import_id,)
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            status = 'paused' if isinstance(e, LLMUnavailableError) else 'failed'
+            cursor.execute(
+                "UPDATE job_imports SET status = ?, last_error = ?, updated_at = datetime('now') WHERE import_id = ?",
+                (status, str(e), self.import_id)
+            )
+            conn.commit()
+            raise
+        finally:
+            final = import_status(cursor, self.import_id)
+            conn.close()
+        return final
@@ -0,0 +1,78 @@
+from embedding_versions import SCORE_COLUMNS
+from facets import remove_job_from_facets
+
+JOB_STATUSES = ("open", "closed")
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores_archive (
+    candidate_id INTEGER NOT NULL,
+    job_id INTEGER NOT NULL,
+    skill_score REAL,
+    education_score REAL,
+    project_relevance_score REAL,
+    experience_score REAL,
+    eligibility_score REAL,
+    model_version TEXT,
+    archived_at TEXT NOT NULL,
+    PRIMARY KEY (job_id, candidate_id)
+) WITHOUT ROWID;
+"""
+
+
+def active_job_condition(alias=""):
+    """SQL condition for jobs that are open and not past their expiry."""
+    return (f"{alias}status = 'open' AND ({alias}expires_at IS NULL OR {alias}expires_at > datetime('now'))")
+
+
+# Grows as open jobs pass their expiry and drops back when they are archived (which bumps "jobs")
+EXPIRED_JOBS_SQL = "SELECT COUNT(*) FROM jobs WHERE status = 'open' AND expires_at <= datetime('now') AND archived_at IS NULL"
+
+
+def init_job_lifecycle(cursor):
+    """Create the score archive and the indexes over the lifecycle columns of ``jobs``."""
+    cursor.execute(ARCHIVE_SCHEMA)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lifecycle ON jobs (status, expires_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_unarchived ON jobs (job_id) WHERE archived_at IS NULL")
+
+
+def unarchived_inactive_condition():
+    """SQL condition for jobs that are closed or expired but still in the hot tables."""
+    return f"archived_at IS NULL AND NOT ({active_job_condition()})"
+
+
+def jobs_to_archive(cursor):
+    """Ids of jobs that are closed or expired but still in the hot tables."""
+    cursor.execute(f"SELECT job_id FROM jobs WHERE {unarchived_inactive_condition()}")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def archive_job(cursor, job_id):
+    """Move a job's scores to ``scores_archive`` and drop its skill tokens and facet counts.
+
+    The job row stays so applications and interviews keep joining to it; the
+    caller removes the job's vectors from the vector store.
+    """
+    remove_job_from_facets(cursor, job_id)
+    cursor.execute(f"""
+        INSERT OR REPLACE INTO scores_archive (candidate_id, job_id, {SCORE_COLUMNS}, model_version, archived_at)
+        SELECT candidate_id, job_id, {SCORE_COLUMNS}, model_version, datetime('now') FROM scores WHERE job_id = ?
+    """, (job_id,))
+    cursor.execute("DELETE FROM scores WHERE job_id = ?", (job_id,))
+    cursor.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+    cursor.execute(
+        "UPDATE jobs SET archived_at = datetime('now'), updated_at = datetime('now'), "
+        "closed_at = COALESCE(closed_at, datetime('now')) WHERE job_id = ?",
+        (job_id,)
+    )
+
+
+def unarchive_job(cursor, job_id):
+    """Mark an archived job live again; its archived scores are stale and are dropped.
+
+    The caller re-indexes the job's skills, facets and vectors and rescores it.
+    """
+    cursor.execute("DELETE FROM scores_archive WHERE job_id = ?", (job_id,))
+    cursor.execute(
+        "UPDATE jobs SET archived_at = NULL, closed_at = NULL, updated_at = datetime('now') WHERE job_id = ?",
+        (job_id,)
+    )
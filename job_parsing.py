@@ -0,0 +1,61 @@
+import json
+
+from resume_preprocess import estimate_tokens
+
+JOB_FEATURE_FIELDS = [
+    "Job Title", "Company", "Location", "Required Skills", "Experience",
+    "Qualifications", "Responsibilities", "Benefits", "Other Details"
+]
+
+
+def strip_json_fence(content):
+    json_str = content.strip()
+    if json_str.startswith("```json") and json_str.endswith("```"):
+        json_str = json_str[len("```json"):].rstrip("```").strip()
+    return json_str
+
+
+def format_job_batch(rows):
+    return "\n\n".join(f"### Row {row_id}\n\"\"\"{job_text}\"\"\"" for row_id, job_text in rows)
+
+
+def pack_job_batches(rows, token_budget, max_items, overhead=0):
+    """Group (row_id, job_text) pairs into batches that fit the prompt token budget.
+
+    ``overhead`` is the token cost of the prompt template itself.
+    """
+    # Output is roughly as long as the input for short descriptions
+    budget = max(1, (token_budget - overhead) // 2)
+    batch, used = [], 0
+    for row_id, job_text in rows:
+        cost = estimate_tokens(f"### Row {row_id}\n{job_text}\n")
+        if batch and (used + cost > budget or len(batch) >= max_items):
+            yield batch
+            batch, used = [], 0
+        batch.append((row_id, job_text))
+        used += cost
+    if batch:
+        yield batch
+
+
+def parse_job_batch(content, rows):
+    """Return ``{row_id: features}`` for the well-formed items of a batched answer.
+
+    Items for unknown rows, or missing any of the string fields, are left out
+    so the caller can re-parse those rows individually.
+    """
+    try:
+        items = json.loads(strip_json_fence(content))
+    except json.JSONDecodeError as e:
+        print(f"Error parsing batched JSON response: {e}")
+        items = []
+
+    results = {}
+    expected = {str(row_id): row_id for row_id, _ in rows}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or str(item.get("row_id")) not in expected:
+            continue
+        if not all(isinstance(item.get(field), str) for field in JOB_FEATURE_FIELDS):
+            continue
+        results[expected[str(item["row_id"])]] = {field: item[field] for field in JOB_FEATURE_FIELDS}
+    return results
@@ -0,0 +1,396 @@
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM call failed for good or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe after ``reset_timeout``."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """Returns True when this failure opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+            return not was_open and self.opened_at is not None
+
+
+class ResilientLLM:
+    """Wrap a LangChain chat model with deadlines, retries, hedging and a circuit breaker.
+
+    Each attempt gets ``timeout`` seconds. Failed attempts are retried up to
+    ``max_retries`` times with jittered exponential backoff. When ``hedge`` is
+    on, a duplicate request is started once an attempt runs longer than the
+    observed p95 latency (at least ``min_hedge_delay``), and the first answer
+    wins. Repeated failures open the breaker, after which calls fail fast with
+    ``LLMUnavailableError`` until a probe succeeds. ``ainvoke`` applies the same
+    policy to the model's native coroutine API without tying up a thread.
+    """
+
+    def __init__(self, llm, timeout=30.0, max_retries=2, base_backoff=0.5, max_backoff=8.0,
+                 hedge=False, min_hedge_delay=1.0, breaker=None, max_workers=16):
+        self.llm = llm
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._latencies = deque(maxlen=200)
+        self._metrics = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._metrics[name] += amount
+
+    def p95_latency(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 20:
+            return None
+        return latencies[int(len(latencies) * 0.95) - 1]
+
+    def _timed_invoke(self, messages):
+        start = time.monotonic()
+        response = self.llm.invoke(messages)
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return response
+
+    def _attempt(self, messages):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        pending = {self._executor.submit(self._timed_invoke, messages)}
+        hedge_at = None
+        if self.hedge:
+            hedge_at = start + max(self.min_hedge_delay, self.p95_latency() or self.timeout)
+        hedge_future = None
+        error = None
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake_at = deadline if hedge_at is None or hedge_future else min(deadline, hedge_at)
+            done, pending = wait(pending, timeout=wake_at - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge_future:
+                    self._count("hedges_won")
+                return response
+
+            if pending and hedge_at is not None and hedge_future is None and time.monotonic() >= hedge_at:
+                self._count("hedges_started")
+                hedge_future = self._executor.submit(self._timed_invoke, messages)
+                pending.add(hedge_future)
+
+        if error is not None and not pending:
+            raise error
+        self._count("timeouts")
+        raise TimeoutError(f"LLM call exceeded {self.timeout:.1f}s")
+
+    def invoke(self, messages):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise LLMUnavailableError("LLM circuit breaker is open")
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+                time.sleep(min(self.max_backoff, self.base_backoff * (2 ** (attempt - 1))) * random.uniform(0.5, 1.5))
+            try:
+                response = self._attempt(messages)
+            except Exception as e:
+                last_error = e
+                self._count("failures")
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return response
+
+        if self.breaker.record_failure():
+            self._count("breaker_opened")
+        raise LLMUnavailableError(f"LLM call failed after {self.max_retries + 1} attempts: {last_error}")
+
+    async def _timed_ainvoke(self, messages):
+        start = time.monotonic()
+        response = await self.llm.ainvoke(messages)
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return response
+
+    async def _aattempt(self, messages):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        pending = {asyncio.ensure_future(self._timed_ainvoke(messages))}
+        hedge_at = None
+        if self.hedge:
+            hedge_at = start + max(self.min_hedge_delay, self.p95_latency() or self.timeout)
+        hedge_task = None
+        error = None
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                wake_at = deadline if hedge_at is None or hedge_task else min(deadline, hedge_at)
+                done, pending = await asyncio.wait(pending, timeout=wake_at - now, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    if task is hedge_task:
+                        self._count("hedges_won")
+                    return response
+
+                if pending and hedge_at is not None and hedge_task is None and time.monotonic() >= hedge_at:
+                    self._count("hedges_started")
+                    hedge_task = asyncio.ensure_future(self._timed_ainvoke(messages))
+                    pending.add(hedge_task)
+        finally:
+            # Unlike threads, losing or timed-out requests can actually be cancelled
+            for task in pending:
+                task.cancel()
+
+        if error is not None and not pending:
+            raise error
+        self._count("timeouts")
+        raise TimeoutError(f"LLM call exceeded {self.timeout:.1f}s")
+
+    async def ainvoke(self, messages):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise LLMUnavailableError("LLM circuit breaker is open")
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+                await asyncio.sleep(min(self.max_backoff, self.base_backoff * (2 ** (attempt - 1))) * random.uniform(0.5, 1.5))
+            try:
+                response = await self._aattempt(messages)
+            except Exception as e:
+                last_error = e
+                self._count("failures")
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return response
+
+        if self.breaker.record_failure():
+            self._count("breaker_opened")
+        raise LLMUnavailableError(f"LLM call failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            calls = len(self._latencies)
+        p95 = self.p95_latency()
+        return {
+            **metrics,
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "latency_samples": calls,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+
+class DeferredLLMWork:
+    """SQLite-backed queue of work postponed while the LLM provider is unhealthy.
+
+    A background thread replays queued items through the handler registered
+    for their kind whenever the breaker is not open. A running item holds a
+    lease renewed every ``lease_seconds / 3``; an item whose lease lapsed (its
+    worker died) is queued again, or failed after ``max_attempts`` claims.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS llm_work_queue (
+        work_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        heartbeat_at TEXT,
+        finished_at TEXT
+    );
+    """
+
+    def __init__(self, db_path, breaker, poll_interval=10.0, lease_seconds=300.0, max_attempts=5):
+        self.db_path = db_path
+        self.breaker = breaker
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.handlers = {}
+        self._thread = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init(self, cursor):
+        cursor.execute(self.SCHEMA)
+        if "heartbeat_at" not in [row[1] for row in cursor.execute("PRAGMA table_info(llm_work_queue)").fetchall()]:
+            cursor.execute("ALTER TABLE llm_work_queue ADD COLUMN heartbeat_at TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_work_queue_status ON llm_work_queue (status, work_id)")
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def enqueue(self, kind, payload):
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO llm_work_queue (kind, payload) VALUES (?, ?)", (kind, json.dumps(payload)))
+        work_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return work_id
+
+    def _claim(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("""
+            UPDATE llm_work_queue
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                last_error = 'worker lease expired',
+                finished_at = CASE WHEN attempts >= ? THEN datetime('now') END
+            WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < datetime('now', ?))
+        """, (self.max_attempts, self.max_attempts, f"-{int(self.lease_seconds)} seconds"))
+        row = conn.execute("SELECT * FROM llm_work_queue WHERE status = 'queued' ORDER BY work_id LIMIT 1").fetchone()
+        if row:
+            conn.execute(
+                "UPDATE llm_work_queue SET status = 'running', attempts = attempts + 1, heartbeat_at = datetime('now') WHERE work_id = ?",
+                (row["work_id"],)
+            )
+        conn.commit()
+        return row
+
+    def _renew_lease(self, work_id, done):
+        while not done.wait(self.lease_seconds / 3):
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "UPDATE llm_work_queue SET heartbeat_at = datetime('now') WHERE work_id = ? AND status = 'running'",
+                    (work_id,)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Deferred LLM work lease renewal failed: {e}")
+            finally:
+                conn.close()
+
+    def process_once(self):
+        """Run one queued item; returns False when there was nothing runnable."""
+        if self.breaker.state == "open":
+            return False
+        conn = self._connect()
+        try:
+            row = self._claim(conn)
+            if not row:
+                return False
+            done = threading.Event()
+            threading.Thread(target=self._renew_lease, args=(row["work_id"], done), daemon=True).start()
+            try:
+                return self._run_item(conn, row)
+            finally:
+                done.set()
+        finally:
+            conn.close()
+
+    def _run_item(self, conn, row):
+        try:
+            self.handlers[row["kind"]](json.loads(row["payload"]))
+        except LLMUnavailableError as e:
+            conn.execute("UPDATE llm_work_queue SET status = 'queued', last_error = ? WHERE work_id = ?", (str(e), row["work_id"]))
+            conn.commit()
+            return False
+        except Exception as e:
+            conn.execute(
+                "UPDATE llm_work_queue SET status = 'failed', last_error = ?, finished_at = datetime('now') WHERE work_id = ?",
+                (str(e), row["work_id"])
+            )
+            conn.commit()
+            return True
+        conn.execute("UPDATE llm_work_queue SET status = 'done', finished_at = datetime('now') WHERE work_id = ?", (row["work_id"],))
+        conn.commit()
+        return True
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="llm-deferred-work", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                if self.process_once():
+                    continue
+            except Exception as e:
+                print(f"Deferred LLM work error: {e}")
+            time.sleep(self.poll_interval)
+
+    def stats(self, cursor):
+        cursor.execute("SELECT status, COUNT(*) FROM llm_work_queue GROUP BY status")
+        return {status: count for status, count in cursor.fetchall()}
@@ -0,0 +1,454 @@
+"""Load-test harness: ``python loadtest.py --rps 20 --duration 60``.
+
+Boots the app under gunicorn in a scratch directory (its own SQLite file,
+uploads and vector store) with local stand-ins for the Groq API and the SMTP
+server, seeds it with jobs and candidates, then drives a weighted mix of
+resume and job uploads, match lookups, job searches and interview writes at
+a fixed arrival rate. Latency is measured from each request's scheduled start,
+so a stalled server shows up as queueing rather than a lower request rate.
+The report is JSON with per-endpoint p50/p95/p99 latency, error rates and
+throughput. Pass ``--url`` to drive an already-running deployment instead.
+"""
+import itertools
+import json
+import os
+import random
+import shutil
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+import numpy as np
+
+DEFAULT_MIX = "upload_resume=1,upload_job=1,match_lookup=10,job_search=10,interview_write=3,interview_request=1"
+SKILLS = ["python", "react", "sql", "aws", "docker", "kubernetes", "java", "go", "typescript", "pandas",
+          "machine learning", "flask", "node.js", "terraform", "spark", "excel", "figma", "rust"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark"]
+LOCATIONS = ["Remote", "Berlin", "New York", "Bangalore", "London"]
+
+
+class FakeGroq(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions endpoint that answers with canned parses after ``latency`` seconds."""
+
+    latency = 0.5
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = " ".join(str(message.get("content", "")) for message in body.get("messages", []))
+        with FakeGroq.lock:
+            FakeGroq.calls += 1
+        time.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+        rng = random.Random()
+        skills = ", ".join(rng.sample(SKILLS, 5))
+        if "resume parser" in prompt:
+            content = {
+                "Name": f"Load Test {uuid.uuid4().hex[:8]}",
+                "Email": f"{uuid.uuid4().hex[:12]}@loadtest.invalid",
+                "Phone": "None",
+                "LinkedIn": "None",
+                "Required Skills": skills,
+                "Qualifications": "B.Sc. Computer Science",
+                "Projects": "web services, data pipelines",
+                "Experience": f"{rng.randint(1, 12)} years building {skills}"
+            }
+        else:
+            content = {
+                "Job Title": f"{rng.choice(['Senior', 'Junior', 'Staff'])} {rng.choice(SKILLS).title()} Engineer",
+                "Company": rng.choice(COMPANIES),
+                "Location": rng.choice(LOCATIONS),
+                "Required Skills": skills,
+                "Experience": f"{rng.randint(1, 8)}+ years",
+                "Qualifications": "Bachelor's degree",
+                "Responsibilities": "Build and run services",
+                "Benefits": "None",
+                "Other Details": "None"
+            }
+        payload = json.dumps({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content)}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 200, "total_tokens": len(prompt) // 4 + 200}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSMTP(socketserver.StreamRequestHandler):
+    """Plain SMTP sink that accepts every message (no STARTTLS or AUTH)."""
+
+    messages = 0
+    lock = threading.Lock()
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 loadtest ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 loadtest")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                with FakeSMTP.lock:
+                    FakeSMTP.messages += 1
+                self.reply("250 OK queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+def start_server(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def resume_pdf(text):
+    """A one-page PDF containing ``text``, built by hand so the harness needs no PDF library."""
+    stream = "BT /F1 11 Tf 50 750 Td 14 TL " + " ".join(
+        "({}) '".format(line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")) for line in text.splitlines()
+    ) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    pdf, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return pdf.encode("latin-1")
+
+
+def multipart(field, filename, content, content_type):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class Client:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, json_body=None, body=None, content_type=None):
+        """Return ``(status, parsed JSON or None)``; status 0 means the request never got a response."""
+        if json_body is not None:
+            body, content_type = json.dumps(json_body).encode(), "application/json"
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, raw = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, raw = e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            return 0, None
+        try:
+            return status, json.loads(raw)
+        except ValueError:
+            return status, None
+
+
+class Workload:
+    """The request mix; each operation returns ``(endpoint label, status)``."""
+
+    def __init__(self, client):
+        self.client = client
+        self.candidate_ids = []
+        self.job_ids = []
+        self.lock = threading.Lock()
+        self.slots = itertools.count()
+
+    def pick(self, ids):
+        with self.lock:
+            return random.choice(ids) if ids else None
+
+    def remember(self, ids, value):
+        if value is not None:
+            with self.lock:
+                ids.append(value)
+
+    def upload_resume(self):
+        skills = ", ".join(random.sample(SKILLS, 5))
+        text = f"Load Test Candidate\nSkills: {skills}\nExperience: {random.randint(1, 12)} years\nEducation: B.Sc."
+        body, content_type = multipart("file", f"loadtest-{uuid.uuid4().hex}.pdf", resume_pdf(text), "application/pdf")
+        status, data = self.client.request("POST", "/api/upload/resume", body=body, content_type=content_type)
+        self.remember(self.candidate_ids, (data or {}).get("candidate_id"))
+        return "POST /api/upload/resume", status
+
+    def upload_job(self):
+        skills = ", ".join(random.sample(SKILLS, 5))
+        status, data = self.client.request("POST", "/api/upload/job-description", json_body={
+            "jobTitle": f"{random.choice(SKILLS).title()} Engineer",
+            "jobDescription": f"We are hiring. Required skills: {skills}. {random.randint(1, 8)}+ years of experience."
+        })
+        self.remember(self.job_ids, (data or {}).get("job_id"))
+        return "POST /api/upload/job-description", status
+
+    def match_lookup(self):
+        candidate_id = self.pick(self.candidate_ids)
+        if candidate_id is None:
+            return self.upload_resume()
+        status, _ = self.client.request("GET", f"/api/match/top/{candidate_id}?limit=5")
+        return "GET /api/match/top/<id>", status
+
+    def job_search(self):
+        query = urllib.parse.urlencode({"search": random.choice(SKILLS), "location": random.choice(LOCATIONS + ["All"])})
+        status, _ = self.client.request("GET", f"/api/all_jobs?{query}")
+        return "GET /api/all_jobs", status
+
+    def interview_write(self):
+        candidate_id, job_id = self.pick(self.candidate_ids), self.pick(self.job_ids)
+        if candidate_id is None or job_id is None:
+            return self.upload_job() if job_id is None else self.upload_resume()
+        # Spread writes over distinct slots so overlap checks mostly pass; the rest are genuine 409s
+        slot = next(self.slots)
+        day = time.strftime("%Y-%m-%d", time.gmtime(time.time() + 86400 * (1 + slot // 16)))
+        status, _ = self.client.request("POST", "/api/interviews", json_body={
+            "candidate_id": candidate_id,
+            "job_id": job_id,
+            "recruiter_id": random.randint(1, 20),
+            "date": day,
+            "time": f"{8 + slot % 8:02d}:{random.choice(['00', '30'])}",
+            "duration": random.choice(["30 minutes", "45 minutes", "1 hour"]),
+            "type": random.choice(["video", "phone", "in-person"]),
+            "status": "scheduled"
+        })
+        return "POST /api/interviews", status
+
+    def interview_request(self):
+        candidate_id, job_id = self.pick(self.candidate_ids), self.pick(self.job_ids)
+        if candidate_id is None or job_id is None:
+            return self.upload_job() if job_id is None else self.upload_resume()
+        status, _ = self.client.request("POST", "/api/send_interview_request", json_body={
+            "candidate_id": candidate_id,
+            "job_id": job_id,
+            "interview_date": "next Tuesday",
+            "interview_time": "10:00",
+            "interview_type": "video",
+            "interview_details": "Load test"
+        })
+        return "POST /api/send_interview_request", status
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(Workload, name) or name.startswith("_"):
+            raise click.BadParameter(f"unknown operation {name!r}", param_hint="--mix")
+        weights[name] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+def summarize(samples, elapsed):
+    """Per-endpoint latency percentiles, error rate and throughput from ``(label, status, latency)`` samples."""
+    by_endpoint = {}
+    for label, status, latency in samples:
+        by_endpoint.setdefault(label, []).append((status, latency))
+    by_endpoint["ALL"] = [(status, latency) for _, status, latency in samples]
+
+    report = {}
+    for label, rows in sorted(by_endpoint.items()):
+        statuses = [status for status, _ in rows]
+        latencies = np.array([latency for _, latency in rows]) * 1000
+        errors = sum(1 for status in statuses if status == 0 or status >= 500)
+        report[label] = {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4),
+            "status_counts": {str(status): statuses.count(status) for status in sorted(set(statuses))},
+            "throughput_rps": round(len(rows) / elapsed, 2),
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 1),
+                "p95": round(float(np.percentile(latencies, 95)), 1),
+                "p99": round(float(np.percentile(latencies, 99)), 1),
+                "max": round(float(latencies.max()), 1),
+                "mean": round(float(latencies.mean()), 1)
+            }
+        }
+    return report
+
+
+def run_load(workload, mix, rps, duration, concurrency):
+    """Issue operations at ``rps`` for ``duration`` seconds (open loop) and return the samples."""
+    names, weights = list(mix), list(mix.values())
+    samples, samples_lock = [], threading.Lock()
+
+    def run(operation, scheduled):
+        label, status = getattr(workload, operation)()
+        with samples_lock:
+            samples.append((label, status, time.perf_counter() - scheduled))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for n in itertools.count():
+            scheduled = started + n / rps
+            if scheduled - started >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, random.choices(names, weights)[0], scheduled)
+    return samples, time.perf_counter() - started
+
+
+def boot_gunicorn(workdir, port, env, workers, threads, asgi):
+    repo = os.path.dirname(os.path.abspath(__file__))
+    # Initialize the database once here; the workers skip init_db on import so
+    # they don't race each other through the migrations and rollup rebuilds
+    env = {**os.environ, **env, "INIT_DB_ON_IMPORT": "false",
+           "PYTHONPATH": os.pathsep.join(filter(None, [repo, os.environ.get("PYTHONPATH")]))}
+    log = open(os.path.join(workdir, "gunicorn.log"), "w")
+    init = subprocess.run([sys.executable, "-m", "flask", "--app", "app", "init-db"],
+                          cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    if init.returncode:
+        raise click.ClickException(f"flask init-db failed with code {init.returncode}; see {log.name}")
+    command = [sys.executable, "-m", "gunicorn", "--chdir", workdir, "--pythonpath", repo,
+               "-b", f"127.0.0.1:{port}", "-w", str(workers), "--timeout", "300", "--log-level", "warning"]
+    if asgi:
+        command += ["-k", "uvicorn.workers.UvicornWorker", "asgi:application"]
+    else:
+        command += ["--threads", str(threads), "app:app"]
+    return subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_healthy(client, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise click.ClickException(f"gunicorn exited with code {process.returncode} during startup")
+        if client.request("GET", "/api/health")[0] == 200:
+            return
+        time.sleep(1)
+    raise click.ClickException(f"app did not become healthy within {timeout}s")
+
+
+def free_port():
+    with socketserver.TCPServer(("127.0.0.1", 0), None) as server:
+        return server.server_address[1]
+
+
+@click.command()
+@click.option("--rps", default=10.0, help="Target arrival rate, requests per second.")
+@click.option("--duration", default=60.0, help="Measured seconds of load.")
+@click.option("--mix", default=DEFAULT_MIX, show_default=True, help="Comma separated operation=weight pairs.")
+@click.option("--concurrency", default=256, help="Maximum requests in flight from the client.")
+@click.option("--workers", default=2, help="Gunicorn worker processes.")
+@click.option("--threads", default=8, help="Threads per gunicorn worker (ignored with --asgi).")
+@click.option("--asgi", is_flag=True, help="Serve asgi:application with uvicorn workers instead of the WSGI app.")
+@click.option("--llm-latency", default=0.5, help="Mean seconds the fake Groq API takes to answer.")
+@click.option("--seed-jobs", default=20, help="Jobs uploaded before measuring.")
+@click.option("--seed-candidates", default=20, help="Resumes uploaded before measuring.")
+@click.option("--timeout", default=120.0, help="Client timeout per request in seconds.")
+@click.option("--url", default=None, help="Target a running deployment instead of booting gunicorn (fakes are not wired in).")
+@click.option("--keep-workdir", is_flag=True, help="Keep the scratch directory with the database and gunicorn log.")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Also write the JSON report here.")
+def main(rps, duration, mix, concurrency, workers, threads, asgi, llm_latency, seed_jobs, seed_candidates,
+         timeout, url, keep_workdir, output):
+    """Drive a mixed workload against the app and report latency percentiles as JSON."""
+    mix = parse_mix(mix)
+    FakeGroq.latency = llm_latency
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    process = None
+    groq = ThreadingHTTPServer(("127.0.0.1", 0), FakeGroq)
+    groq.daemon_threads = True
+    smtp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeSMTP)
+    smtp.daemon_threads = True
+    groq_port, smtp_port = start_server(groq), start_server(smtp)
+    try:
+        if url is None:
+            port = free_port()
+            env = {
+                "GROQ_API_KEY": "loadtest",
+                "GROQ_BASE_URL": f"http://127.0.0.1:{groq_port}",
+                "SMTP_HOST": "127.0.0.1",
+                "SMTP_PORT": str(smtp_port),
+                "SMTP_STARTTLS": "false",
+                "SMTP_PASSWORD": "",
+                "EMAIL_FROM": "loadtest@loadtest.invalid",
+                "SNAPSHOT_WARM_START_DIR": ""
+            }
+            process = boot_gunicorn(workdir, port, env, workers, threads, asgi)
+            url = f"http://127.0.0.1:{port}"
+        client = Client(url, timeout)
+        wait_healthy(client, process, timeout=300)
+
+        workload = Workload(client)
+        click.echo(f"Seeding {seed_jobs} jobs and {seed_candidates} candidates", err=True)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: workload.upload_job(), range(seed_jobs)))
+            list(pool.map(lambda _: workload.upload_resume(), range(seed_candidates)))
+
+        click.echo(f"Running {rps} rps for {duration}s: {mix}", err=True)
+        samples, elapsed = run_load(workload, mix, rps, duration, concurrency)
+        report = {
+            "config": {"rps": rps, "duration": duration, "mix": mix, "workers": workers, "threads": threads,
+                       "asgi": asgi, "llm_latency": llm_latency, "url": url},
+            "elapsed_seconds": round(elapsed, 2),
+            "achieved_rps": round(len(samples) / elapsed, 2),
+            "endpoints": summarize(samples, elapsed) if samples else {},
+            "fakes": {"llm_calls": FakeGroq.calls, "emails": FakeSMTP.messages},
+            "server": {name: client.request("GET", path)[1] for name, path in
+                       (("llm", "/api/metrics/llm"), ("embedding", "/api/metrics/embedding"), ("outbox", "/api/metrics/outbox"))}
+        }
+        click.echo(json.dumps(report, indent=2))
+        if output:
+            with open(output, "w") as f:
+                json.dump(report, f, indent=2)
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        groq.shutdown()
+        smtp.shutdown()
+        if keep_workdir:
+            click.echo(f"Kept {workdir}", err=True)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import json
+import zlib
+
+EXPORT_BATCH_SIZE = 500
+
+
+def ndjson_lines(connect, query, params=(), batch_size=EXPORT_BATCH_SIZE):
+    """Yield one encoded NDJSON line per row, holding at most ``batch_size`` rows at a time.
+
+    The connection is opened when iteration starts and closed when it ends or
+    the client disconnects.
+    """
+    conn = connect()
+    try:
+        cursor = conn.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows).encode()
+    finally:
+        conn.close()
+
+
+def gzip_stream(chunks, level=6):
+    """Compress ``chunks`` on the fly, flushing after each so clients get data as it is read."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
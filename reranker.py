@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_version(*parts):
+    """Short content hash used as the version of a candidate or job."""
+    digest = hashlib.sha1("\x1f".join(str(part or "") for part in parts).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class LRUCache:
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class CrossEncoderReranker:
+    """Second-stage scorer that runs a CPU cross-encoder over a short list of pairs.
+
+    Scores are cached by ``(model, candidate version, job version)``. Uncached
+    pairs are scored in small batches; once ``budget_ms`` is spent ``rerank``
+    gives up and returns ``None`` so callers keep their stage-one order, while
+    the batches already scored stay cached for the next request. The model is
+    loaded on a background thread (``preload``); until it is ready, requests
+    that need it fall back the same way instead of waiting for the load.
+    """
+
+    def __init__(self, model_name, budget_ms=300, batch_size=16, cache_size=50000):
+        self.model_name = model_name
+        self.budget = budget_ms / 1000.0
+        self.batch_size = batch_size
+        self.cache = LRUCache(cache_size)
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._loader = None
+
+    def load(self):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                self._model = CrossEncoder(self.model_name, device="cpu")
+            return self._model
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        except Exception as e:
+            print(f"Loading rerank model {self.model_name} failed: {e}")
+
+    def preload(self):
+        """Start loading the model on a background thread unless it is loaded or loading."""
+        with self._model_lock:
+            if self._model is not None or (self._loader is not None and self._loader.is_alive()):
+                return
+            self._loader = threading.Thread(target=self._load_in_background, name="rerank-model", daemon=True)
+            self._loader.start()
+
+    def rerank(self, pairs):
+        """Score ``(candidate_version, job_version, candidate_text, job_text)`` pairs.
+
+        Returns a list of scores aligned with ``pairs``, or ``None`` when the
+        latency budget was exceeded or the model is still loading.
+        """
+        deadline = time.monotonic() + self.budget
+        scores = [self.cache.get((self.model_name, cv, jv)) for cv, jv, _, _ in pairs]
+        pending = [i for i, score in enumerate(scores) if score is None]
+        if not pending:
+            return scores
+
+        model = self._model
+        if model is None:
+            self.preload()
+            return None
+        for start in range(0, len(pending), self.batch_size):
+            if time.monotonic() > deadline:
+                return None
+            batch = pending[start:start + self.batch_size]
+            predicted = model.predict([(pairs[i][2], pairs[i][3]) for i in batch], batch_size=self.batch_size)
+            for i, score in zip(batch, predicted):
+                scores[i] = float(score)
+                self.cache.set((self.model_name, pairs[i][0], pairs[i][1]), scores[i])
+
+        return scores
@@ -0,0 +1,86 @@
+import hashlib
+from functools import wraps
+
+from flask import Response, request
+
+from reranker import LRUCache
+
+
+def init_cache_versions(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS cache_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    );
+    """)
+
+
+def bump_cache_version(cursor, *names):
+    """Invalidate cached responses depending on ``names``; call inside the write's transaction."""
+    for name in names:
+        cursor.execute(
+            "INSERT INTO cache_versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (name,)
+        )
+
+
+class ResponseCache:
+    """In-process cache of serialized JSON responses with strong ETags.
+
+    A cached view declares the data it depends on; its ETag is derived from
+    the request signature and the current version counters of that data, so
+    ``If-None-Match`` can be answered with 304 before the view runs. Version
+    counters live in SQLite and are bumped by the write paths, which keeps
+    every worker process consistent.
+    """
+
+    def __init__(self, get_connection, max_entries=512):
+        self.get_connection = get_connection
+        self.entries = LRUCache(max_entries)
+
+    def versions(self, names, validators=()):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT name, version FROM cache_versions WHERE name IN ({', '.join('?' * len(names))})",
+            names
+        )
+        found = dict(cursor.fetchall())
+        values = tuple(cursor.execute(query).fetchone()[0] for query in validators)
+        conn.close()
+        return tuple(found.get(name, 0) for name in names) + values
+
+    def cached(self, *names, validators=()):
+        """Cache a view on the version counters of ``names``.
+
+        ``validators`` are single-value SQL queries added to the versions, for
+        data that changes with the clock rather than through a write path.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                signature = (request.path, tuple(sorted(request.args.items(multi=True))))
+                versions = self.versions(names, validators)
+                etag = hashlib.sha1(repr((signature, names, versions)).encode("utf-8")).hexdigest()[:24]
+
+                if etag in request.if_none_match:
+                    response = Response(status=304)
+                    response.set_etag(etag)
+                    return response
+
+                key = (signature, versions)
+                body = self.entries.get(key)
+                if body is None:
+                    response = view(*args, **kwargs)
+                    if isinstance(response, tuple) or response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    self.entries.set(key, body)
+
+                response = Response(body, mimetype="application/json")
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "no-cache"
+                return response
+            return wrapper
+        return decorator
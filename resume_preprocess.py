@@ -0,0 +1,121 @@
+import math
+import re
+from collections import Counter
+
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "about me", "career summary"],
+    "objective": ["objective", "career objective"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "tech stack", "technologies", "tools"],
+    "experience": ["experience", "work experience", "professional experience", "employment history", "internships", "internship", "work history"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "education": ["education", "academic background", "academics", "qualifications", "educational qualifications"],
+    "certifications": ["certifications", "certificates", "licenses"],
+    "courses": ["courses", "coursework", "relevant coursework", "trainings", "training"],
+    "achievements": ["achievements", "awards", "honors", "honours", "accomplishments", "awards and achievements"],
+    "publications": ["publications", "research"],
+    "volunteer": ["volunteer", "volunteering", "extracurricular activities", "extra curricular activities", "positions of responsibility"],
+    "languages": ["languages", "languages known"],
+    "interests": ["interests", "hobbies", "hobbies and interests"],
+    "references": ["references", "referees"],
+    "declaration": ["declaration", "personal details", "personal information"],
+}
+HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Sections dropped first, in order, when the resume exceeds the token budget.
+# Courses and achievements stay: the resume prompt extracts both.
+DROP_PRIORITY = [
+    "references", "declaration", "interests", "languages", "volunteer",
+    "publications", "objective", "summary"
+]
+
+# Only checked against a page's first and last FURNITURE_LINES lines; at most
+# three digits, so phone numbers and years are never taken for page numbers
+PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$|^-\s*\d{1,3}\s*-$", re.IGNORECASE)
+FURNITURE_LINES = 3
+
+
+def estimate_tokens(text):
+    """Rough LLM token count (~4 characters per token for English prose)."""
+    return math.ceil(len(text) / 4)
+
+
+def normalize_whitespace(text):
+    text = text.replace("\u00a0", " ").replace("\u200b", "")
+    text = re.sub(r"[^\S\n]+", " ", text)
+    lines = [line.strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def remove_page_furniture(pages):
+    """Drop page numbers and header/footer lines repeated across pages."""
+    pages = [normalize_whitespace(page).split("\n") for page in pages]
+    repeated = set()
+    if len(pages) > 1:
+        edge_lines = Counter()
+        for lines in pages:
+            edges = {line for line in lines[:FURNITURE_LINES] + lines[-FURNITURE_LINES:] if line}
+            edge_lines.update(edges)
+        repeated = {line for line, count in edge_lines.items() if count >= max(2, math.ceil(len(pages) / 2))}
+
+    cleaned = []
+    for lines in pages:
+        last = len(lines) - FURNITURE_LINES
+        kept = [
+            line for i, line in enumerate(lines)
+            if not ((i < FURNITURE_LINES or i >= last) and (line in repeated or PAGE_NUMBER.match(line)))
+        ]
+        cleaned.append("\n".join(kept))
+    return cleaned
+
+
+def heading_section(line):
+    key = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    if len(key) > 40:
+        return None
+    return HEADING_LOOKUP.get(key)
+
+
+def split_sections(text):
+    """Split resume text into ``[(section, text)]``; text before the first heading is ``header``."""
+    sections = [["header", []]]
+    for line in text.split("\n"):
+        section = heading_section(line)
+        if section:
+            sections.append([section, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def prepare_resume_text(pages, token_budget=3000):
+    """Clean extracted resume pages and trim them to ``token_budget`` tokens.
+
+    Returns ``(text, report)`` where the report holds token counts before and
+    after, and which sections were dropped or truncated.
+    """
+    raw_text = "\n".join(pages)
+    text = "\n".join(remove_page_furniture(pages))
+    text = normalize_whitespace(text)
+    sections = split_sections(text)
+
+    dropped = []
+    for section in DROP_PRIORITY:
+        if estimate_tokens("\n\n".join(body for _, body in sections)) <= token_budget:
+            break
+        if any(name == section for name, _ in sections):
+            sections = [(name, body) for name, body in sections if name != section]
+            dropped.append(section)
+
+    text = "\n\n".join(body for _, body in sections)
+    truncated = False
+    if estimate_tokens(text) > token_budget:
+        text = text[:token_budget * 4].rsplit("\n", 1)[0]
+        truncated = True
+
+    return text, {
+        "tokens_before": estimate_tokens(raw_text),
+        "tokens_after": estimate_tokens(text),
+        "sections": [name for name, _ in sections],
+        "dropped_sections": dropped,
+        "truncated": truncated
+    }
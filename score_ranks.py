@@ -0,0 +1,161 @@
+"""Rank and percentile of an eligibility score within a job's scored pool and its applicants.
+
+Two rollups count scores per job in half-point buckets, kept current by
+triggers: one over every score row, one over the score rows of candidates
+who applied. A rank is the sum of the buckets above the score's bucket plus
+an index range count inside that bucket, so a lookup never reads more than
+one bucket's worth of ``scores`` rows.
+"""
+from analytics import rollup_triggers
+
+RANK_BUCKETS_PER_POINT = 2
+RANK_BUCKETS = 100 * RANK_BUCKETS_PER_POINT
+
+# Doubling is exact in floating point, so bucket edges fall exactly on b / 2
+RANK_BUCKET_SQL = "MIN(MAX(CAST({score} * {per_point} AS INTEGER), 0), {last})"
+
+SCORE_RANK_SCHEMA = ["""
+CREATE TABLE IF NOT EXISTS score_rank_buckets (
+    job_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (job_id, bucket)
+) WITHOUT ROWID;
+""", """
+CREATE TABLE IF NOT EXISTS applicant_rank_buckets (
+    job_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (job_id, bucket)
+) WITHOUT ROWID;
+""", "CREATE INDEX IF NOT EXISTS idx_applications_job ON applications (job_id, candidate_id)"]
+
+
+def rank_bucket(score):
+    return RANK_BUCKET_SQL.format(score=score, per_point=RANK_BUCKETS_PER_POINT, last=RANK_BUCKETS - 1)
+
+
+def applicant_statement(row, delta, from_scores):
+    """Move ``applicant_rank_buckets`` by ``delta`` for each matching application/score pair of ``row``."""
+    if from_scores:
+        source = (f"SELECT {row}.job_id, {rank_bucket(f'{row}.eligibility_score')}, {delta} FROM applications "
+                  f"WHERE job_id = {row}.job_id AND candidate_id = {row}.candidate_id")
+    else:
+        source = (f"SELECT job_id, {rank_bucket('eligibility_score')}, {delta} FROM scores "
+                  f"WHERE job_id = {row}.job_id AND candidate_id = {row}.candidate_id AND eligibility_score IS NOT NULL")
+    return (f"INSERT INTO applicant_rank_buckets (job_id, bucket, count) {source} "
+            f"ON CONFLICT(job_id, bucket) DO UPDATE SET count = count + excluded.count;")
+
+
+def applicant_triggers(source, columns, when="1", from_scores=False):
+    add, remove = applicant_statement("NEW", 1, from_scores), applicant_statement("OLD", -1, from_scores)
+    new_when, old_when = when.format(row="NEW"), when.format(row="OLD")
+    table = f"applicant_rank_buckets_{source}"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON {source} WHEN {new_when} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON {source} WHEN {old_when} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_update_old AFTER UPDATE OF {', '.join(columns)} ON {source} "
+        f"WHEN {old_when} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_update_new AFTER UPDATE OF {', '.join(columns)} ON {source} "
+        f"WHEN {new_when} BEGIN {add} END"
+    ]
+
+
+SCORE_RANK_TRIGGERS = (
+    rollup_triggers(
+        "scores", "score_rank_buckets",
+        {"job_id": "{row}.job_id", "bucket": rank_bucket("{row}.eligibility_score")},
+        ["job_id", "eligibility_score"],
+        when="{row}.eligibility_score IS NOT NULL"
+    )
+    + applicant_triggers("scores", ["candidate_id", "job_id", "eligibility_score"],
+                         when="{row}.eligibility_score IS NOT NULL", from_scores=True)
+    + applicant_triggers("applications", ["candidate_id", "job_id"])
+)
+
+
+def init_score_ranks(cursor):
+    """Create the rank rollups and their triggers, filling them on first use."""
+    for statement in SCORE_RANK_SCHEMA + SCORE_RANK_TRIGGERS:
+        cursor.execute(statement)
+    if not cursor.execute("SELECT 1 FROM score_rank_buckets LIMIT 1").fetchone():
+        rebuild_score_ranks(cursor)
+
+
+def rebuild_score_ranks(cursor):
+    cursor.execute("DELETE FROM score_rank_buckets")
+    cursor.execute("DELETE FROM applicant_rank_buckets")
+    cursor.execute(f"""
+        INSERT INTO score_rank_buckets (job_id, bucket, count)
+        SELECT job_id, {rank_bucket("eligibility_score")}, COUNT(*)
+        FROM scores WHERE eligibility_score IS NOT NULL GROUP BY 1, 2
+    """)
+    cursor.execute(f"""
+        INSERT INTO applicant_rank_buckets (job_id, bucket, count)
+        SELECT s.job_id, {rank_bucket("s.eligibility_score")}, COUNT(*)
+        FROM applications a
+        JOIN scores s ON s.job_id = a.job_id AND s.candidate_id = a.candidate_id
+        WHERE s.eligibility_score IS NOT NULL GROUP BY 1, 2
+    """)
+
+
+# Pairs per ranking query; three bound parameters each keeps it under SQLite's 999
+RANK_BATCH_SIZE = 300
+
+
+def rank_counts(table, applicants):
+    """Correlated subqueries giving pool, above-bucket, higher and tied counts for each ``q`` row."""
+    applied = "JOIN applications a ON a.job_id = s.job_id AND a.candidate_id = s.candidate_id" if applicants else ""
+    # Within the score's own bucket, count higher and tied scores off idx_scores_job;
+    # 9e999 is +inf, so the top bucket also takes scores above 100
+    in_bucket = (f"FROM scores s {applied} WHERE s.job_id = q.job_id "
+                 f"AND s.eligibility_score >= MIN(q.score, q.bucket * 1.0 / {RANK_BUCKETS_PER_POINT}) "
+                 f"AND s.eligibility_score < CASE q.bucket WHEN {RANK_BUCKETS - 1} THEN 9e999 "
+                 f"ELSE (q.bucket + 1) * 1.0 / {RANK_BUCKETS_PER_POINT} END")
+    return (f"(SELECT SUM(count) FROM {table} WHERE job_id = q.job_id), "
+            f"(SELECT SUM(count) FROM {table} WHERE job_id = q.job_id AND bucket > q.bucket), "
+            f"(SELECT SUM(s.eligibility_score > q.score) {in_bucket}), "
+            f"(SELECT SUM(s.eligibility_score = q.score) {in_bucket})")
+
+
+def rank_stats(pool, above, higher, tied):
+    """Rank summary from the rollup and in-bucket counts; None without a pool.
+
+    ``rank`` counts strictly higher scores plus one, ``top_percent`` is the
+    rank as a share of the pool and ``percentile`` the share scoring lower.
+    """
+    if not pool:
+        return None
+    above = (above or 0) + (higher or 0)
+    rank = above + 1
+    return {
+        "rank": rank,
+        "pool_size": pool,
+        "top_percent": round(100.0 * rank / pool, 1),
+        "percentile": round(100.0 * max(pool - above - (tied or 0), 0) / pool, 1)
+    }
+
+
+def many_job_ranks(cursor, pairs):
+    """Rank of each ``(job_id, score)`` pair within the job's scored pool and among its applicants.
+
+    One query serves up to ``RANK_BATCH_SIZE`` pairs. Each result is a dict
+    with ``pool`` and ``applicants``, each None for a missing score or an
+    empty pool.
+    """
+    pairs = list(pairs)
+    ranks = [{"pool": None, "applicants": None} for _ in pairs]
+    scored = [i for i, (_, score) in enumerate(pairs) if score is not None]
+    for offset in range(0, len(scored), RANK_BATCH_SIZE):
+        batch = scored[offset:offset + RANK_BATCH_SIZE]
+        values = ", ".join("(?, ?, ?)" for _ in batch)
+        params = [value for i in batch for value in (i, pairs[i][0], pairs[i][1])]
+        rows = cursor.execute(f"""
+            WITH p(i, job_id, score) AS (VALUES {values}),
+            q AS (SELECT i, job_id, score, {rank_bucket("score")} AS bucket FROM p)
+            SELECT q.i, {rank_counts("score_rank_buckets", False)}, {rank_counts("applicant_rank_buckets", True)}
+            FROM q
+        """, params).fetchall()
+        for row in rows:
+            ranks[row[0]] = {"pool": rank_stats(*row[1:5]), "applicants": rank_stats(*row[5:9])}
+    return ranks
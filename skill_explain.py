@@ -0,0 +1,83 @@
+import threading
+
+import numpy as np
+
+from reranker import LRUCache
+from skill_index import normalize_skills
+
+
+class SkillExplainer:
+    """Best candidate-skill match for each required skill of a job.
+
+    Both skill lists are split into normalized tokens; tokens without a cached
+    vector are embedded in one batch, and one matmul of the unit vectors gives
+    the full required x candidate similarity matrix. Token vectors are cached
+    per ``(embedding version, token)`` and explanations per ``(embedding
+    version, candidate version, job version)``, so the threshold can change
+    per request without recomputing anything.
+    """
+
+    def __init__(self, token_cache_size=50000, cache_size=10000):
+        self.token_vectors = LRUCache(token_cache_size)
+        self.explanations = LRUCache(cache_size)
+        self._lock = threading.Lock()
+        self.tokens_encoded = 0
+
+    def vectors(self, tokens, encode, model_version):
+        """Unit vectors for ``tokens`` as a matrix, embedding the uncached ones in one batch."""
+        vectors = [self.token_vectors.get((model_version, token)) for token in tokens]
+        pending = [i for i, vector in enumerate(vectors) if vector is None]
+        if pending:
+            encoded = np.asarray(encode([tokens[i] for i in pending]), dtype=np.float32).reshape(len(pending), -1)
+            encoded /= np.maximum(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12)
+            for i, vector in zip(pending, encoded):
+                vectors[i] = vector
+                self.token_vectors.set((model_version, tokens[i]), vector)
+            with self._lock:
+                self.tokens_encoded += len(pending)
+        return np.vstack(vectors)
+
+    def best_matches(self, candidate_skills, required_skills, encode, model_version, versions):
+        """``(required skill, best candidate skill, similarity)`` per required token; second value is True on a cache hit."""
+        key = (model_version,) + tuple(versions)
+        cached = self.explanations.get(key)
+        if cached is not None:
+            return cached, True
+
+        candidate_tokens = normalize_skills(candidate_skills)
+        required_tokens = normalize_skills(required_skills)
+        if not candidate_tokens or not required_tokens:
+            matches = [(skill, None, 0.0) for skill in required_tokens]
+        else:
+            tokens = list(dict.fromkeys(required_tokens + candidate_tokens))
+            matrix = self.vectors(tokens, encode, model_version)
+            position = {token: i for i, token in enumerate(tokens)}
+            required = matrix[[position[t] for t in required_tokens]]
+            candidate = matrix[[position[t] for t in candidate_tokens]]
+            similarity = required @ candidate.T
+            best = similarity.argmax(axis=1)
+            matches = [
+                (skill, candidate_tokens[j], round(float(similarity[i, j]), 4))
+                for i, (skill, j) in enumerate(zip(required_tokens, best))
+            ]
+        self.explanations.set(key, matches)
+        return matches, False
+
+    def explain(self, candidate_skills, required_skills, encode, model_version, versions, threshold):
+        matches, cached = self.best_matches(candidate_skills, required_skills, encode, model_version, versions)
+        covered = [{"skill": s, "match": m, "similarity": sim} for s, m, sim in matches if m is not None and sim >= threshold]
+        missing = [{"skill": s, "closest": m, "similarity": sim} for s, m, sim in matches if m is None or sim < threshold]
+        return {
+            "threshold": threshold,
+            "coverage": round(len(covered) / len(matches), 4) if matches else None,
+            "covered": covered,
+            "missing": missing,
+            "cached": cached
+        }
+
+    def stats(self):
+        return {
+            "token_vectors": len(self.token_vectors),
+            "explanations": len(self.explanations),
+            "tokens_encoded": self.tokens_encoded
+        }
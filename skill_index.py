@@ -0,0 +1,230 @@
+import math
+import re
+from collections import defaultdict
+
+from analytics import rollup_triggers
+
+SKILL_ALIASES = {
+    "js": "javascript",
+    "es6": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "cpp": "c++",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "dotnet": ".net",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "aws cloud": "aws",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "tf": "tensorflow",
+    "html5": "html",
+    "css3": "css",
+    "rest": "rest api",
+    "restful": "rest api",
+    "restful api": "rest api",
+    "ci/cd": "ci cd",
+}
+
+EMPTY_SKILL_VALUES = {"", "none", "not mentioned", "n/a", "na", "nil"}
+SKILL_SEPARATORS = re.compile(r"[,;|\n•]+")
+SKILL_TABLES = {"candidate": ("candidate_skills", "candidate_id"), "job": ("job_skills", "job_id")}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# BM25 corpus statistics, kept current by triggers on the skill tables so a
+# ranking request never counts the whole index
+SKILL_STATS_SCHEMA = ["""
+CREATE TABLE IF NOT EXISTS skill_frequency (
+    kind TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (kind, skill)
+) WITHOUT ROWID;
+""", """
+CREATE TABLE IF NOT EXISTS skill_corpus (
+    kind TEXT PRIMARY KEY,
+    documents INTEGER NOT NULL,
+    tokens INTEGER NOT NULL
+);
+"""]
+
+
+def corpus_triggers(kind):
+    """Count tokens, and documents as an id's first token arrives or its last one leaves."""
+    table, id_column = SKILL_TABLES[kind]
+    remaining = f"(SELECT COUNT(*) FROM {table} WHERE {id_column} = {{row}}.{id_column})"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS skill_corpus_{table}_insert AFTER INSERT ON {table} BEGIN "
+        f"UPDATE skill_corpus SET tokens = tokens + 1, documents = documents + ({remaining.format(row='NEW')} = 1) "
+        f"WHERE kind = '{kind}'; END",
+        f"CREATE TRIGGER IF NOT EXISTS skill_corpus_{table}_delete AFTER DELETE ON {table} BEGIN "
+        f"UPDATE skill_corpus SET tokens = tokens - 1, documents = documents - ({remaining.format(row='OLD')} = 0) "
+        f"WHERE kind = '{kind}'; END"
+    ]
+
+
+SKILL_STATS_TRIGGERS = [
+    statement
+    for kind, (table, _) in SKILL_TABLES.items()
+    for statement in rollup_triggers(table, "skill_frequency", {"kind": f"'{kind}'", "skill": "{row}.skill"}, ["skill"])
+    + corpus_triggers(kind)
+]
+
+
+def normalize_skill(skill):
+    skill = re.sub(r"\s+", " ", skill.lower()).strip(" .:-*()[]{}\"'\t")
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def normalize_skills(text):
+    """Split a free-text skill list into lowercased, alias-mapped, de-duplicated tokens."""
+    if not text:
+        return []
+    tokens = (normalize_skill(part) for part in SKILL_SEPARATORS.split(str(text)))
+    return list(dict.fromkeys(t for t in tokens if t not in EMPTY_SKILL_VALUES))
+
+
+def index_skills(cursor, kind, entity_id, text):
+    """Replace the inverted-index tokens of one candidate or job and return them."""
+    table, id_column = SKILL_TABLES[kind]
+    tokens = normalize_skills(text)
+    cursor.execute(f"DELETE FROM {table} WHERE {id_column} = ?", (entity_id,))
+    cursor.executemany(
+        f"INSERT OR IGNORE INTO {table} ({id_column}, skill) VALUES (?, ?)",
+        [(entity_id, token) for token in tokens]
+    )
+    return tokens
+
+
+def get_skills(cursor, kind, entity_id):
+    table, id_column = SKILL_TABLES[kind]
+    cursor.execute(f"SELECT skill FROM {table} WHERE {id_column} = ?", (entity_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def filter_by_skills(cursor, kind, must_have):
+    """Ids of candidates or jobs that have every one of the must-have skills."""
+    table, id_column = SKILL_TABLES[kind]
+    tokens = normalize_skills(",".join(must_have) if isinstance(must_have, (list, tuple)) else must_have)
+    if not tokens:
+        return None
+    placeholders = ", ".join("?" * len(tokens))
+    cursor.execute(f"""
+        SELECT {id_column} FROM {table}
+        WHERE skill IN ({placeholders})
+        GROUP BY {id_column}
+        HAVING COUNT(*) = ?
+    """, (*tokens, len(tokens)))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def skill_filter_sql(kind, must_have):
+    """``filter_by_skills`` as an ``id IN (...)`` condition and its parameters, for streamed queries."""
+    table, id_column = SKILL_TABLES[kind]
+    tokens = normalize_skills(must_have)
+    if not tokens:
+        return None, []
+    placeholders = ", ".join("?" * len(tokens))
+    return (
+        f"{id_column} IN (SELECT {id_column} FROM {table} WHERE skill IN ({placeholders}) "
+        f"GROUP BY {id_column} HAVING COUNT(*) = ?)"
+    ), [*tokens, len(tokens)]
+
+
+def init_skill_stats(cursor):
+    """Create the corpus statistics and their triggers, filling them on first use."""
+    for statement in SKILL_STATS_SCHEMA + SKILL_STATS_TRIGGERS:
+        cursor.execute(statement)
+    if not cursor.execute("SELECT 1 FROM skill_corpus LIMIT 1").fetchone():
+        rebuild_skill_stats(cursor)
+
+
+def rebuild_skill_stats(cursor):
+    cursor.execute("DELETE FROM skill_frequency")
+    cursor.execute("DELETE FROM skill_corpus")
+    for kind, (table, id_column) in SKILL_TABLES.items():
+        cursor.execute(f"INSERT INTO skill_frequency (kind, skill, count) SELECT ?, skill, COUNT(*) FROM {table} GROUP BY skill", (kind,))
+        cursor.execute(f"INSERT INTO skill_corpus (kind, documents, tokens) SELECT ?, COUNT(DISTINCT {id_column}), COUNT(*) FROM {table}", (kind,))
+
+
+def overlap_scores(cursor, kind, tokens, min_overlap=1, ids=None):
+    """Exact skill-overlap scores of the candidates or jobs sharing tokens with the query.
+
+    Only index rows for the query tokens are read, and only those of ``ids``
+    when given. Returns ``{id: {"matched_skills", "jaccard", "bm25"}}`` for ids
+    with at least ``min_overlap`` shared tokens, with BM25 computed over binary
+    term frequencies and the maintained corpus statistics.
+    """
+    table, id_column = SKILL_TABLES[kind]
+    tokens = list(dict.fromkeys(tokens))
+    if not tokens or ids is not None and not ids:
+        return {}
+
+    placeholders = ", ".join("?" * len(tokens))
+    query = f"SELECT {id_column}, skill FROM {table} WHERE skill IN ({placeholders})"
+    params = list(tokens)
+    if ids is not None:
+        ids = list(ids)
+        query += f" AND {id_column} IN ({', '.join('?' * len(ids))})"
+        params += ids
+    cursor.execute(query, params)
+    matches = defaultdict(list)
+    for entity_id, skill in cursor.fetchall():
+        matches[entity_id].append(skill)
+
+    matches = {entity_id: skills for entity_id, skills in matches.items() if len(skills) >= min_overlap}
+    if not matches:
+        return {}
+
+    cursor.execute(f"SELECT skill, count FROM skill_frequency WHERE kind = ? AND skill IN ({placeholders})", (kind, *tokens))
+    document_frequency = dict(cursor.fetchall())
+    cursor.execute("SELECT documents, tokens FROM skill_corpus WHERE kind = ?", (kind,))
+    total_documents, total_tokens = cursor.fetchone() or (0, 0)
+    average_length = total_tokens / total_documents if total_documents else 1.0
+
+    lengths = {}
+    ids = list(matches)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        cursor.execute(f"""
+            SELECT {id_column}, COUNT(*) FROM {table}
+            WHERE {id_column} IN ({", ".join("?" * len(chunk))})
+            GROUP BY {id_column}
+        """, chunk)
+        lengths.update(cursor.fetchall())
+
+    idf = {
+        skill: math.log((total_documents - df + 0.5) / (df + 0.5) + 1)
+        for skill, df in ((skill, document_frequency.get(skill, 0)) for skill in tokens)
+    }
+
+    scores = {}
+    for entity_id, skills in matches.items():
+        length = lengths.get(entity_id, len(skills))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+        scores[entity_id] = {
+            "matched_skills": skills,
+            "jaccard": len(skills) / (len(tokens) + length - len(skills)),
+            "bm25": sum(idf[skill] * (BM25_K1 + 1) / (1 + norm) for skill in skills)
+        }
+    return scores
@@ -0,0 +1,169 @@
+"""Columnar snapshots of the vector store and the scores table.
+
+A snapshot directory holds ``manifest.json``, a ``vectors/<kind>/<field>``
+tree in the ``VectorMatrix`` file layout (trimmed to the stored rows, so it
+can be memory-mapped as a vector store root as is) and one ``.npy`` column
+per scores field under ``scores/``.
+"""
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from embedding_versions import SCORE_COLUMNS
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_BATCH_ROWS = 100000
+MATRIX_ARRAYS = ("ids", "data", "scale")
+SCORE_ID_COLUMNS = ("candidate_id", "job_id")
+SCORE_VALUE_COLUMNS = tuple(column.strip() for column in SCORE_COLUMNS.split(","))
+
+
+def store_matrices(root):
+    """``(kind, field)`` of every matrix under a vector store root."""
+    matrices = []
+    if not os.path.isdir(root):
+        return matrices
+    for kind in sorted(os.listdir(root)):
+        kind_dir = os.path.join(root, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        for name in sorted(os.listdir(kind_dir)):
+            if name.endswith(".json"):
+                matrices.append((kind, name[:-len(".json")]))
+    return matrices
+
+
+def store_row_count(root):
+    total = 0
+    for kind, field in store_matrices(root):
+        with open(os.path.join(root, kind, f"{field}.json")) as f:
+            total += json.load(f)["count"]
+    return total
+
+
+def write_matrix(matrix, path):
+    """Copy the stored rows of a ``VectorMatrix`` to ``path`` with capacity == count."""
+    matrix.refresh()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    count = matrix.count
+    for name, array in zip(MATRIX_ARRAYS, (matrix.ids, matrix.data, matrix.scales)):
+        np.save(f"{path}.{name}.npy", np.asarray(array[:count]))
+    with open(f"{path}.json", "w") as f:
+        json.dump({"dim": matrix.dim, "dtype": matrix.dtype, "count": count, "capacity": count}, f)
+    return count
+
+
+def write_scores(cursor, scores_dir):
+    """Stream the scores table into one memory-mapped ``.npy`` column per field.
+
+    Scores stay float64 so a round trip keeps exact values, and with them ties and ranks.
+    """
+    os.makedirs(scores_dir, exist_ok=True)
+    total = cursor.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    columns = {
+        name: np.lib.format.open_memmap(
+            os.path.join(scores_dir, f"{name}.npy"), mode="w+",
+            dtype=np.int64 if name in SCORE_ID_COLUMNS else np.float64, shape=(total,)
+        )
+        for name in SCORE_ID_COLUMNS + SCORE_VALUE_COLUMNS
+    }
+    cursor.execute(f"SELECT {', '.join(columns)} FROM scores")
+    written = 0
+    while written < total:
+        rows = cursor.fetchmany(SNAPSHOT_BATCH_ROWS)
+        if not rows:
+            break
+        values = np.array([tuple(row) for row in rows], dtype=np.float64)
+        for position, array in enumerate(columns.values()):
+            array[written:written + len(rows)] = values[:, position]
+        written += len(rows)
+    for array in columns.values():
+        array.flush()
+    return written
+
+
+def write_snapshot(cursor, store, version, out_dir, include_scores=True):
+    """Write the vectors of ``store`` and the scores table to ``out_dir``; returns the manifest."""
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    matrices = {}
+    for kind, field in store_matrices(store.root):
+        matrices[f"{kind}/{field}"] = write_matrix(store.matrix(kind, field), os.path.join(out_dir, "vectors", kind, field))
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+        "embedding_version": version["version"],
+        "model_name": version["model_name"],
+        "backend": version["backend"],
+        "dim": store.dim,
+        "dtype": store.dtype,
+        "matrices": matrices,
+        "scores": write_scores(cursor, os.path.join(out_dir, "scores")) if include_scores else None
+    }
+    manifest["seconds"] = round(time.perf_counter() - started, 2)
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(snapshot_dir):
+    with open(os.path.join(snapshot_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{snapshot_dir} has snapshot format {manifest.get('format')}, expected {SNAPSHOT_FORMAT}")
+    return manifest
+
+
+def check_compatible(manifest, version, dtype):
+    """Raise ValueError unless the snapshot vectors fit the given embedding version and dtype."""
+    expected = (version["model_name"], version["backend"], dtype)
+    found = (manifest["model_name"], manifest["backend"], manifest["dtype"])
+    if found != expected:
+        raise ValueError(
+            "snapshot holds {} ({}, {}) vectors but this instance uses {} ({}, {})".format(*found, *expected)
+        )
+
+
+def install_vectors(snapshot_dir, store_root):
+    """Copy the snapshot matrices into ``store_root``, replacing matrices of the same name."""
+    source = os.path.join(snapshot_dir, "vectors")
+    installed = 0
+    for kind, field in store_matrices(source):
+        target = os.path.join(store_root, kind, field)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        for name in MATRIX_ARRAYS:
+            shutil.copyfile(os.path.join(source, kind, f"{field}.{name}.npy"), f"{target}.{name}.npy.tmp")
+            os.replace(f"{target}.{name}.npy.tmp", f"{target}.{name}.npy")
+        # The manifest goes last: readers reload a matrix when its manifest changes
+        shutil.copyfile(os.path.join(source, kind, f"{field}.json"), f"{target}.json.tmp")
+        os.replace(f"{target}.json.tmp", f"{target}.json")
+        installed += 1
+    return installed
+
+
+def load_scores(cursor, snapshot_dir, model_version):
+    """Replace the scores table with the snapshot columns, skipping rows of unknown candidates or jobs."""
+    scores_dir = os.path.join(snapshot_dir, "scores")
+    columns = [np.load(os.path.join(scores_dir, f"{name}.npy"), mmap_mode="r")
+               for name in SCORE_ID_COLUMNS + SCORE_VALUE_COLUMNS]
+    cursor.execute("DELETE FROM scores")
+    query = (f"INSERT INTO scores ({', '.join(SCORE_ID_COLUMNS)}, {SCORE_COLUMNS}, model_version) "
+             f"VALUES ({', '.join('?' * (len(columns) + 1))})")
+    total = len(columns[0])
+    for start in range(0, total, SNAPSHOT_BATCH_ROWS):
+        batch = [column[start:start + SNAPSHOT_BATCH_ROWS].tolist() for column in columns]
+        # NaN columns were NULL in the source table
+        cursor.executemany(query, (
+            [None if value != value else value for value in row] + [model_version]
+            for row in zip(*batch)
+        ))
+    cursor.execute("""
+        DELETE FROM scores
+        WHERE candidate_id NOT IN (SELECT candidate_id FROM candidates)
+           OR job_id NOT IN (SELECT job_id FROM jobs)
+    """)
+    return total - cursor.rowcount
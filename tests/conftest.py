@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The subset of the app.py schema the helper modules work against
+SCHEMA = [
+    """CREATE TABLE jobs (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_title TEXT, company TEXT, location TEXT, required_skills TEXT,
+        experience TEXT, qualifications TEXT,
+        updated_at TEXT DEFAULT (datetime('now')),
+        status TEXT NOT NULL DEFAULT 'open', expires_at TEXT, closed_at TEXT, archived_at TEXT
+    )""",
+    """CREATE TABLE candidates (
+        candidate_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT, skills TEXT, updated_at TEXT DEFAULT (datetime('now'))
+    )""",
+    """CREATE TABLE scores (
+        score_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id INTEGER NOT NULL, job_id INTEGER NOT NULL,
+        skill_score REAL, education_score REAL, project_relevance_score REAL,
+        experience_score REAL, eligibility_score REAL, model_version TEXT
+    )""",
+    "CREATE INDEX idx_scores_candidate ON scores (candidate_id, eligibility_score DESC)",
+    "CREATE INDEX idx_scores_job ON scores (job_id, eligibility_score DESC)",
+    """CREATE TABLE applications (
+        application_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id INTEGER NOT NULL, job_id INTEGER NOT NULL,
+        application_date TEXT, status TEXT DEFAULT 'Pending'
+    )""",
+    "CREATE TABLE job_skills (skill TEXT NOT NULL, job_id INTEGER NOT NULL, PRIMARY KEY (skill, job_id)) WITHOUT ROWID",
+    "CREATE TABLE candidate_skills (skill TEXT NOT NULL, candidate_id INTEGER NOT NULL, PRIMARY KEY (skill, candidate_id)) WITHOUT ROWID"
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    conn = sqlite3.connect(tmp_path / "job_matching.db")
+    conn.row_factory = sqlite3.Row
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    yield conn
+    conn.close()
@@ -0,0 +1,61 @@
+import pytest
+
+from analytics import (
+    ROLLUP_TABLES, daily_applications, init_analytics, rebuild_analytics, score_histogram, status_funnel
+)
+
+INTERVIEWS = """CREATE TABLE interviews (
+    interview_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    candidate_id INTEGER NOT NULL, job_id INTEGER NOT NULL, status TEXT NOT NULL
+)"""
+
+
+@pytest.fixture
+def cursor(db):
+    db.execute(INTERVIEWS)
+    cursor = db.cursor()
+    init_analytics(cursor)
+    cursor.executemany(
+        "INSERT INTO applications (candidate_id, job_id, application_date, status) VALUES (?, ?, ?, ?)",
+        [(1, 1, "2026-03-01", "Pending"), (2, 1, "2026-03-01", None), (3, 1, "2026-03-02", "Rejected"),
+         (1, 2, "2026-03-02", "Pending")]
+    )
+    cursor.executemany("INSERT INTO interviews (candidate_id, job_id, status) VALUES (?, ?, ?)",
+                       [(1, 1, "scheduled"), (2, 1, "completed")])
+    cursor.executemany("INSERT INTO scores (candidate_id, job_id, eligibility_score) VALUES (?, ?, ?)",
+                       [(1, 1, 95.0), (2, 1, 42.0), (3, 1, None), (4, 1, 101.5), (1, 2, -3.0)])
+    return cursor
+
+
+def rollups(cursor):
+    return {table: sorted(tuple(row) for row in cursor.execute(f"SELECT * FROM {table} WHERE count != 0"))
+            for table in ROLLUP_TABLES}
+
+
+def test_triggers_keep_rollups_equal_to_a_rebuild(cursor):
+    cursor.execute("UPDATE applications SET status = 'Shortlisted' WHERE candidate_id = 2")
+    cursor.execute("UPDATE applications SET job_id = 3, application_date = '2026-03-04' WHERE candidate_id = 3")
+    cursor.execute("DELETE FROM applications WHERE candidate_id = 1 AND job_id = 2")
+    cursor.execute("UPDATE interviews SET status = 'cancelled' WHERE candidate_id = 1")
+    cursor.execute("UPDATE scores SET eligibility_score = 55.0 WHERE candidate_id = 3")
+    cursor.execute("UPDATE scores SET eligibility_score = NULL WHERE candidate_id = 2")
+    cursor.execute("DELETE FROM scores WHERE candidate_id = 1 AND job_id = 2")
+    maintained = rollups(cursor)
+
+    rebuild_analytics(cursor)
+    assert maintained == rollups(cursor)
+
+
+def test_reports_read_the_rollups(cursor):
+    assert daily_applications(cursor, job_id=1) == [{"date": "2026-03-01", "count": 2}, {"date": "2026-03-02", "count": 1}]
+    assert daily_applications(cursor, start="2026-03-02") == [{"date": "2026-03-02", "count": 2}]
+
+    funnel = status_funnel(cursor, job_id=1)
+    assert funnel["applications"] == {"total": 3, "by_status": {"Pending": 2, "Rejected": 1}}
+    assert funnel["interviews"]["by_status"] == {"scheduled": 1, "completed": 1}
+
+    histogram = score_histogram(cursor, job_id=1)
+    # The unscored match is left out and out-of-range scores land in the edge buckets
+    assert (histogram["total"], histogram["mean"]) == (3, pytest.approx(79.5))
+    assert [bucket["count"] for bucket in histogram["buckets"]] == [0, 0, 0, 0, 1, 0, 0, 0, 0, 2]
+    assert score_histogram(cursor)["buckets"][0]["count"] == 1
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("a2wsgi")
+pytest.importorskip("httpx")
+from flask import Flask, jsonify
+from starlette.responses import JSONResponse
+from starlette.testclient import TestClient
+
+from async_routes import async_application
+
+
+@pytest.fixture
+def flask_app():
+    app = Flask(__name__)
+
+    @app.route("/api/upload/job-description", methods=["POST"])
+    def upload_job_description():
+        return jsonify({"served_by": "flask"})
+
+    @app.route("/api/jobs")
+    def jobs():
+        return jsonify({"served_by": "flask"})
+
+    return app
+
+
+async def upload_job_description(request):
+    if request.headers.get("content-type") != "application/json":
+        return None
+    data = await request.json()
+    return JSONResponse({"served_by": "async", "title": data["jobTitle"]})
+
+
+@pytest.fixture
+def client(flask_app):
+    with TestClient(async_application(flask_app, {("POST", "/api/upload/job-description"): upload_job_description})) as client:
+        yield client
+
+
+def test_native_routes_are_awaited_and_everything_else_reaches_flask(client):
+    assert client.post("/api/upload/job-description", json={"jobTitle": "Engineer"}).json() == {
+        "served_by": "async", "title": "Engineer"
+    }
+    # A handler that returns None hands the request to the Flask view
+    assert client.post("/api/upload/job-description", files={"file": ("jobs.csv", b"a,b")}).json() == {"served_by": "flask"}
+    assert client.get("/api/jobs").json() == {"served_by": "flask"}
+
+
+def test_native_routes_answer_cors_preflights_and_send_cors_headers(client):
+    preflight = client.options("/api/upload/job-description", headers={
+        "Origin": "http://localhost:3000", "Access-Control-Request-Method": "POST"
+    })
+    assert preflight.status_code == 200
+    response = client.post("/api/upload/job-description", json={"jobTitle": "Engineer"},
+                           headers={"Origin": "http://localhost:3000"})
+    assert response.headers["access-control-allow-origin"] == "*"
+
+
+def test_lifespan_runs_the_startup_and_shutdown_hooks(flask_app):
+    events = []
+    with TestClient(async_application(flask_app, {}, on_startup=lambda: events.append("startup"),
+                                      on_shutdown=lambda: events.append("shutdown"))):
+        assert events == ["startup"]
+    assert events == ["startup", "shutdown"]
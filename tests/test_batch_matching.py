@@ -0,0 +1,61 @@
+import numpy as np
+
+import batch_matching
+from vector_store import VectorMatrix, VectorStore
+
+MATCH_FIELDS = [("skills", "required_skills", 0.5, "skill_score"), ("experience", "experience", 0.5, "experience_score")]
+
+
+def make_store(tmp_path, job_ids, candidate_ids, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    store = VectorStore(str(tmp_path / "vectors"), dim)
+    for candidate_field, job_field, _, _ in MATCH_FIELDS:
+        store.matrix("candidate", candidate_field).upsert(candidate_ids, rng.normal(size=(len(candidate_ids), dim)))
+        store.matrix("job", job_field).upsert(job_ids, rng.normal(size=(len(job_ids), dim)))
+    return store
+
+
+def test_jobs_without_vectors_are_left_unscored(tmp_path):
+    store = make_store(tmp_path, [1, 2, 3, 4], [10, 11])
+    # Job 3 lost one field's vector; job 5 was never embedded
+    store.matrix("job", "experience").delete([3])
+    batch_matching.init_worker(store.root, store.dim, store.dtype)
+
+    candidates, jobs, scores = batch_matching.score_shard([10, 11], [1, 2, 3, 4, 5], MATCH_FIELDS)
+    assert sorted(zip(candidates.tolist(), jobs.tolist())) == [(c, j) for c in (10, 11) for j in (1, 2, 4)]
+    assert np.isfinite(scores).all()
+
+
+def test_top_k_ignores_missing_jobs_and_keeps_applied(tmp_path):
+    store = make_store(tmp_path, list(range(1, 21)), [10])
+    store.matrix("job", "required_skills").delete([5, 6])
+    batch_matching.init_worker(store.root, store.dim, store.dtype)
+
+    _, all_jobs, all_scores = batch_matching.score_shard([10], list(range(1, 21)), MATCH_FIELDS)
+    best = set(all_jobs[np.argsort(-all_scores[:, -1])[:3]].tolist())
+    worst = int(all_jobs[np.argmin(all_scores[:, -1])])
+
+    _, jobs, scores = batch_matching.score_shard([10], list(range(1, 21)), MATCH_FIELDS, top_k=3, applied={10: {worst, 5}})
+    assert set(jobs.tolist()) == best | {worst}
+    assert np.isfinite(scores).all()
+
+
+def test_block_shrinks_with_the_job_count_without_changing_scores(tmp_path, monkeypatch):
+    job_ids, candidate_ids = list(range(1, 51)), list(range(100, 110))
+    store = make_store(tmp_path, job_ids, candidate_ids)
+    batch_matching.init_worker(store.root, store.dim, store.dtype)
+    expected = batch_matching.score_shard(candidate_ids, job_ids, MATCH_FIELDS)
+
+    blocks = []
+    cosine = VectorMatrix.cosine
+    monkeypatch.setattr(VectorMatrix, "cosine", lambda self, queries, **kw: blocks.append(len(queries)) or cosine(self, queries, **kw))
+    # Room for three candidates' float64 scores (two fields, eligibility and temporaries)
+    monkeypatch.setattr(batch_matching, "SCORE_BLOCK_BYTES", 3 * 50 * 8 * 5)
+    result = batch_matching.score_shard(candidate_ids, job_ids, MATCH_FIELDS)
+
+    assert max(blocks) == 3
+    np.testing.assert_array_equal(result[0], expected[0])
+    np.testing.assert_array_equal(result[1], expected[1])
+    # The float32 matrix products may round differently for another block shape
+    np.testing.assert_allclose(result[2], expected[2], rtol=1e-5)
+    assert result[2].dtype == np.float64
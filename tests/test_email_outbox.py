@@ -0,0 +1,128 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from email_outbox import OutboxSender, enqueue_email, init_outbox
+
+
+@pytest.fixture
+def sender(db, tmp_path):
+    init_outbox(db.cursor())
+    db.commit()
+    return OutboxSender(str(tmp_path / "job_matching.db"), None, lambda: {}, max_attempts=3, claim_timeout=300)
+
+
+def stale_claim(db, attempts):
+    message_id = enqueue_email(db.cursor(), "a@example.com", "Interview", "<p>Hi</p>")
+    db.execute("UPDATE email_outbox SET status = 'sending', claimed_at = ?, attempts = ? WHERE message_id = ?",
+               (time.time() - 301, attempts, message_id))
+    db.commit()
+    return message_id
+
+
+def test_stale_claim_is_requeued_and_counted_as_an_attempt(db, sender):
+    message_id = stale_claim(db, attempts=0)
+    conn = sender._connect_db()
+    rows = sender.claim_batch(conn)
+    conn.close()
+
+    assert [(row["message_id"], row["attempts"]) for row in rows] == [(message_id, 1)]
+    assert db.execute("SELECT status FROM email_outbox").fetchone()[0] == "sending"
+
+
+def test_stale_claim_fails_after_max_attempts(db, sender):
+    stale_claim(db, attempts=2)
+    conn = sender._connect_db()
+    assert sender.claim_batch(conn) == []
+    conn.close()
+
+    row = db.execute("SELECT status, attempts, last_error FROM email_outbox").fetchone()
+    assert tuple(row) == ("failed", 3, "send claim expired")
+
+
+def test_fresh_claim_is_not_taken_over(db, sender):
+    message_id = enqueue_email(db.cursor(), "a@example.com", "Interview", "<p>Hi</p>")
+    db.execute("UPDATE email_outbox SET status = 'sending', claimed_at = ? WHERE message_id = ?", (time.time(), message_id))
+    db.commit()
+    conn = sender._connect_db()
+    assert sender.claim_batch(conn) == []
+    conn.close()
+
+
+class FakeServer:
+    def __init__(self, fail_for=(), delay=0.0, during_send=None):
+        self.fail_for = set(fail_for)
+        self.delay = delay
+        self.during_send = during_send
+        self.sent = []
+
+    def send_message(self, message):
+        time.sleep(self.delay)
+        if self.during_send:
+            self.during_send(len(self.sent))
+        if message["To"] in self.fail_for:
+            raise RuntimeError("mailbox unavailable")
+        self.sent.append(message["To"])
+
+
+class FakePool:
+    def __init__(self, server):
+        self.server = server
+
+    @contextmanager
+    def connection(self):
+        yield self.server
+
+
+def queue(db, recipients):
+    ids = [enqueue_email(db.cursor(), recipient, "Interview", "<p>Hi</p>") for recipient in recipients]
+    db.commit()
+    return ids
+
+
+def test_failed_sends_back_off_and_fail_after_max_attempts(db, tmp_path):
+    init_outbox(db.cursor())
+    server = FakeServer(fail_for={"bad@example.com"})
+    sender = OutboxSender(str(tmp_path / "job_matching.db"), FakePool(server), lambda: {"sender_email": "hr@example.com"},
+                          max_attempts=2, base_backoff=10.0)
+    queue(db, ["good@example.com", "bad@example.com"])
+
+    before = time.time()
+    assert sender.process_once() == 2
+    rows = {row["recipient"]: row for row in db.execute("SELECT * FROM email_outbox")}
+    assert rows["good@example.com"]["status"] == "sent"
+    bad = rows["bad@example.com"]
+    assert (bad["status"], bad["attempts"], bad["last_error"]) == ("queued", 1, "mailbox unavailable")
+    assert before + 5 <= bad["next_attempt_at"] <= time.time() + 15
+
+    # Not due yet, then due: the second failure uses up max_attempts
+    assert sender.process_once() == 0
+    db.execute("UPDATE email_outbox SET next_attempt_at = 0 WHERE status = 'queued'")
+    db.commit()
+    assert sender.process_once() == 1
+    assert tuple(db.execute("SELECT status, attempts FROM email_outbox WHERE recipient = 'bad@example.com'").fetchone()) == ("failed", 2)
+    assert server.sent == ["good@example.com"]
+
+
+def test_batch_slower_than_claim_timeout_is_not_taken_over(db, tmp_path):
+    init_outbox(db.cursor())
+    path = str(tmp_path / "job_matching.db")
+    other = OutboxSender(path, None, lambda: {}, claim_timeout=0.25)
+    stolen = []
+
+    def claim_from_another_sender(sent_so_far):
+        if sent_so_far == 2:
+            conn = other._connect_db()
+            stolen.extend(row["recipient"] for row in other.claim_batch(conn))
+            conn.close()
+
+    server = FakeServer(delay=0.15, during_send=claim_from_another_sender)
+    sender = OutboxSender(path, FakePool(server), lambda: {"sender_email": "hr@example.com"}, claim_timeout=0.25)
+    recipients = [f"c{i}@example.com" for i in range(3)]
+    queue(db, recipients)
+
+    assert sender.process_once() == 3
+    assert stolen == []
+    assert server.sent == recipients
+    assert [row[0] for row in db.execute("SELECT status FROM email_outbox")] == ["sent"] * 3
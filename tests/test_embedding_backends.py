@@ -0,0 +1,44 @@
+import sys
+import types
+
+import pytest
+
+from embedding_backends import compare_rankings, load_embedding_model
+
+
+class FakeSentenceTransformer:
+    def __init__(self, model_name, device, backend="torch"):
+        if backend == "onnx" and not FakeSentenceTransformer.onnx_installed:
+            raise ImportError("No module named 'optimum'")
+        self.model_name = model_name
+        self.backend = backend
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    FakeSentenceTransformer.onnx_installed = True
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer))
+    return FakeSentenceTransformer
+
+
+def test_backend_selects_how_the_model_is_loaded(fake_models):
+    assert load_embedding_model("torch", "mini").backend == "torch"
+    assert load_embedding_model("onnx", "mini").backend == "onnx"
+
+    fake_models.onnx_installed = False
+    with pytest.raises(ValueError, match="optimum"):
+        load_embedding_model("onnx", "mini")
+    with pytest.raises(ValueError, match="Unknown embedding backend: tpu"):
+        load_embedding_model("tpu", "mini")
+
+
+def test_rankings_are_compared_by_top_k_overlap_and_spearman():
+    reference = {"job-1": [1, 2, 3, 4], "job-2": [5, 6], "job-3": []}
+    same = compare_rankings(reference, reference, k=2)
+    assert same == {"top_2_overlap": 1.0, "spearman": pytest.approx(1.0), "rankings_compared": 2}
+
+    swapped = compare_rankings(reference, {"job-1": [4, 3, 2, 1], "job-2": [5, 7]}, k=2)
+    # job-2 has a different id set, so only job-1 contributes a correlation
+    assert swapped["top_2_overlap"] == pytest.approx(0.25)
+    assert swapped["spearman"] == pytest.approx(-1.0)
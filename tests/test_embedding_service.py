@@ -0,0 +1,59 @@
+import threading
+
+import numpy as np
+import pytest
+
+from embedding_service import EmbeddingBatcher
+
+
+class RecordingEncoder:
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail_on in texts:
+            raise RuntimeError("model crashed")
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_concurrent_callers_share_forward_passes():
+    encode = RecordingEncoder()
+    batcher = EmbeddingBatcher(encode, max_batch_size=16, max_wait_ms=200)
+    start = threading.Barrier(8)
+    results = {}
+
+    def caller(i):
+        start.wait()
+        results[i] = batcher.encode("x" * i)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    # Every caller gets the row for its own text back, not a neighbour's
+    assert {i: int(vector[0]) for i, vector in results.items()} == {i: i for i in range(8)}
+    assert len(encode.batches) < 8
+    stats = batcher.stats()
+    assert (stats["texts"], stats["batches"]) == (8, len(encode.batches))
+
+
+def test_batches_are_capped_at_max_batch_size():
+    encode = RecordingEncoder()
+    batcher = EmbeddingBatcher(encode, max_batch_size=4, max_wait_ms=50)
+    vectors = batcher.encode_many(["a", "bb", "", "dddd", "eeeee", "ffffff"])
+
+    assert [int(vector[0]) for vector in vectors] == [1, 2, 0, 4, 5, 6]
+    assert [len(batch) for batch in encode.batches] == [4, 2]
+    assert batcher.stats()["batch_size_histogram"] == {"2": 1, "4": 1}
+
+
+def test_encode_errors_reach_the_callers_and_the_worker_keeps_running():
+    batcher = EmbeddingBatcher(RecordingEncoder(fail_on="boom"), max_batch_size=8, max_wait_ms=0)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.encode("boom")
+
+    assert int(batcher.encode("fine")[0]) == 4
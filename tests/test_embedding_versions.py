@@ -0,0 +1,118 @@
+import sqlite3
+
+import pytest
+
+from embedding_versions import EmbeddingReindexer, get_version, init_embedding_versions, request_version
+from response_cache import init_cache_versions
+
+
+class FakeVersionStore:
+    """Vectors of the version being built, keyed by kind; a score is the candidate/job id product."""
+
+    def __init__(self):
+        self.vectors = {"job": set(), "candidate": set()}
+
+    def encode_rows(self, kind, rows):
+        self.vectors[kind].update(row[f"{kind}_id"] for row in rows)
+
+    def missing_ids(self, kind, ids):
+        return {i for i in ids if i not in self.vectors[kind]}
+
+    def stage_scores(self, cursor, candidate, job_ids):
+        if job_ids is None:
+            job_ids = [row[0] for row in cursor.execute("SELECT job_id FROM jobs WHERE archived_at IS NULL")]
+        candidate_id = candidate["candidate_id"]
+        job_ids = [job_id for job_id in job_ids if job_id in self.vectors["job"]]
+        if candidate_id not in self.vectors["candidate"]:
+            self.encode_rows("candidate", [candidate])
+        return [(candidate_id, job_id, 0, 0, 0, 0, float(candidate_id * job_id)) for job_id in job_ids]
+
+
+@pytest.fixture
+def db_path(db, tmp_path):
+    cursor = db.cursor()
+    init_embedding_versions(cursor)
+    init_cache_versions(cursor)
+    request_version(cursor, "old-model", "torch", str(tmp_path / "old"), status='active')
+    for i in range(1, 4):
+        cursor.execute("INSERT INTO jobs (job_title) VALUES (?)", (f"Job {i}",))
+        cursor.execute("INSERT INTO candidates (name) VALUES (?)", (f"Candidate {i}",))
+    cursor.executemany(
+        "INSERT INTO scores (candidate_id, job_id, eligibility_score, model_version) VALUES (?, ?, 0, 'old-model-torch')",
+        [(c, j) for c in range(1, 4) for j in range(1, 4)]
+    )
+    db.commit()
+    return str(tmp_path / "job_matching.db")
+
+
+def reindexer(db_path, store, tmp_path):
+    conn = sqlite3.connect(db_path)
+    version = request_version(conn.cursor(), "new-model", "onnx", str(tmp_path / "new"))
+    conn.commit()
+    conn.close()
+    return EmbeddingReindexer(db_path, version, store.encode_rows, store.missing_ids, store.stage_scores,
+                              batch_size=2, pause_seconds=0)
+
+
+def live_write(db_path, table, name):
+    """A row added through the live version: it has no vector in the new store yet."""
+    conn = sqlite3.connect(db_path)
+    row_id = conn.execute(f"INSERT INTO {table} (name) VALUES (?)" if table == "candidates"
+                          else f"INSERT INTO {table} (job_title) VALUES (?)", (name,)).lastrowid
+    conn.commit()
+    conn.close()
+    return row_id
+
+
+def live_scores(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT candidate_id, job_id, eligibility_score, model_version FROM scores").fetchall()
+    conn.close()
+    return sorted(rows)
+
+
+def expected_scores(candidates, jobs, version="new-model-onnx"):
+    return sorted((c, j, float(c * j), version) for c in candidates for j in jobs)
+
+
+def test_rows_added_during_the_build_are_caught_up_before_the_switch(db_path, tmp_path):
+    store = FakeVersionStore()
+    worker = reindexer(db_path, store, tmp_path)
+    score_phase = worker._score_phase
+
+    def score_phase_with_live_writes(conn, after_id):
+        score_phase(conn, after_id)
+        live_write(db_path, "jobs", "Job 4")
+        live_write(db_path, "candidates", "Candidate 4")
+
+    worker._score_phase = score_phase_with_live_writes
+    assert worker.run()
+
+    assert live_scores(db_path) == expected_scores(range(1, 5), range(1, 5))
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    assert conn.execute("SELECT COUNT(*) FROM scores_staging").fetchone()[0] == 0
+    assert get_version(conn.cursor())["version"] == "new-model-onnx"
+    assert get_version(conn.cursor(), "old-model-torch")["status"] == 'retired'
+    conn.close()
+
+
+def test_write_between_the_last_catch_up_and_the_switch_gets_a_new_vector(db_path, tmp_path):
+    store = FakeVersionStore()
+    worker = reindexer(db_path, store, tmp_path)
+    switch = worker.switch
+    added = []
+
+    def live_writes_then_switch(conn):
+        added.append(live_write(db_path, "candidates", "Candidate 4"))
+        # A re-indexed job drops its stale vector from the version being built
+        store.vectors["job"].discard(2)
+        conn.execute("DELETE FROM scores_staging WHERE job_id = 2")
+        conn.commit()
+        switch(conn)
+
+    worker.switch = live_writes_then_switch
+    assert worker.run()
+
+    assert store.missing_ids("candidate", added) == set() and store.missing_ids("job", [2]) == set()
+    assert live_scores(db_path) == expected_scores(range(1, 5), range(1, 4))
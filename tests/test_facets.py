@@ -0,0 +1,90 @@
+from facets import add_job_to_facets, facet_counts, filtered_facet_counts, init_facets, rebuild_facets, remove_job_from_facets
+from job_lifecycle import active_job_condition, archive_job, init_job_lifecycle, unarchived_inactive_condition
+from skill_index import index_skills
+
+
+def add_job(cursor, company, location, skills, **fields):
+    columns = ["company", "location", "required_skills"] + list(fields)
+    cursor.execute(
+        f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [company, location, skills] + list(fields.values())
+    )
+    job_id = cursor.lastrowid
+    add_job_to_facets(cursor, company, location, index_skills(cursor, "job", job_id, skills))
+    return job_id
+
+
+def delete_job(cursor, job_id):
+    """The row-level part of the DELETE /api/jobs/<id> route."""
+    remove_job_from_facets(cursor, job_id)
+    cursor.execute("DELETE FROM scores WHERE job_id = ?", (job_id,))
+    cursor.execute("DELETE FROM scores_archive WHERE job_id = ?", (job_id,))
+    cursor.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+    cursor.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+
+def counts(cursor, facet):
+    return {row["value"]: row["count"] for row in facet_counts(cursor, facet)}
+
+
+def setup(db):
+    cursor = db.cursor()
+    init_facets(cursor)
+    init_job_lifecycle(cursor)
+    return cursor
+
+
+def test_delete_decrements_facets(db):
+    cursor = setup(db)
+    first = add_job(cursor, "Acme", "Remote", "Python, SQL")
+    add_job(cursor, "Acme", "Remote", "Python")
+    delete_job(cursor, first)
+    assert counts(cursor, "company") == {"Acme": 1}
+    assert counts(cursor, "skill") == {"python": 1}
+
+
+def test_archive_removes_job_from_facets(db):
+    cursor = setup(db)
+    first = add_job(cursor, "Acme", "Remote", "Python, SQL")
+    add_job(cursor, "Acme", "Remote", "Python")
+    archive_job(cursor, first)
+    assert counts(cursor, "company") == {"Acme": 1}
+    assert counts(cursor, "location") == {"Remote": 1}
+    assert counts(cursor, "skill") == {"python": 1}
+
+
+def test_archive_then_delete_does_not_decrement_twice(db):
+    cursor = setup(db)
+    first = add_job(cursor, "Acme", "Remote", "Python, SQL")
+    add_job(cursor, "Acme", "Remote", "Python")
+    archive_job(cursor, first)
+    delete_job(cursor, first)
+    assert counts(cursor, "company") == {"Acme": 1}
+    assert counts(cursor, "location") == {"Remote": 1}
+    assert counts(cursor, "skill") == {"python": 1}
+
+
+def test_rebuild_matches_incremental_counts_with_archived_jobs(db):
+    cursor = setup(db)
+    first = add_job(cursor, "Acme", "Remote", "Python, SQL")
+    add_job(cursor, "Acme", "Berlin", "Python")
+    add_job(cursor, "Initech", "Remote", "Go")
+    archive_job(cursor, first)
+    # A stale skill row of the archived job must not be counted either
+    index_skills(cursor, "job", first, "Python, SQL")
+    incremental = {facet: counts(cursor, facet) for facet in ("company", "location", "skill")}
+    rebuild_facets(cursor)
+    assert {facet: counts(cursor, facet) for facet in ("company", "location", "skill")} == incremental
+
+
+def test_expired_job_awaiting_archive_is_left_out_of_unfiltered_counts(db):
+    cursor = setup(db)
+    add_job(cursor, "Acme", "Remote", "Python, SQL", expires_at="2000-01-01 00:00:00")
+    add_job(cursor, "Acme", "Berlin", "Python")
+    add_job(cursor, "Initech", "Remote", "Go", status="closed")
+
+    for facet in ("company", "location", "skill"):
+        unfiltered = facet_counts(cursor, facet, exclude=unarchived_inactive_condition())
+        assert unfiltered == filtered_facet_counts(cursor, facet, active_job_condition(), [])
+    assert counts(cursor, "company") == {"Acme": 2, "Initech": 1}
+    assert facet_counts(cursor, "skill", limit=1, exclude=unarchived_inactive_condition()) == [{"value": "python", "count": 1}]
@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+
+import pytest
+
+from interview_calendar import begin_booking, find_conflicts, init_interview_calendar, interview_bounds
+
+INTERVIEWS = """CREATE TABLE interviews (
+    interview_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    candidate_id INTEGER NOT NULL, job_id INTEGER NOT NULL, recruiter_id INTEGER,
+    date TEXT NOT NULL, time TEXT NOT NULL, duration TEXT NOT NULL, status TEXT NOT NULL,
+    starts_at TEXT, ends_at TEXT
+)"""
+
+
+@pytest.fixture
+def db_path(db, tmp_path):
+    db.execute(INTERVIEWS)
+    init_interview_calendar(db.cursor())
+    db.commit()
+    return str(tmp_path / "job_matching.db")
+
+
+def book(cursor, candidate_id, recruiter_id, time, duration="1 hour", exclude_id=None):
+    """The check-then-insert part of POST /api/interviews; returns the conflicts or the new id."""
+    starts_at, ends_at = interview_bounds("2026-03-02", time, duration)
+    begin_booking(cursor)
+    conflicts = find_conflicts(cursor, starts_at, ends_at, recruiter_id, candidate_id, exclude_id=exclude_id)
+    if conflicts:
+        cursor.connection.rollback()
+        return conflicts
+    cursor.execute(
+        "INSERT INTO interviews (candidate_id, job_id, recruiter_id, date, time, duration, status, starts_at, ends_at) "
+        "VALUES (?, 1, ?, '2026-03-02', ?, ?, 'scheduled', ?, ?)",
+        (candidate_id, recruiter_id, time, duration, starts_at, ends_at)
+    )
+    cursor.connection.commit()
+    return cursor.lastrowid
+
+
+def test_overlap_with_the_recruiter_or_candidate_conflicts(db, db_path):
+    first = book(db.cursor(), candidate_id=1, recruiter_id=7, time="10:00")
+
+    conflicts = book(db.cursor(), candidate_id=2, recruiter_id=7, time="10:30")
+    assert [(c["interview_id"], c["conflict_on"]) for c in conflicts] == [(first, "recruiter_id")]
+    conflicts = book(db.cursor(), candidate_id=1, recruiter_id=8, time="9:30 AM")
+    assert [(c["interview_id"], c["conflict_on"]) for c in conflicts] == [(first, "candidate_id")]
+
+
+def test_back_to_back_interviews_do_not_conflict(db, db_path):
+    book(db.cursor(), candidate_id=1, recruiter_id=7, time="10:00")
+    assert isinstance(book(db.cursor(), candidate_id=1, recruiter_id=7, time="11:00"), int)
+    assert isinstance(book(db.cursor(), candidate_id=1, recruiter_id=7, time="09:00"), int)
+
+
+def test_rescheduling_an_interview_does_not_conflict_with_itself(db, db_path):
+    first = book(db.cursor(), candidate_id=1, recruiter_id=7, time="10:00")
+    starts_at, ends_at = interview_bounds("2026-03-02", "10:30", "1 hour")
+
+    assert find_conflicts(db.cursor(), starts_at, ends_at, 7, 1, exclude_id=first) == []
+    assert [c["interview_id"] for c in find_conflicts(db.cursor(), starts_at, ends_at, 7, 1)] == [first, first]
+
+
+def test_concurrent_bookings_of_one_slot_cannot_both_pass_the_check(db_path):
+    first = sqlite3.connect(db_path, timeout=10)
+    second = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+    starts_at, ends_at = interview_bounds("2026-03-02", "10:00", "1 hour")
+    begin_booking(first.cursor())
+    assert find_conflicts(first.cursor(), starts_at, ends_at, 7, 1) == []
+
+    results = []
+    racer = threading.Thread(target=lambda: results.append(book(second.cursor(), candidate_id=2, recruiter_id=7, time="10:15")))
+    racer.start()
+    racer.join(0.2)
+    # The second booking is waiting on the lock instead of checking against a stale calendar
+    assert racer.is_alive()
+
+    first.execute(
+        "INSERT INTO interviews (candidate_id, job_id, recruiter_id, date, time, duration, status, starts_at, ends_at) "
+        "VALUES (1, 1, 7, '2026-03-02', '10:00', '1 hour', 'scheduled', ?, ?)", (starts_at, ends_at)
+    )
+    first.commit()
+    racer.join(5)
+
+    assert [c["conflict_on"] for c in results[0]] == ["recruiter_id"]
+    assert first.execute("SELECT COUNT(*) FROM interviews").fetchone()[0] == 1
+    first.close()
+    second.close()
@@ -0,0 +1,88 @@
+import sqlite3
+
+import pytest
+
+from job_import import JobFeedImport, init_imports
+from llm_client import LLMUnavailableError
+
+
+def write_feed(path, titles):
+    lines = ["Job Title,Job Description"] + [f"{title},Build things with Python {i}" for i, title in enumerate(titles)]
+    path.write_text("\n".join(lines) + "\n", encoding="ISO-8859-1")
+    return str(path)
+
+
+def parse_rows(rows):
+    return {row_id: {"Required Skills": "Python"} for row_id, _ in rows}
+
+
+def insert_job(conn, features):
+    cursor = conn.execute("INSERT INTO jobs (job_title, required_skills) VALUES (?, ?)",
+                          (features["Job Title"], features["Required Skills"]))
+    return cursor.lastrowid
+
+
+@pytest.fixture
+def db_path(db, tmp_path):
+    init_imports(db.cursor())
+    db.commit()
+    return str(tmp_path / "job_matching.db")
+
+
+def job_titles(db_path):
+    conn = sqlite3.connect(db_path)
+    titles = [row[0] for row in conn.execute("SELECT job_title FROM jobs ORDER BY job_id")]
+    conn.close()
+    return titles
+
+
+def test_chunks_commit_and_missing_titles_become_empty_strings(db_path, tmp_path):
+    committed = []
+    feed = write_feed(tmp_path / "feed.csv", ["Engineer", "", "Analyst", "Designer", ""])
+    job_import = JobFeedImport(db_path, feed, parse_rows, insert_job, committed.append, chunk_size=2)
+    status = job_import.run()
+
+    assert status["status"] == "completed"
+    assert status["rows_done"] == status["jobs_inserted"] == 5
+    assert job_titles(db_path) == ["Engineer", "", "Analyst", "Designer", ""]
+    assert [len(chunk) for chunk in committed] == [2, 2, 1]
+    assert all(isinstance(features["Job Title"], str) for chunk in committed for _, features in chunk)
+
+
+def test_failed_chunk_rolls_back_and_resumes(db_path, tmp_path):
+    feed = write_feed(tmp_path / "feed.csv", ["A", "B", "C", "D", "E"])
+    calls = []
+
+    def flaky_insert(conn, features):
+        calls.append(features["Job Title"])
+        if features["Job Title"] == "D" and calls.count("D") == 1:
+            raise RuntimeError("disk full")
+        return insert_job(conn, features)
+
+    job_import = JobFeedImport(db_path, feed, parse_rows, flaky_insert, chunk_size=2)
+    with pytest.raises(RuntimeError):
+        job_import.run()
+    status = job_import.status()
+    assert status["status"] == "failed"
+    assert status["last_error"] == "disk full"
+    # C was inserted in the failed chunk and rolled back with it
+    assert status["rows_done"] == 2
+    assert job_titles(db_path) == ["A", "B"]
+
+    resumed = JobFeedImport(db_path, feed, parse_rows, flaky_insert, chunk_size=2)
+    assert resumed.start() == job_import.import_id
+    assert resumed.run()["status"] == "completed"
+    assert job_titles(db_path) == ["A", "B", "C", "D", "E"]
+
+
+def test_llm_outage_pauses_the_import(db_path, tmp_path):
+    feed = write_feed(tmp_path / "feed.csv", ["A", "B", "C"])
+
+    def unavailable(rows):
+        raise LLMUnavailableError("circuit open")
+
+    job_import = JobFeedImport(db_path, feed, unavailable, insert_job, chunk_size=2)
+    with pytest.raises(LLMUnavailableError):
+        job_import.run()
+    assert job_import.status()["status"] == "paused"
+    assert job_titles(db_path) == []
@@ -0,0 +1,42 @@
+import json
+
+from job_parsing import JOB_FEATURE_FIELDS, pack_job_batches, parse_job_batch
+
+
+def features(row_id, **overrides):
+    item = {field: f"{field} {row_id}" for field in JOB_FEATURE_FIELDS}
+    item.update(row_id=row_id, **overrides)
+    return item
+
+
+def test_batches_respect_the_item_cap_and_the_token_budget():
+    short = [(i, "Python developer") for i in range(5)]
+    assert [[row_id for row_id, _ in batch] for batch in pack_job_batches(short, 4000, 2)] == [[0, 1], [2, 3], [4]]
+
+    long_text = "word " * 400
+    rows = [(0, long_text), (1, "Python developer"), (2, long_text)]
+    batches = list(pack_job_batches(rows, 1300, 8, overhead=100))
+    assert [[row_id for row_id, _ in batch] for batch in batches] == [[0, 1], [2]]
+    # A description bigger than the whole budget still gets a batch of its own
+    assert [len(batch) for batch in pack_job_batches([(0, long_text * 10)], 700, 8)] == [1]
+
+
+def test_only_well_formed_items_for_known_rows_are_kept():
+    rows = [(0, "a"), (1, "b"), (2, "c"), (3, "d")]
+    content = "```json\n" + json.dumps([
+        features(0),
+        features(1, **{"Required Skills": ["Python"]}),
+        features("2"),
+        features(9),
+        "not an object"
+    ]) + "\n```"
+    parsed = parse_job_batch(content, rows)
+
+    assert sorted(parsed) == [0, 2]
+    assert parsed[2]["Job Title"] == "Job Title 2" and "row_id" not in parsed[2]
+
+
+def test_unparseable_answers_leave_every_row_for_individual_parsing():
+    rows = [(0, "a"), (1, "b")]
+    assert parse_job_batch("Sorry, I can't help with that.", rows) == {}
+    assert parse_job_batch(json.dumps(features(0)), rows) == {}
@@ -0,0 +1,153 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from llm_client import CircuitBreaker, DeferredLLMWork, LLMUnavailableError, ResilientLLM
+
+
+class FlakyLLM:
+    """Chat model stand-in that raises ``failures`` times before answering."""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError("groq unreachable")
+        return "ok"
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError("groq unreachable")
+        return "ok"
+
+
+def resilient(llm, **kwargs):
+    return ResilientLLM(llm, base_backoff=0.0, **kwargs)
+
+
+@pytest.mark.parametrize("call", [
+    lambda client: client.invoke([]),
+    lambda client: asyncio.run(client.ainvoke([]))
+], ids=["sync", "async"])
+def test_failed_attempts_are_retried(call):
+    llm = FlakyLLM(failures=2)
+    client = resilient(llm, max_retries=2)
+
+    assert call(client) == "ok"
+    assert llm.calls == 3
+    stats = client.stats()
+    assert (stats["retries"], stats["failures"], stats["successes"], stats["breaker_state"]) == (2, 2, 1, "closed")
+
+
+def test_exhausted_retries_open_the_breaker_and_later_calls_fail_fast():
+    llm = FlakyLLM(failures=10)
+    client = resilient(llm, max_retries=1, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            client.invoke([])
+    assert llm.calls == 4
+    assert client.breaker.state == "open"
+
+    with pytest.raises(LLMUnavailableError, match="circuit breaker is open"):
+        client.invoke([])
+    assert llm.calls == 4
+    assert (client.stats()["breaker_opened"], client.stats()["short_circuited"]) == (1, 1)
+
+
+def test_half_open_probe_closes_the_breaker_on_success():
+    llm = FlakyLLM(failures=1)
+    client = resilient(llm, max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    with pytest.raises(LLMUnavailableError):
+        client.invoke([])
+    assert client.breaker.state == "open"
+
+    time.sleep(0.06)
+    assert client.breaker.state == "half_open"
+    assert client.invoke([]) == "ok"
+    assert client.breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_slow_attempts_time_out():
+    client = resilient(FlakyLLM(delay=0.5), timeout=0.05, max_retries=1)
+    with pytest.raises(LLMUnavailableError, match="exceeded"):
+        client.invoke([])
+    assert client.stats()["timeouts"] == 2
+
+
+@pytest.fixture
+def work(db, tmp_path):
+    queue = DeferredLLMWork(str(tmp_path / "job_matching.db"), CircuitBreaker(), lease_seconds=60, max_attempts=2)
+    queue.init(db.cursor())
+    db.commit()
+    return queue
+
+
+def crash_while_running(work, heartbeat):
+    """Claim the next item the way a worker does, then die without finishing it."""
+    conn = work._connect()
+    row = work._claim(conn)
+    conn.execute("UPDATE llm_work_queue SET heartbeat_at = datetime('now', ?) WHERE work_id = ?", (heartbeat, row["work_id"]))
+    conn.commit()
+    conn.close()
+    return row["work_id"]
+
+
+def work_row(work, work_id):
+    conn = sqlite3.connect(work.db_path)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM llm_work_queue WHERE work_id = ?", (work_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def test_item_of_a_dead_worker_runs_again_after_its_lease_expires(work):
+    seen = []
+    work.register("resume", seen.append)
+    work_id = work.enqueue("resume", {"file_path": "a.pdf"})
+    crash_while_running(work, "-61 seconds")
+
+    assert work.process_once()
+    assert seen == [{"file_path": "a.pdf"}]
+    row = work_row(work, work_id)
+    assert (row["status"], row["attempts"]) == ("done", 2)
+
+
+def test_item_with_a_live_lease_is_left_alone(work):
+    work.register("resume", lambda payload: pytest.fail("ran an item another worker holds"))
+    work_id = work.enqueue("resume", {})
+    crash_while_running(work, "-30 seconds")
+
+    assert not work.process_once()
+    assert work_row(work, work_id)["status"] == "running"
+
+
+def test_expired_item_fails_once_it_used_its_attempts(work):
+    work.register("resume", lambda payload: None)
+    work_id = work.enqueue("resume", {})
+    crash_while_running(work, "-61 seconds")
+    crash_while_running(work, "-61 seconds")
+
+    assert not work.process_once()
+    row = work_row(work, work_id)
+    assert (row["status"], row["attempts"], row["last_error"]) == ("failed", 2, "worker lease expired")
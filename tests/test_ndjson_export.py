@@ -0,0 +1,63 @@
+import gzip
+import json
+import sqlite3
+import zlib
+
+from ndjson_export import gzip_stream, ndjson_lines
+
+
+class TrackedConnection:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.closed = False
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def close(self):
+        self.closed = True
+        self.conn.close()
+
+
+def connector(db, tmp_path):
+    db.executemany("INSERT INTO candidates (name, skills) VALUES (?, ?)",
+                   [(f"Candidate {i}", "Python") for i in range(5)])
+    db.commit()
+    opened = []
+
+    def connect():
+        opened.append(TrackedConnection(tmp_path / "job_matching.db"))
+        return opened[-1]
+    return connect, opened
+
+
+def test_rows_stream_as_json_lines_in_batches(db, tmp_path):
+    connect, opened = connector(db, tmp_path)
+    chunks = list(ndjson_lines(connect, "SELECT candidate_id, name FROM candidates WHERE candidate_id > ? ORDER BY candidate_id",
+                               (1,), batch_size=2))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2]
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert lines == [{"candidate_id": i, "name": f"Candidate {i - 1}"} for i in range(2, 6)]
+    assert opened[0].closed
+
+
+def test_connection_opens_lazily_and_closes_when_the_client_disconnects(db, tmp_path):
+    connect, opened = connector(db, tmp_path)
+    stream = ndjson_lines(connect, "SELECT * FROM candidates", batch_size=1)
+    assert opened == []
+
+    next(stream)
+    stream.close()
+    assert opened[0].closed
+
+
+def test_gzip_stream_can_be_decoded_after_every_chunk(db, tmp_path):
+    connect, _ = connector(db, tmp_path)
+    body = list(ndjson_lines(connect, "SELECT * FROM candidates", batch_size=2))
+    compressed = list(gzip_stream(iter(body)))
+
+    decoder = zlib.decompressobj(31)
+    for chunk, original in zip(compressed, body):
+        assert decoder.decompress(chunk) == original
+    assert gzip.decompress(b"".join(compressed)) == b"".join(body)
@@ -0,0 +1,81 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from reranker import CrossEncoderReranker, LRUCache
+
+
+class FakeCrossEncoder:
+    """Stand-in model: loading waits on ``loaded``, scores are text length differences."""
+
+    loaded = threading.Event()
+    delay = 0.0
+
+    def __init__(self, model_name, device):
+        FakeCrossEncoder.loaded.wait(5)
+        self.calls = []
+
+    def predict(self, pairs, batch_size):
+        self.calls.append(len(pairs))
+        time.sleep(self.delay)
+        return [len(candidate) - len(job) for candidate, job in pairs]
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(CrossEncoder=FakeCrossEncoder))
+    FakeCrossEncoder.loaded.set()
+    FakeCrossEncoder.delay = 0.0
+    yield FakeCrossEncoder
+
+
+def pairs(n, version="v1"):
+    return [(f"c{i}-{version}", "j1", "x" * i, "") for i in range(n)]
+
+
+def test_lru_cache_evicts_the_least_recently_used_key():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c"), len(cache)) == (1, None, 3, 2)
+
+
+def test_scores_are_cached_per_content_version(fake_model):
+    reranker = CrossEncoderReranker("cross", batch_size=4)
+    reranker.load()
+    assert reranker.rerank(pairs(6)) == [float(i) for i in range(6)]
+    assert reranker._model.calls == [4, 2]
+
+    assert reranker.rerank(pairs(6)) == [float(i) for i in range(6)]
+    assert reranker._model.calls == [4, 2]
+    reranker.rerank(pairs(2, version="v2"))
+    assert reranker._model.calls == [4, 2, 2]
+
+
+def test_budget_overrun_falls_back_and_keeps_scored_batches(fake_model):
+    fake_model.delay = 0.05
+    reranker = CrossEncoderReranker("cross", budget_ms=20, batch_size=2)
+    reranker.load()
+
+    assert reranker.rerank(pairs(6)) is None
+    assert reranker._model.calls == [2]
+    assert reranker.cache.get(("cross", "c0-v1", "j1")) == 0.0
+
+
+def test_requests_do_not_wait_for_the_model_load(fake_model):
+    fake_model.loaded.clear()
+    reranker = CrossEncoderReranker("cross", budget_ms=1000)
+
+    started = time.monotonic()
+    assert reranker.rerank(pairs(2)) is None
+    assert time.monotonic() - started < 0.5
+    assert reranker._loader.is_alive()
+
+    fake_model.loaded.set()
+    reranker._loader.join(5)
+    assert reranker.rerank(pairs(2)) == [0.0, 1.0]
@@ -0,0 +1,65 @@
+import sqlite3
+
+from flask import Flask, jsonify
+
+from job_lifecycle import EXPIRED_JOBS_SQL, active_job_condition, init_job_lifecycle
+from response_cache import ResponseCache, bump_cache_version, init_cache_versions
+
+
+def make_app(db, tmp_path):
+    init_cache_versions(db.cursor())
+    init_job_lifecycle(db.cursor())
+    db.commit()
+    cache = ResponseCache(lambda: sqlite3.connect(tmp_path / "job_matching.db"))
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/jobs")
+    @cache.cached("jobs", validators=[EXPIRED_JOBS_SQL])
+    def jobs():
+        calls.append(1)
+        rows = db.execute(f"SELECT job_id FROM jobs WHERE {active_job_condition()} ORDER BY job_id").fetchall()
+        return jsonify([row[0] for row in rows])
+
+    return app.test_client(), calls
+
+
+def test_etag_and_body_reused_until_version_bump(db, tmp_path):
+    client, calls = make_app(db, tmp_path)
+    db.execute("INSERT INTO jobs (job_title) VALUES ('a')")
+    db.commit()
+
+    first = client.get("/jobs")
+    assert first.json == [1]
+    assert client.get("/jobs", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert client.get("/jobs").json == [1]
+    assert len(calls) == 1
+
+    db.execute("INSERT INTO jobs (job_title) VALUES ('b')")
+    bump_cache_version(db.cursor(), "jobs")
+    db.commit()
+    second = client.get("/jobs", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.json == [1, 2]
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_query_string_is_part_of_the_key(db, tmp_path):
+    client, calls = make_app(db, tmp_path)
+    assert client.get("/jobs?page=1").headers["ETag"] != client.get("/jobs?page=2").headers["ETag"]
+    assert len(calls) == 2
+
+
+def test_expiry_invalidates_without_a_write(db, tmp_path):
+    client, calls = make_app(db, tmp_path)
+    db.execute("INSERT INTO jobs (job_title, expires_at) VALUES ('a', datetime('now', '+1 hour'))")
+    db.commit()
+    first = client.get("/jobs")
+    assert first.json == [1]
+
+    # The job lapses as time passes; nothing bumps the "jobs" version
+    db.execute("UPDATE jobs SET expires_at = datetime('now', '-1 second')")
+    db.commit()
+    second = client.get("/jobs", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.json == []
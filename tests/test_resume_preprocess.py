@@ -0,0 +1,51 @@
+from resume_preprocess import estimate_tokens, prepare_resume_text, remove_page_furniture
+
+
+def body(*lines):
+    return "\n".join(lines)
+
+
+def test_page_numbers_are_removed_only_from_page_edges():
+    pages = [
+        body("Jane Doe", "9876543210", "Experience", "Engineer at Acme", "2019", "Built pipelines", "More work",
+             "Even more", "Page 1 of 2"),
+        body("- 2 -", "Projects", "Search engine", "42", "Rewrote the indexer", "Shipped it", "Done", "Last", "2")
+    ]
+    cleaned = [page.split("\n") for page in remove_page_furniture(pages)]
+
+    assert "Page 1 of 2" not in cleaned[0] and "- 2 -" not in cleaned[1] and "2" not in cleaned[1]
+    # A phone number in the header, and digit-only lines inside a page, are content
+    assert "9876543210" in cleaned[0] and "2019" in cleaned[0] and "42" in cleaned[1]
+
+
+def test_header_and_footer_repeated_across_pages_are_removed():
+    pages = [
+        body("Jane Doe - Resume", f"Line {page} a", f"Line {page} b", f"Line {page} c", f"Line {page} d",
+             f"Line {page} e", f"Line {page} f", "jane@example.com | Confidential")
+        for page in range(3)
+    ]
+    cleaned = remove_page_furniture(pages)
+
+    assert all("Jane Doe - Resume" not in page and "Confidential" not in page for page in cleaned)
+    assert all(f"Line {page} a" in cleaned[page] and f"Line {page} f" in cleaned[page] for page in range(3))
+
+
+def test_low_priority_sections_are_dropped_first_and_prompt_sections_kept():
+    filler = " ".join(["word"] * 200)
+    resume = body(
+        "Jane Doe", "Skills", "Python, SQL", "Experience", "Engineer at Acme", "Courses", "Databases",
+        "Achievements", "Hackathon winner", "Summary", filler, "Interests", filler, "References", filler
+    )
+    text, report = prepare_resume_text([resume], token_budget=estimate_tokens(resume) - 10)
+
+    assert report["dropped_sections"] == ["references"]
+    assert not report["truncated"]
+
+    text, report = prepare_resume_text([resume], token_budget=60)
+    assert report["dropped_sections"] == ["references", "interests", "summary"]
+    assert "Databases" in text and "Hackathon winner" in text
+    assert report["tokens_after"] <= 60
+
+    text, report = prepare_resume_text([resume], token_budget=20)
+    assert "courses" not in report["dropped_sections"] and "achievements" not in report["dropped_sections"]
+    assert report["truncated"]
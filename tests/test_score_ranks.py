@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from score_ranks import RANK_BATCH_SIZE, init_score_ranks, many_job_ranks, rebuild_score_ranks
+
+JOBS = 5
+
+
+@pytest.fixture
+def ranked(db):
+    """Random scores and applications (with repeats, ties, NULLs and out-of-range scores) under the rollup triggers."""
+    rng = random.Random(1)
+    cursor = db.cursor()
+    cursor.execute("CREATE INDEX idx_applications_job ON applications (job_id, candidate_id)")
+    for candidate_id in range(300):
+        for job_id in range(JOBS):
+            score = rng.choice([None, round(rng.uniform(-2, 103), rng.choice([0, 1, 3])), 50.0, 99.5, 0.5])
+            cursor.execute("INSERT INTO scores (candidate_id, job_id, eligibility_score) VALUES (?, ?, ?)",
+                           (candidate_id, job_id, score))
+    for _ in range(200):
+        cursor.execute("INSERT INTO applications (candidate_id, job_id) VALUES (?, ?)", (rng.randrange(300), rng.randrange(JOBS)))
+    init_score_ranks(cursor)
+
+    for _ in range(500):
+        op = rng.random()
+        if op < 0.3:
+            cursor.execute("UPDATE scores SET eligibility_score = ? WHERE score_id = ?",
+                           (rng.choice([None, rng.uniform(0, 100)]), rng.randrange(1, 1501)))
+        elif op < 0.5:
+            cursor.execute("DELETE FROM scores WHERE score_id = ?", (rng.randrange(1, 1501),))
+        elif op < 0.6:
+            cursor.execute("INSERT INTO scores (candidate_id, job_id, eligibility_score) VALUES (?, ?, ?)",
+                           (rng.randrange(300), rng.randrange(JOBS), rng.uniform(0, 100)))
+        elif op < 0.8:
+            cursor.execute("INSERT INTO applications (candidate_id, job_id) VALUES (?, ?)", (rng.randrange(300), rng.randrange(JOBS)))
+        elif op < 0.9:
+            cursor.execute("DELETE FROM applications WHERE application_id = ?", (rng.randrange(1, 300),))
+        else:
+            cursor.execute("UPDATE applications SET job_id = ? WHERE application_id = ?", (rng.randrange(JOBS), rng.randrange(1, 300)))
+    return cursor
+
+
+def brute_force_rank(cursor, job_id, score, applicants):
+    if score is None:
+        return None
+    if applicants:
+        query = ("SELECT s.eligibility_score FROM applications a "
+                 "JOIN scores s ON s.job_id = a.job_id AND s.candidate_id = a.candidate_id WHERE a.job_id = ?")
+    else:
+        query = "SELECT eligibility_score FROM scores s WHERE job_id = ?"
+    pool = [row[0] for row in cursor.execute(query + " AND s.eligibility_score IS NOT NULL", (job_id,))]
+    if not pool:
+        return None
+    above = sum(value > score for value in pool)
+    tied = sum(value == score for value in pool)
+    return {
+        "rank": above + 1,
+        "pool_size": len(pool),
+        "top_percent": round(100.0 * (above + 1) / len(pool), 1),
+        "percentile": round(100.0 * (len(pool) - above - tied) / len(pool), 1)
+    }
+
+
+def test_trigger_maintained_rollups_match_a_rebuild(ranked):
+    incremental = {table: sorted(map(tuple, ranked.execute(f"SELECT * FROM {table} WHERE count != 0")))
+                   for table in ("score_rank_buckets", "applicant_rank_buckets")}
+    rebuild_score_ranks(ranked)
+    assert incremental == {table: sorted(map(tuple, ranked.execute(f"SELECT * FROM {table}"))) for table in incremental}
+
+
+def test_batched_ranks_match_brute_force(ranked):
+    pairs = [tuple(row) for row in ranked.execute("SELECT job_id, eligibility_score FROM scores")]
+    pairs += [(1, score) for score in (-5, 0, 0.5, 37.25, 99.5, 100, 120)] + [(JOBS, 50.0)]
+    assert len(pairs) > RANK_BATCH_SIZE
+
+    ranks = many_job_ranks(ranked, pairs)
+    assert ranks == [
+        {"pool": brute_force_rank(ranked, job_id, score, False), "applicants": brute_force_rank(ranked, job_id, score, True)}
+        for job_id, score in pairs
+    ]
+
+
+def test_ranks_take_one_query_per_batch(db, ranked):
+    scored = ranked.execute("SELECT job_id, eligibility_score FROM scores WHERE eligibility_score IS NOT NULL LIMIT ?",
+                            (RANK_BATCH_SIZE + 1,))
+    pairs = [tuple(row) for row in scored] + [(1, None)]
+    statements = []
+    db.set_trace_callback(statements.append)
+    many_job_ranks(ranked, pairs)
+    db.set_trace_callback(None)
+    assert len(statements) == 2
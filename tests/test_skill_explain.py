@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from reranker import content_version
+from skill_explain import SkillExplainer
+
+# Two-dimensional stand-in embeddings: python ~ django, sql orthogonal to both
+VECTORS = {
+    "python": [1.0, 0.0],
+    "django": [0.9, 0.1],
+    "sql": [0.0, 1.0],
+    "postgresql": [0.2, 0.98],
+    "go": [-1.0, 0.0]
+}
+
+
+class StubEncoder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return np.array([VECTORS[text] for text in texts], dtype=np.float32)
+
+
+def explain(explainer, encode, candidate_skills, required_skills, threshold=0.8):
+    versions = (content_version(candidate_skills), content_version(required_skills))
+    return explainer.explain(candidate_skills, required_skills, encode, "v1", versions, threshold)
+
+
+def test_required_skills_split_into_covered_and_missing_at_the_threshold():
+    result = explain(SkillExplainer(), StubEncoder(), "Django, PostgreSQL", "Python, SQL, Go")
+
+    assert [(c["skill"], c["match"]) for c in result["covered"]] == [("python", "django"), ("sql", "postgresql")]
+    assert [(m["skill"], m["closest"]) for m in result["missing"]] == [("go", "postgresql")]
+    assert result["coverage"] == pytest.approx(2 / 3, abs=1e-4)
+
+    strict = explain(SkillExplainer(), StubEncoder(), "Django, PostgreSQL", "Python, SQL, Go", threshold=0.999)
+    assert [m["skill"] for m in strict["missing"]] == ["python", "sql", "go"]
+
+
+def test_token_vectors_are_reused_across_explanations():
+    explainer, encode = SkillExplainer(), StubEncoder()
+    explain(explainer, encode, "Django, PostgreSQL", "Python, SQL")
+    explain(explainer, encode, "Django, Go", "Python")
+
+    assert encode.batches == [["python", "sql", "django", "postgresql"], ["go"]]
+    assert explainer.tokens_encoded == 5
+
+
+def test_explanation_cache_follows_candidate_and_job_skill_changes():
+    explainer, encode = SkillExplainer(), StubEncoder()
+    assert not explain(explainer, encode, "Django", "Python")["cached"]
+    assert explain(explainer, encode, "Django", "Python")["cached"]
+
+    changed_candidate = explain(explainer, encode, "Go", "Python")
+    assert not changed_candidate["cached"] and changed_candidate["missing"][0]["closest"] == "go"
+    changed_job = explain(explainer, encode, "Go", "Go, SQL")
+    assert not changed_job["cached"] and [c["skill"] for c in changed_job["covered"]] == ["go"]
+    assert explainer.stats()["explanations"] == 3
@@ -0,0 +1,53 @@
+import pytest
+
+from skill_index import index_skills, init_skill_stats, overlap_scores, rebuild_skill_stats
+
+
+@pytest.fixture
+def cursor(db):
+    cursor = db.cursor()
+    init_skill_stats(cursor)
+    index_skills(cursor, "candidate", 1, "Python, SQL, Docker")
+    index_skills(cursor, "candidate", 2, "python3, Go")
+    index_skills(cursor, "candidate", 3, "Java")
+    index_skills(cursor, "candidate", 4, "postgres, SQL")
+    return cursor
+
+
+def stats(cursor):
+    return (sorted(map(tuple, cursor.execute("SELECT * FROM skill_frequency WHERE count != 0"))),
+            sorted(map(tuple, cursor.execute("SELECT * FROM skill_corpus"))))
+
+
+def test_corpus_statistics_follow_reindexing_and_deletes(cursor):
+    index_skills(cursor, "candidate", 1, "Python, Kubernetes")
+    index_skills(cursor, "candidate", 3, "")
+    cursor.execute("DELETE FROM candidate_skills WHERE candidate_id = 2")
+    index_skills(cursor, "job", 7, "Python, SQL")
+    maintained = stats(cursor)
+
+    rebuild_skill_stats(cursor)
+    assert maintained == stats(cursor)
+    assert dict(cursor.execute("SELECT kind, documents FROM skill_corpus").fetchall()) == {"candidate": 2, "job": 1}
+
+
+def test_overlap_reports_matched_skills_and_jaccard(cursor):
+    overlap = overlap_scores(cursor, "candidate", ["python", "sql"])
+
+    assert sorted(overlap) == [1, 2, 4]
+    assert sorted(overlap[1]["matched_skills"]) == ["python", "sql"]
+    # |{python, sql}| / |{python, sql} | {python, sql, docker}|
+    assert overlap[1]["jaccard"] == pytest.approx(2 / 3)
+    assert overlap[2]["matched_skills"] == ["python"] and overlap[2]["jaccard"] == pytest.approx(1 / 3)
+    assert overlap[1]["bm25"] > overlap[2]["bm25"] > 0
+
+
+def test_min_overlap_filters_candidates(cursor):
+    assert sorted(overlap_scores(cursor, "candidate", ["python", "sql"], min_overlap=2)) == [1]
+    assert overlap_scores(cursor, "candidate", ["python", "sql"], min_overlap=3) == {}
+
+
+def test_overlap_of_selected_ids_matches_the_full_computation(cursor):
+    full = overlap_scores(cursor, "candidate", ["python", "sql"])
+    assert overlap_scores(cursor, "candidate", ["python", "sql"], ids=[2, 3, 4]) == {2: full[2], 4: full[4]}
+    assert overlap_scores(cursor, "candidate", ["python", "sql"], ids=[]) == {}
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+
+from snapshot import check_compatible, install_vectors, load_scores, read_manifest, write_snapshot
+from vector_store import VectorStore
+
+VERSION = {"version": "v1", "model_name": "all-MiniLM-L6-v2", "backend": "torch"}
+
+
+def fill(db, scores):
+    db.executemany("INSERT INTO candidates (candidate_id, name) VALUES (?, ?)", [(i, f"c{i}") for i in (1, 2)])
+    db.executemany("INSERT INTO jobs (job_id, job_title) VALUES (?, ?)", [(i, f"j{i}") for i in (1, 2)])
+    db.executemany(
+        "INSERT INTO scores (candidate_id, job_id, skill_score, education_score, project_relevance_score, "
+        "experience_score, eligibility_score, model_version) VALUES (?, ?, ?, ?, ?, ?, ?, 'v1')",
+        scores
+    )
+    db.commit()
+
+
+def score_rows(db):
+    return db.execute(
+        "SELECT candidate_id, job_id, skill_score, education_score, project_relevance_score, "
+        "experience_score, eligibility_score FROM scores ORDER BY candidate_id, job_id"
+    ).fetchall()
+
+
+def test_scores_round_trip_exactly(db, tmp_path):
+    rows = [
+        (1, 1, 71.23456789012345, 50.0, None, 12.5, 61.000000000000014),
+        (1, 2, 33.3, 0.1, 0.2, 0.30000000000000004, 61.00000000000001),
+        (2, 1, -1.5, 100.0, 99.99999999999999, 42.0, 57.123456789)
+    ]
+    fill(db, rows)
+    store = VectorStore(str(tmp_path / "vectors"), 4)
+    write_snapshot(db.cursor(), store, VERSION, str(tmp_path / "snap"))
+    before = [tuple(row) for row in score_rows(db)]
+
+    # A row of a job that no longer exists is dropped on import
+    db.execute("DELETE FROM jobs WHERE job_id = 2")
+    assert load_scores(db.cursor(), str(tmp_path / "snap"), "v1") == 2
+    assert [tuple(row) for row in score_rows(db)] == [row for row in before if row[1] != 2]
+
+
+def test_vectors_round_trip(db, tmp_path):
+    fill(db, [])
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(5, 4)).astype(np.float32)
+    for dtype in ("float32", "int8"):
+        store = VectorStore(str(tmp_path / dtype / "vectors"), 4, dtype)
+        store.matrix("job", "required_skills").upsert([10, 11, 12, 13, 14], vectors)
+        store.matrix("job", "required_skills").delete([12])
+        manifest = write_snapshot(db.cursor(), store, VERSION, str(tmp_path / dtype / "snap"), include_scores=False)
+        assert manifest["matrices"] == {"job/required_skills": 4}
+        check_compatible(read_manifest(str(tmp_path / dtype / "snap")), VERSION, dtype)
+
+        target = str(tmp_path / dtype / "restored")
+        assert install_vectors(str(tmp_path / dtype / "snap"), target) == 1
+        restored = VectorStore(target, 4, dtype).matrix("job", "required_skills")
+        original = store.matrix("job", "required_skills")
+        assert sorted(int(i) for i in restored.ids[:restored.count]) == [10, 11, 13, 14]
+        for vector_id in (10, 11, 13, 14):
+            np.testing.assert_array_equal(restored.get(vector_id), original.get(vector_id))
+        assert 12 not in restored
+        assert os.path.exists(os.path.join(target, "job", "required_skills.json"))
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pytest
+
+from vector_store import VectorMatrix
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "job" / "skills")
+
+
+def test_upsert_adds_and_overwrites_rows(path):
+    matrix = VectorMatrix(path, 3)
+    matrix.upsert([1, 2], [[1, 0, 0], [0, 2, 0]])
+    matrix.upsert([2, 3], [[0, 0, 5], [1, 1, 0]])
+
+    assert len(matrix) == 3
+    np.testing.assert_allclose(matrix.get(1), unit(1, 0, 0))
+    np.testing.assert_allclose(matrix.get(2), unit(0, 0, 1))
+    np.testing.assert_allclose(matrix.get(3), unit(1, 1, 0), rtol=1e-6)
+    assert matrix.get(4) is None
+
+
+def test_delete_moves_the_last_row_into_the_freed_slot(path):
+    matrix = VectorMatrix(path, 3)
+    matrix.upsert([1, 2, 3], [[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    matrix.delete([1, 99])
+
+    assert len(matrix) == 2 and 1 not in matrix
+    assert list(matrix.ids[:2]) == [3, 2]
+    np.testing.assert_allclose(matrix.get(3), unit(0, 0, 1))
+    ids, scores = matrix.cosine([0, 0, 1], vector_ids=[3, 2, 1])
+    np.testing.assert_allclose(scores[:2], [1.0, 0.0], atol=1e-6)
+    assert np.isnan(scores[2])
+
+    # Deleting the last row needs no swap
+    matrix.delete([2])
+    assert list(matrix.vectors()[0]) == [3]
+
+
+def test_other_instance_sees_writes_within_one_mtime_tick(path):
+    writer, reader = VectorMatrix(path, 3), VectorMatrix(path, 3)
+    manifest = f"{path}.json"
+    tick = os.stat(manifest).st_mtime_ns
+
+    writer.upsert([1], [[1, 0, 0]])
+    os.utime(manifest, ns=(tick, tick))
+    assert reader.get(1) is not None
+
+    # Grows past the initial capacity, so the data files are replaced too
+    writer.upsert(range(2, 1100), np.eye(3)[np.arange(1098) % 3])
+    writer.delete([1])
+    os.utime(manifest, ns=(tick, tick))
+    assert len(reader.vectors()[0]) == 1098 and reader.get(1) is None
+    np.testing.assert_allclose(reader.get(1099), writer.get(1099))
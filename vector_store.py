@@ -0,0 +1,286 @@
+import fcntl
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+SCORE_CHUNK_ROWS = 65536
+
+
+def quantize(vectors, dtype):
+    """Normalize float vectors and convert them to the compact storage form.
+
+    Returns ``(data, scales)``; ``scales`` is only meaningful for int8, where each
+    row is stored as ``round(v / scale)`` with ``scale = max|v| / 127``.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        data = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return data, scales
+
+    return vectors.astype(dtype), np.ones(len(vectors), dtype=np.float32)
+
+
+def dequantize(data, scales, dtype):
+    data = np.asarray(data, dtype=np.float32)
+    if dtype == "int8":
+        return data * np.asarray(scales, dtype=np.float32)[:, None]
+    return data
+
+
+class VectorMatrix:
+    """Contiguous memory-mapped matrix of unit vectors keyed by integer id.
+
+    Rows live in ``<path>.data.npy`` (float32, float16 or int8), ids in
+    ``<path>.ids.npy`` and int8 per-row scales in ``<path>.scale.npy``; the row
+    count is kept in ``<path>.json``. Writers serialize on ``<path>.lock`` so
+    several worker processes can share the same files; every write stores a
+    fresh ``generation`` token in the manifest, which readers compare to
+    notice the change (copied snapshot manifests included).
+    """
+
+    def __init__(self, path, dim, dtype="float32"):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype} (expected one of {', '.join(VECTOR_DTYPES)})")
+        self.path = path
+        self.dim = int(dim)
+        self.dtype = dtype
+        self._lock = threading.RLock()
+        self._generation = None
+        self.count = 0
+        self.capacity = 0
+        self._rows = {}
+        self.ids = self.data = self.scales = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.refresh()
+
+    @property
+    def manifest_path(self):
+        return f"{self.path}.json"
+
+    def _file(self, name):
+        return f"{self.path}.{name}.npy"
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        """Reload the mapping if another process changed the files."""
+        with self._lock:
+            manifest = self._read_manifest()
+            if manifest is None:
+                self._allocate(0, 1024)
+                self._write_manifest()
+                return
+            # Two writes within one mtime tick look unchanged, so only manifests
+            # written before generations existed fall back to the mtime
+            generation = manifest.get("generation") or f"mtime:{os.stat(self.manifest_path).st_mtime_ns}"
+            if generation == self._generation:
+                return
+
+            if manifest["dim"] != self.dim or manifest["dtype"] != self.dtype:
+                raise ValueError(
+                    f"{self.path} holds {manifest['dtype']}[{manifest['dim']}] vectors, "
+                    f"expected {self.dtype}[{self.dim}]"
+                )
+            self.count = manifest["count"]
+            self.capacity = manifest["capacity"]
+            self.ids = np.load(self._file("ids"), mmap_mode="r+")
+            self.data = np.load(self._file("data"), mmap_mode="r+")
+            self.scales = np.load(self._file("scale"), mmap_mode="r+")
+            self._rows = {int(i): row for row, i in enumerate(self.ids[:self.count])}
+            self._generation = generation
+
+    def _allocate(self, count, capacity):
+        """Create files of ``capacity`` rows, carrying over the first ``count`` rows."""
+        arrays = {
+            "ids": ((capacity,), np.int64),
+            "data": ((capacity, self.dim), np.dtype(self.dtype)),
+            "scale": ((capacity,), np.float32)
+        }
+        old = {"ids": self.ids, "data": self.data, "scale": self.scales}
+        opened = {}
+        for name, (shape, dtype) in arrays.items():
+            tmp_path = self._file(name) + ".tmp"
+            array = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+            if count and old[name] is not None:
+                array[:count] = old[name][:count]
+            array.flush()
+            del array
+            os.replace(tmp_path, self._file(name))
+            opened[name] = np.load(self._file(name), mmap_mode="r+")
+
+        self.ids, self.data, self.scales = opened["ids"], opened["data"], opened["scale"]
+        self.count = count
+        self.capacity = capacity
+
+    def _write_manifest(self):
+        generation = uuid.uuid4().hex
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype, "count": self.count, "capacity": self.capacity,
+                       "generation": generation}, f)
+        os.replace(tmp_path, self.manifest_path)
+        self._generation = generation
+
+    @contextmanager
+    def _writing(self):
+        with self._lock:
+            with open(f"{self.path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self.refresh()
+                    yield
+                    for array in (self.ids, self.data, self.scales):
+                        array.flush()
+                    self._write_manifest()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, vector_id):
+        return int(vector_id) in self._rows
+
+    def upsert(self, vector_ids, vectors):
+        vector_ids = [int(i) for i in vector_ids]
+        if not vector_ids:
+            return
+        data, scales = quantize(vectors, self.dtype)
+
+        with self._writing():
+            new_ids = [i for i in dict.fromkeys(vector_ids) if i not in self._rows]
+            if self.count + len(new_ids) > self.capacity:
+                capacity = max(self.capacity * 2, self.count + len(new_ids), 1024)
+                self._allocate(self.count, capacity)
+            for vector_id in new_ids:
+                self._rows[vector_id] = self.count
+                self.ids[self.count] = vector_id
+                self.count += 1
+
+            rows = np.array([self._rows[i] for i in vector_ids], dtype=np.int64)
+            self.data[rows] = data
+            self.scales[rows] = scales
+
+    def delete(self, vector_ids):
+        """Remove rows by moving the last row into each freed slot."""
+        with self._writing():
+            for vector_id in vector_ids:
+                row = self._rows.pop(int(vector_id), None)
+                if row is None:
+                    continue
+                last = self.count - 1
+                if row != last:
+                    moved_id = int(self.ids[last])
+                    self.ids[row] = moved_id
+                    self.data[row] = self.data[last]
+                    self.scales[row] = self.scales[last]
+                    self._rows[moved_id] = row
+                self.count = last
+
+    def get(self, vector_id):
+        self.refresh()
+        row = self._rows.get(int(vector_id))
+        if row is None:
+            return None
+        return dequantize(self.data[row:row + 1], self.scales[row:row + 1], self.dtype)[0]
+
+    def vectors(self):
+        """Return ``(ids, float32 vectors)`` for every stored row."""
+        self.refresh()
+        return (
+            np.array(self.ids[:self.count]),
+            dequantize(self.data[:self.count], self.scales[:self.count], self.dtype)
+        )
+
+    def cosine(self, queries, vector_ids=None):
+        """Cosine similarity of stored rows against one or more query vectors.
+
+        Scores are computed straight from the compact rows in bounded chunks.
+        Returns ``(ids, scores)`` with ``scores`` shaped ``(rows, queries)`` (or
+        ``(rows,)`` for a single query). When ``vector_ids`` is given, rows come
+        back in that order and missing ids score ``nan``.
+        """
+        self.refresh()
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = quantize(queries, "float32")[0].T
+
+        if vector_ids is None:
+            ids = np.array(self.ids[:self.count])
+            rows = np.arange(self.count)
+        else:
+            ids = np.asarray(vector_ids, dtype=np.int64)
+            rows = np.array([self._rows.get(int(i), -1) for i in ids], dtype=np.int64)
+
+        scores = np.full((len(rows), queries.shape[1]), np.nan, dtype=np.float32)
+        present = np.nonzero(rows >= 0)[0]
+        for start in range(0, len(present), SCORE_CHUNK_ROWS):
+            positions = present[start:start + SCORE_CHUNK_ROWS]
+            chunk_rows = rows[positions]
+            if vector_ids is None:
+                chunk = self.data[chunk_rows[0]:chunk_rows[-1] + 1]
+            else:
+                chunk = self.data[chunk_rows]
+            chunk_scores = chunk.astype(np.float32) @ queries
+            if self.dtype == "int8":
+                chunk_scores *= self.scales[chunk_rows][:, None]
+            scores[positions] = chunk_scores
+
+        return ids, (scores[:, 0] if single else scores)
+
+    def bytes_per_row(self):
+        row_bytes = self.dim * np.dtype(self.dtype).itemsize + np.dtype(np.int64).itemsize
+        if self.dtype == "int8":
+            row_bytes += np.dtype(np.float32).itemsize
+        return row_bytes
+
+
+class VectorStore:
+    """Per-entity, per-field ``VectorMatrix`` files under one directory."""
+
+    def __init__(self, root, dim, dtype="float32"):
+        self.root = root
+        self.dim = dim
+        self.dtype = dtype
+        self._matrices = {}
+        self._lock = threading.Lock()
+
+    def matrix(self, kind, field):
+        key = (kind, field)
+        with self._lock:
+            if key not in self._matrices:
+                self._matrices[key] = VectorMatrix(os.path.join(self.root, kind, field), self.dim, self.dtype)
+            return self._matrices[key]
+
+    def upsert(self, kind, vector_id, field_vectors):
+        for field, vector in field_vectors.items():
+            self.matrix(kind, field).upsert([vector_id], [vector])
+
+
+def recall_at_k(reference_scores, approx_scores, k):
+    """Fraction of the reference top-k that also appears in the approximate top-k."""
+    reference_scores = np.asarray(reference_scores)
+    approx_scores = np.asarray(approx_scores)
+    k = min(k, len(reference_scores))
+    if k == 0:
+        return 1.0
+    reference_top = set(np.argsort(-reference_scores, kind="stable")[:k].tolist())
+    approx_top = set(np.argsort(-approx_scores, kind="stable")[:k].tolist())
+    return len(reference_top & approx_top) / k